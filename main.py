@@ -3,10 +3,11 @@ import argparse
 import searchengine.debugtools
 import searchengine.netscanner
 import searchengine.solr_tools
-from searchengine.webcrawler import CrawlerExecutor
+from searchengine.webcrawler import CrawlerExecutor, WebCrawler, AsyncWebCrawler
 from searchengine.indexer import IndexerExecutor, Indexer
 from searchengine.vulnerability_scanner.exploit import ExploitManager
 from searchengine.manager.managers import ServerManager
+from searchengine.reindex import ReindexExecutor, WarcSource, CachedPageSource
 
 def main(argv):
     parser = argparse.ArgumentParser()
@@ -19,7 +20,14 @@ def main(argv):
     group.add_argument('-o', '--optimizer', action='store_true', help='start the solr optimizer')
     group.add_argument('-rb', '--rebooster', action='store_true', help='start the rebooster for boosting important results')
     group.add_argument('-dm', '--deltamerge', action='store_true', help='start the delta merge tool (migrates new data from working core to live core)')
+    group.add_argument('-ri', '--reindex', type=str, choices=['warc', 'cache'], help='rebuild a core offline from archived pages (warc) or the cached page table (cache)')
     parser.add_argument('-p', '--processes', type=int, default='10', help='the number of processes to use')
+    parser.add_argument('-a', '--asyncfetch', action='store_true', help='use the asyncio fetch engine in each webcrawler process')
+    parser.add_argument('-c', '--concurrency', type=int, default=100, help='the number of fetches each async webcrawler keeps in flight')
+    parser.add_argument('--archive', action='store_true', help='archive every page the webcrawlers fetch in WARC files')
+    parser.add_argument('--core', type=str, default=None, help='the core the reindex loads (defaults to working for warc and main for cache)')
+    parser.add_argument('--warcs', type=str, nargs='*', help='WARC files or directories to reindex (defaults to the crawlers\' archive directory)')
+    parser.add_argument('--restart', action='store_true', help='ignore the reindex checkpoint and start over')
     parser.add_argument('--host', type=str, default='', help='the host to connect or bind to for IPC via Manager')
     parser.add_argument('--port', type=int, default=4643, help='the port to connect or bind to for IPC via Manager')
     parser.add_argument('-k', '--authkey', type=str, default='a', help='process authentication key used for IPC via Manager')
@@ -31,12 +39,16 @@ def main(argv):
         input("Press enter key to exit.")
     elif args.webcrawler:
         searchengine.debugtools.log("Starting CrawlerExecutor...")
+        crawler_args = { 'archive' : args.archive }
+        if args.asyncfetch:
+            crawler_args['concurrency'] = args.concurrency
         c_executor = searchengine.webcrawler.crawler.CrawlerExecutor(
-            crawler_type = searchengine.webcrawler.crawler.WebCrawler, 
+            crawler_type = AsyncWebCrawler if args.asyncfetch else WebCrawler, 
             max_workers = args.processes,
             ip_address = args.host,
             port = args.port,
-            authkey = args.authkey.encode('utf-8') if args.authkey is not None else None
+            authkey = args.authkey.encode('utf-8') if args.authkey is not None else None,
+            crawler_args = crawler_args
             )
         c_executor.execute_tasks()
     elif args.indexer:
@@ -67,6 +79,15 @@ def main(argv):
     elif args.deltamerge:
         searchengine.debugtools.log("Starting deltamerge...")
         searchengine.solr_tools.run_delta_merge()
+    elif args.reindex:
+        searchengine.debugtools.log("Starting ReindexExecutor...")
+        r_executor = ReindexExecutor(
+            source = WarcSource(args.warcs) if args.reindex == 'warc' else CachedPageSource(),
+            collection = args.core,
+            max_workers = args.processes,
+            restart = args.restart
+            )
+        r_executor.execute_tasks()
 
 if __name__ == "__main__":
     main(sys.argv[1:])
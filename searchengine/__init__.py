@@ -0,0 +1,3 @@
+import os
+
+DATA_DIRECTORY = os.environ.get("SEARCHENGINE_DATA", os.path.join(os.path.expanduser("~"), ".searchengine"))  #< Root of the runtime data (frontiers, WARC files, checkpoints, caches), set SEARCHENGINE_DATA to move it.
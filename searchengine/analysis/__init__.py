@@ -0,0 +1,9 @@
+__all__ = [
+    "Analyzer",
+    "split_key_words",
+    "clean_string",
+    "ENGLISH_STOPWORDS",
+    "analyzer"
+]
+
+from searchengine.analysis.analyzer import Analyzer, split_key_words, clean_string, ENGLISH_STOPWORDS
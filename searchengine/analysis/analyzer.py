@@ -0,0 +1,133 @@
+import re
+
+WORD_PATTERN = re.compile(r"\x1e|(?<!\w)[A-Za-z]\w*")   #< Words starting with a letter (and document separators, see tokenize_batch).
+WHITESPACE_PATTERN = re.compile(r"[\s|]+")              #< Runs of white space (and "|") collapsed by clean_string.
+TAG_PATTERN = re.compile(r"<[^>]*>")                    #< Markup left in text, removed by clean_string.
+DOCUMENT_SEPARATOR = "\x1e"                             #< Joins the documents of a batch (not a word character).
+
+ENGLISH_STOPWORDS = frozenset([
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "for", "if", "in", "into", "is",
+    "it", "no", "not", "of", "on", "or", "such", "that", "the", "their", "then", "there",
+    "these", "they", "this", "to", "was", "will", "with"
+])  #< Stopwords that can be passed to an Analyzer.
+
+##
+# @class    Analyzer
+#
+# @brief    Turns text into the lowercase words that are indexed and fingerprinted.
+#           Words are runs of word characters starting with a letter, found in a single pass of
+#           one precompiled pattern. The text is lowercased once after matching instead of once
+#           per word, and a batch of documents is matched as one string, so the per call cost is
+#           paid once per batch. Stopwords and length limits are optional.
+#
+# @author   agent
+# @date 10/17/2026
+class Analyzer:
+
+    ##
+    # @fn   __init__(self, stopwords = None, min_length = 1, max_length = None)
+    #
+    # @brief    Class initializer.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self                The class instance that this method operates on.
+    # @param    optional stopwords  Set of lowercase words to drop (e.g. ENGLISH_STOPWORDS).
+    # @param    optional min_length Shortest word kept.
+    # @param    optional max_length Longest word kept, None for no limit.
+    def __init__(self, stopwords = None, min_length = 1, max_length = None):
+        self.stopwords = frozenset(stopwords) if stopwords else None
+        self.min_length = min_length
+        self.max_length = max_length
+        self.filtered = self.stopwords is not None or min_length > 1 or max_length is not None
+
+    ##
+    # @fn   tokenize(self, text)
+    #
+    # @brief    Gets the words of a text.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    text    The text.
+    #
+    # @return   List of lowercase words.
+    def tokenize(self, text):
+        if DOCUMENT_SEPARATOR in text:
+            text = text.replace(DOCUMENT_SEPARATOR, " ")
+        words = WORD_PATTERN.findall(text)
+        if len(words) == 0:
+            return []
+        words = " ".join(words).lower().split(" ")
+        return self.__filter(words) if self.filtered else words
+
+    ##
+    # @fn   tokenize_batch(self, texts)
+    #
+    # @brief    Gets the words of many texts at once.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    texts   List of texts.
+    #
+    # @return   List with the list of lowercase words of each text.
+    def tokenize_batch(self, texts):
+        if len(texts) == 0:
+            return []
+        joined = DOCUMENT_SEPARATOR.join(text.replace(DOCUMENT_SEPARATOR, " ") if DOCUMENT_SEPARATOR in text else text for text in texts)
+        documents = " ".join(WORD_PATTERN.findall(joined)).lower().split(DOCUMENT_SEPARATOR)
+        if self.filtered:
+            return [self.__filter(document.split()) for document in documents]
+        return [document.split() for document in documents]
+
+    ##
+    # @fn   __filter(self, words)
+    #
+    # @brief    Drops stopwords and words outside of the length limits.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    words   List of words.
+    #
+    # @return   The words that are kept.
+    def __filter(self, words):
+        stopwords = self.stopwords or ()
+        min_length = self.min_length
+        max_length = self.max_length if self.max_length is not None else float("inf")
+        return [word for word in words if min_length <= len(word) <= max_length and word not in stopwords]
+
+default_analyzer = Analyzer()   #< Analyzer without stopwords or length limits, used by split_key_words.
+
+##
+# @fn   split_key_words(text)
+#
+# @brief    Gets all valid words from a text (see Analyzer.tokenize).
+#
+# @author   agent
+# @date 10/17/2026
+#
+# @param    text    The text.
+#
+# @return   List of lowercase words.
+def split_key_words(text):
+    return default_analyzer.tokenize(text)
+
+##
+# @fn   clean_string(string)
+#
+# @brief    Collapses white space and removes markup left in a text field.
+#
+# @author   agent
+# @date 10/17/2026
+#
+# @param    string  The text.
+#
+# @return   The cleaned text.
+def clean_string(string):
+    return TAG_PATTERN.sub("", WHITESPACE_PATTERN.sub(" ", string))
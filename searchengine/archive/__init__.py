@@ -0,0 +1,6 @@
+__all__ = [
+    "WarcWriter",
+    "warc"
+]
+
+from searchengine.archive.warc import WarcWriter, WARC_DIRECTORY, read_index, read_record, iter_records, parse_record
@@ -0,0 +1,432 @@
+import os
+import gzip
+import time
+import zlib
+import uuid
+import queue
+import atexit
+import base64
+import socket
+import hashlib
+import threading
+import searchengine.debugtools
+
+WARC_DIRECTORY = os.path.join(searchengine.DATA_DIRECTORY, "warc") #< Default root for the crawlers' WARC files.
+WARC_VERSION = "WARC/1.1"
+MAX_FILE_SIZE = 1024 * 1024 * 1024  #< Bytes of a WARC file after which the next capture goes to a new one.
+QUEUE_SIZE = 1000                   #< Captures waiting for the writer thread before new ones are dropped.
+COMPRESS_LEVEL = 6
+READ_SIZE = 1024 * 1024             #< Bytes read from a WARC file at a time when scanning it.
+OPEN_SUFFIX = ".open"               #< Suffix of a WARC file while it is being written.
+INDEX_SUFFIX = ".idx"               #< Suffix of the offset index kept next to every WARC file.
+INDEX_FIELDS = ("url", "date", "status", "mime", "digest", "offset", "length")  #< Tab separated columns of the index.
+DROPPED_HEADERS = ("content-encoding", "transfer-encoding", "content-length")    #< Headers that no longer describe the stored (decoded) body.
+
+##
+# @fn   warc_date(timestamp)
+#
+# @brief    Formats a time for the WARC-Date header.
+#
+# @author   agent
+# @date 10/17/2026
+#
+# @param    timestamp   Seconds since the epoch.
+def warc_date(timestamp):
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(timestamp))
+
+##
+# @fn   block_digest(data)
+#
+# @brief    Gets the digest of a block in the format of the WARC-*-Digest headers.
+#
+# @author   agent
+# @date 10/17/2026
+#
+# @param    data    The bytes.
+def block_digest(data):
+    return "sha1:" + base64.b32encode(hashlib.sha1(data).digest()).decode("ascii")
+
+##
+# @fn   build_record(warc_type, fields, block)
+#
+# @brief    Builds the raw bytes of a WARC record.
+#
+# @author   agent
+# @date 10/17/2026
+#
+# @param    warc_type   The WARC-Type ("warcinfo", "request", "response", ...).
+# @param    fields      List of (name, value) header fields, besides WARC-Type and Content-Length.
+# @param    block       The content block.
+def build_record(warc_type, fields, block):
+    global WARC_VERSION
+    lines = [WARC_VERSION, "WARC-Type: " + warc_type]
+    for name, value in fields:
+        lines.append("{}: {}".format(name, value))
+    lines.append("Content-Length: {}".format(len(block)))
+    head = ("\r\n".join(lines) + "\r\n\r\n").encode("utf-8")
+    return head + block + b"\r\n\r\n"
+
+##
+# @fn   http_response_block(response, body)
+#
+# @brief    Builds the HTTP message of a response record.
+#           The body is stored decoded (the fetcher undoes the transfer and content encodings
+#           while streaming), so the headers describing the encodings are replaced by the
+#           Content-Length of the decoded body.
+#
+# @author   agent
+# @date 10/17/2026
+#
+# @param    response    The FetchResponse.
+# @param    body        The decoded body bytes.
+def http_response_block(response, body):
+    global DROPPED_HEADERS
+    lines = response.head.split(b"\n")
+    head = [lines[0].rstrip(b"\r")]
+    for line in lines[1:]:
+        line = line.rstrip(b"\r")
+        if len(line) == 0:
+            continue
+        name = line.split(b":", 1)[0].strip().lower().decode("latin-1")
+        if name not in DROPPED_HEADERS:
+            head.append(line)
+    head.append("Content-Length: {}".format(len(body)).encode("latin-1"))
+    return b"\r\n".join(head) + b"\r\n\r\n" + body
+
+##
+# @fn   read_record(warc_path, offset, length)
+#
+# @brief    Reads a single record of a WARC file, at the offset and length found in its index.
+#
+# @author   agent
+# @date 10/17/2026
+#
+# @param    warc_path   The WARC file.
+# @param    offset      Offset of the record's gzip member.
+# @param    length      Length of the record's gzip member.
+#
+# @return   The raw bytes of the record.
+def read_record(warc_path, offset, length):
+    with open(warc_path, "rb") as warc_file:
+        warc_file.seek(offset)
+        return gzip.decompress(warc_file.read(length))
+
+##
+# @fn   iter_records(warc_path, offset = 0)
+#
+# @brief    Reads the records of a WARC file one after the other, from any record's offset.
+#           Every record has to be its own gzip member (as written by WarcWriter), a member cut
+#           off at the end of the file (one still being written) ends the scan.
+#
+# @author   agent
+# @date 10/17/2026
+#
+# @param    warc_path       The WARC file.
+# @param    optional offset Offset of the first record's gzip member.
+#
+# @return   Generator of (offset, length, raw bytes) of each record.
+def iter_records(warc_path, offset = 0):
+    global READ_SIZE
+    with open(warc_path, "rb") as warc_file:
+        warc_file.seek(offset)
+        data = b""
+        while True:
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            chunks = []
+            length = 0
+            while not decompressor.eof:
+                if len(data) == 0:
+                    data = warc_file.read(READ_SIZE)
+                    if len(data) == 0:
+                        return
+                chunks.append(decompressor.decompress(data))
+                length += len(data) - len(decompressor.unused_data)
+                data = decompressor.unused_data
+            yield offset, length, b"".join(chunks)
+            offset += length
+
+##
+# @fn   parse_record(record)
+#
+# @brief    Splits a raw WARC record into its header fields and content block.
+#
+# @author   agent
+# @date 10/17/2026
+#
+# @param    record  The raw bytes of the record.
+#
+# @return   (dictionary of header fields with lowercased names, content block bytes)
+def parse_record(record):
+    head, sep, rest = record.partition(b"\r\n\r\n")
+    fields = {}
+    for line in head.decode("utf-8", errors = "replace").split("\r\n")[1:]:
+        name, sep, value = line.partition(":")
+        fields[name.strip().lower()] = value.strip()
+    length = int(fields.get("content-length", len(rest)))
+    return fields, rest[:length]
+
+##
+# @fn   read_index(index_path)
+#
+# @brief    Reads the offset index of a WARC file.
+#
+# @author   agent
+# @date 10/17/2026
+#
+# @param    index_path  The index file.
+#
+# @return   Generator of dictionaries with the INDEX_FIELDS of each response record.
+def read_index(index_path):
+    global INDEX_FIELDS
+    with open(index_path, "r", encoding = "utf-8") as index_file:
+        for line in index_file:
+            if line.startswith("#"):
+                continue
+            entry = dict(zip(INDEX_FIELDS, line.rstrip("\n").split("\t")))
+            entry["offset"] = int(entry["offset"])
+            entry["length"] = int(entry["length"])
+            yield entry
+
+##
+# @class    WarcWriter
+#
+# @brief    Archives fetched pages as request/response record pairs in WARC files.
+#           Every record is its own gzip member, so any record can be read back on its own from
+#           the offset and length kept in the index next to the file. Captures are queued and
+#           written by a background thread, so the fetch loop never waits on the disk (captures
+#           arriving while QUEUE_SIZE are queued are dropped). A file is written with OPEN_SUFFIX
+#           and renamed once it reaches max_file_size, when the next capture goes to a new file.
+#
+# @author   agent
+# @date 10/17/2026
+class WarcWriter:
+
+    ##
+    # @fn   __init__(self, directory, prefix = "crawl", max_file_size = MAX_FILE_SIZE, queue_size = QUEUE_SIZE)
+    #
+    # @brief    Class initializer.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self                    The class instance that this method operates on.
+    # @param    directory               Directory the WARC files are written to.
+    # @param    optional prefix         Start of the WARC file names.
+    # @param    optional max_file_size  Bytes of a WARC file before a new one is started.
+    # @param    optional queue_size     Captures waiting to be written before new ones are dropped.
+    def __init__(self, directory, prefix = "crawl", max_file_size = MAX_FILE_SIZE, queue_size = QUEUE_SIZE):
+        os.makedirs(directory, exist_ok = True)
+        self.directory = directory
+        self.prefix = prefix
+        self.max_file_size = max_file_size
+        self.queue = queue.Queue(queue_size)
+        self.serial = 0
+        self.path = None            #< Final path of the WARC file being written.
+        self.warc_file = None
+        self.index_file = None
+        self.file_size = 0
+        self.warcinfo_id = None     #< WARC-Record-ID of the warcinfo record of the current file.
+        self.dropped = 0            #< Captures dropped because the queue was full.
+        self.closed = False
+        self.writer = threading.Thread(target = self.__write_loop, daemon = True)
+        self.writer.start()
+        atexit.register(self.close)
+
+    ##
+    # @fn   write_response(self, response, body)
+    #
+    # @brief    Queues a fetched response (and the request that got it) to be archived.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self        The class instance that this method operates on.
+    # @param    response    The FetchResponse.
+    # @param    body        The decoded body bytes.
+    #
+    # @return   False if the capture was dropped.
+    def write_response(self, response, body):
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait((time.time(), response, body))
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                searchengine.debugtools.log("WARC writer is falling behind, {:,} captures dropped.".format(self.dropped))
+            return False
+        return True
+
+    ##
+    # @fn   close(self)
+    #
+    # @brief    Writes whatever is queued, stops the writer thread and closes the current file.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(None)
+        self.writer.join()
+        atexit.unregister(self.close)
+
+    ##
+    # @fn   __write_loop(self)
+    #
+    # @brief    Background thread writing the queued captures.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def __write_loop(self):
+        while True:
+            capture = self.queue.get()
+            if capture is None:
+                break
+            try:
+                self.__write_capture(*capture)
+                if self.queue.empty():
+                    # Caught up, so what is on disk matches the index.
+                    self.warc_file.flush()
+                    self.index_file.flush()
+            except Exception as ex:
+                searchengine.debugtools.log_exception(ex)
+        try:
+            self.__close_file()
+        except Exception as ex:
+            searchengine.debugtools.log_exception(ex)
+
+    ##
+    # @fn   __write_capture(self, timestamp, response, body)
+    #
+    # @brief    Appends the response and request records of a capture and indexes the response.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self        The class instance that this method operates on.
+    # @param    timestamp   Time the response was fetched.
+    # @param    response    The FetchResponse.
+    # @param    body        The decoded body bytes.
+    def __write_capture(self, timestamp, response, body):
+        if self.warc_file is None or self.file_size >= self.max_file_size:
+            self.__close_file()
+            self.__open_file()
+        date = warc_date(timestamp)
+        response_id = self.__record_id()
+        fields = [
+            ("WARC-Record-ID", response_id),
+            ("WARC-Date", date),
+            ("WARC-Target-URI", response.url),
+            ("Content-Type", "application/http;msgtype=response"),
+            ("WARC-Warcinfo-ID", self.warcinfo_id)
+        ]
+        if response.address is not None:
+            fields.append(("WARC-IP-Address", response.address))
+        if response.truncated:
+            fields.append(("WARC-Truncated", "length"))
+        block = http_response_block(response, body)
+        digest = block_digest(body)
+        fields.append(("WARC-Payload-Digest", digest))
+        fields.append(("WARC-Block-Digest", block_digest(block)))
+        offset, length = self.__append(build_record("response", fields, block))
+
+        fields = [
+            ("WARC-Record-ID", self.__record_id()),
+            ("WARC-Date", date),
+            ("WARC-Target-URI", response.url),
+            ("WARC-Concurrent-To", response_id),
+            ("Content-Type", "application/http;msgtype=request"),
+            ("WARC-Warcinfo-ID", self.warcinfo_id)
+        ]
+        if response.address is not None:
+            fields.append(("WARC-IP-Address", response.address))
+        self.__append(build_record("request", fields, response.request))
+
+        mime = response.headers.get("content-type", "").split(";")[0].strip().lower() or "-"
+        entry = (response.url, time.strftime("%Y%m%d%H%M%S", time.gmtime(timestamp)), str(response.status), mime, digest, str(offset), str(length))
+        self.index_file.write("\t".join(field.replace("\t", "%09").replace("\n", "%0A") for field in entry) + "\n")
+
+    ##
+    # @fn   __append(self, record)
+    #
+    # @brief    Appends a record to the current file as its own gzip member.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    record  The raw bytes of the record.
+    #
+    # @return   (offset, length) of the gzip member.
+    def __append(self, record):
+        global COMPRESS_LEVEL
+        member = gzip.compress(record, COMPRESS_LEVEL)
+        offset = self.file_size
+        self.warc_file.write(member)
+        self.file_size += len(member)
+        return offset, len(member)
+
+    ##
+    # @fn   __open_file(self)
+    #
+    # @brief    Starts a new WARC file (and its index) with a warcinfo record.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def __open_file(self):
+        global OPEN_SUFFIX, INDEX_SUFFIX, INDEX_FIELDS
+        self.serial += 1
+        name = "{}-{}-{:05d}-{}-{}.warc.gz".format(self.prefix, time.strftime("%Y%m%d%H%M%S", time.gmtime()), self.serial, os.getpid(), socket.gethostname())
+        self.path = os.path.join(self.directory, name)
+        self.warc_file = open(self.path + OPEN_SUFFIX, "wb")
+        self.index_file = open(self.path + INDEX_SUFFIX, "w", encoding = "utf-8")
+        self.index_file.write("#" + "\t".join(INDEX_FIELDS) + "\n")
+        self.file_size = 0
+        self.warcinfo_id = self.__record_id()
+        info = "software: OS-Search-Engine\r\nformat: WARC File Format 1.1\r\nhostname: {}\r\n".format(socket.gethostname())
+        fields = [
+            ("WARC-Record-ID", self.warcinfo_id),
+            ("WARC-Date", warc_date(time.time())),
+            ("WARC-Filename", name),
+            ("Content-Type", "application/warc-fields")
+        ]
+        self.__append(build_record("warcinfo", fields, info.encode("utf-8")))
+
+    ##
+    # @fn   __close_file(self)
+    #
+    # @brief    Closes the current WARC file and its index, and drops the OPEN_SUFFIX from its name.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def __close_file(self):
+        global OPEN_SUFFIX
+        if self.warc_file is None:
+            return
+        self.warc_file.close()
+        self.index_file.close()
+        self.warc_file = None
+        self.index_file = None
+        os.replace(self.path + OPEN_SUFFIX, self.path)
+
+    ##
+    # @fn   __record_id(self)
+    #
+    # @brief    Gets a new WARC-Record-ID.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def __record_id(self):
+        return "<urn:uuid:{}>".format(uuid.uuid4())
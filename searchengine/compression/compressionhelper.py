@@ -1,26 +1,388 @@
+import re
+import bz2
+import lzma
 import zlib
+import struct
+from collections import Counter
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None    #< zstd is optional, the stdlib codecs are used without it.
+
+MAGIC = b"SE"           #< Start of the header of every blob written since codecs were added. Legacy blobs are
+                        #  bare zlib streams, whose first byte always has 8 in its low nibble, so they never start with it.
+FLAG_DICTIONARY = 0x01  #< Header flag: a 4 byte dictionary id follows the header.
+
+CODEC_NONE = 0
+CODEC_ZLIB = 1
+CODEC_LZMA = 2
+CODEC_BZ2 = 3
+CODEC_ZSTD = 4
+CODEC_NAMES = {
+    "none" : CODEC_NONE,
+    "zlib" : CODEC_ZLIB,
+    "lzma" : CODEC_LZMA,
+    "bz2"  : CODEC_BZ2,
+    "zstd" : CODEC_ZSTD
+}
+
+LEVEL_FAST = "fast"
+LEVEL_DEFAULT = "default"
+LEVEL_BEST = "best"
+LEVELS = {
+    CODEC_ZLIB : { LEVEL_FAST : 1, LEVEL_DEFAULT : 6, LEVEL_BEST : 9 },
+    CODEC_LZMA : { LEVEL_FAST : 0, LEVEL_DEFAULT : 6, LEVEL_BEST : 9 },
+    CODEC_BZ2  : { LEVEL_FAST : 1, LEVEL_DEFAULT : 9, LEVEL_BEST : 9 },
+    CODEC_ZSTD : { LEVEL_FAST : 1, LEVEL_DEFAULT : 3, LEVEL_BEST : 19 }
+}   #< Codec level of each tier.
+
+DICTIONARY_SIZE = 32 * 1024         #< Bytes of a trained dictionary (zlib can not use more than its 32KB window).
+DICTIONARY_MAX_SEGMENT = 256        #< Longest piece of markup kept in a zlib dictionary.
+DICTIONARY_SEGMENT = re.compile(br"<[^<]*") #< Pieces of markup the zlib dictionary is built from.
+
+##
+# @class    CompressionDictionary
+#
+# @brief    A shared dictionary trained on sample pages. Small pages compress poorly on their
+#           own since they have little repetition to work with; with a dictionary holding the
+#           markup most pages share, a codec finds it in the dictionary instead.
+#           Only zlib and zstd support dictionaries.
+#
+# @author   agent
+# @date 10/17/2026
+class CompressionDictionary:
+
+    ##
+    # @fn   __init__(self, codec, data)
+    #
+    # @brief    Class initializer.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    codec   CODEC_ZLIB or CODEC_ZSTD.
+    # @param    data    The raw dictionary.
+    def __init__(self, codec, data):
+        if codec not in (CODEC_ZLIB, CODEC_ZSTD):
+            raise ValueError("Codec {} does not support dictionaries".format(codec))
+        self.codec = codec
+        self.data = data
+        self.id = zlib.crc32(data)  #< Id written in the header of the blobs compressed with it.
+        self.zstd_data = None
+        if codec == CODEC_ZSTD:
+            CompressionHelper.require_codec(codec)
+            self.zstd_data = zstandard.ZstdCompressionDict(data)
+
+    ##
+    # @fn   save(self, path)
+    #
+    # @brief    Writes the dictionary to a file.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    path    The file.
+    def save(self, path):
+        with open(path, "wb") as dictionary_file:
+            dictionary_file.write(bytes([self.codec]) + self.data)
+
+    ##
+    # @fn   load(path)
+    #
+    # @brief    Reads a dictionary written by save.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    path    The file.
+    #
+    # @return   The CompressionDictionary.
+    def load(path):
+        with open(path, "rb") as dictionary_file:
+            data = dictionary_file.read()
+        return CompressionDictionary(data[0], data[1:])
+
+    ##
+    # @fn   train(samples, codec = CODEC_ZLIB, size = DICTIONARY_SIZE)
+    #
+    # @brief    Trains a dictionary on sample pages.
+    #           zstd trains its own. For zlib, the pieces of markup found in the most samples are
+    #           packed in, the most common last (where they are cheapest to reference).
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    samples         List of sample pages (bytes), a few hundred at least.
+    # @param    optional codec  CODEC_ZLIB or CODEC_ZSTD.
+    # @param    optional size   Bytes of the dictionary.
+    #
+    # @return   The CompressionDictionary.
+    def train(samples, codec = CODEC_ZLIB, size = DICTIONARY_SIZE):
+        global DICTIONARY_SEGMENT, DICTIONARY_MAX_SEGMENT
+        if codec == CODEC_ZSTD:
+            CompressionHelper.require_codec(codec)
+            return CompressionDictionary(codec, zstandard.train_dictionary(size, samples).as_bytes())
+        counts = Counter()
+        for sample in samples:
+            counts.update(set(segment for segment in DICTIONARY_SEGMENT.findall(sample) if len(segment) <= DICTIONARY_MAX_SEGMENT))
+        # Pieces are scored by the bytes they would save over all the samples.
+        scored = sorted(((count * len(segment), segment) for segment, count in counts.items() if count > 1), reverse = True)
+        picked = []
+        total = 0
+        for score, segment in scored:
+            if total + len(segment) > size:
+                continue
+            picked.append(segment)
+            total += len(segment)
+        return CompressionDictionary(codec, b"".join(reversed(picked)))
+
+##
+# @class    StreamCompressor
+#
+# @brief    Compresses data handed over in pieces. The output starts with the header that
+#           decompress_data and StreamDecompressor read the codec from.
+#
+# @author   agent
+# @date 10/17/2026
+class StreamCompressor:
+
+    ##
+    # @fn   __init__(self, codec, level, dictionary = None)
+    #
+    # @brief    Class initializer.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self                The class instance that this method operates on.
+    # @param    codec               One of the CODEC_* values.
+    # @param    level               A tier (LEVEL_FAST, LEVEL_DEFAULT, LEVEL_BEST) or a level of the codec.
+    # @param    optional dictionary CompressionDictionary to compress with.
+    def __init__(self, codec, level, dictionary = None):
+        global MAGIC, FLAG_DICTIONARY
+        CompressionHelper.require_codec(codec)
+        level = CompressionHelper.codec_level(codec, level)
+        if dictionary is not None and dictionary.codec != codec:
+            raise ValueError("Dictionary of codec {} used with codec {}".format(dictionary.codec, codec))
+        self.header = MAGIC + bytes([codec, FLAG_DICTIONARY if dictionary is not None else 0])
+        if dictionary is not None:
+            self.header += struct.pack(">I", dictionary.id)
+        if codec == CODEC_ZLIB:
+            if dictionary is not None:
+                self.compressor = zlib.compressobj(level, zdict = dictionary.data)
+            else:
+                self.compressor = zlib.compressobj(level)
+        elif codec == CODEC_LZMA:
+            self.compressor = lzma.LZMACompressor(preset = level)
+        elif codec == CODEC_BZ2:
+            self.compressor = bz2.BZ2Compressor(level)
+        elif codec == CODEC_ZSTD:
+            zstd_dictionary = dictionary.zstd_data if dictionary is not None else None
+            self.compressor = zstandard.ZstdCompressor(level = level, dict_data = zstd_dictionary).compressobj()
+        else:
+            self.compressor = None
+
+    ##
+    # @fn   compress(self, data)
+    #
+    # @brief    Compresses the next piece.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    data    The bytes.
+    #
+    # @return   Compressed bytes (possibly none yet).
+    def compress(self, data):
+        output = self.compressor.compress(data) if self.compressor is not None else data
+        if self.header is not None:
+            output = self.header + output
+            self.header = None
+        return output
+
+    ##
+    # @fn   flush(self)
+    #
+    # @brief    Ends the stream.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    #
+    # @return   The remaining compressed bytes.
+    def flush(self):
+        output = self.compress(b"")
+        if self.compressor is not None:
+            output += self.compressor.flush()
+        return output
+
+##
+# @class    StreamDecompressor
+#
+# @brief    Decompresses data handed over in pieces, reading the codec (and dictionary) from the
+#           header. Streams without a header are legacy zlib blobs.
+#
+# @author   agent
+# @date 10/17/2026
+class StreamDecompressor:
+
+    ##
+    # @fn   __init__(self)
+    #
+    # @brief    Class initializer.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def __init__(self):
+        self.pending = b""          #< Bytes kept until the whole header arrived.
+        self.codec = None
+        self.decompressor = None
+
+    ##
+    # @fn   decompress(self, data)
+    #
+    # @brief    Decompresses the next piece.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    data    The compressed bytes.
+    #
+    # @return   Decompressed bytes (possibly none yet).
+    def decompress(self, data):
+        if self.codec is None:
+            self.pending += data
+            data = self.__read_header()
+            if self.codec is None:
+                return b""
+        if self.decompressor is None:
+            return data
+        return self.decompressor.decompress(data)
+
+    ##
+    # @fn   flush(self)
+    #
+    # @brief    Ends the stream.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    #
+    # @return   The remaining decompressed bytes.
+    def flush(self):
+        if self.codec is None:
+            if len(self.pending) > 0:
+                raise ValueError("Compressed data ends inside its header")
+            return b""
+        if self.decompressor is None:
+            return b""
+        remaining = self.decompressor.flush() if self.codec == CODEC_ZLIB else b""
+        # Older zstandard releases do not tell where the frame ends.
+        if not getattr(self.decompressor, "eof", True):
+            if self.codec == CODEC_ZLIB:
+                # What zlib.decompress raised on legacy blobs.
+                raise zlib.error("Error -5 while decompressing data: incomplete or truncated stream")
+            raise ValueError("Compressed data is truncated")
+        return remaining
+
+    ##
+    # @fn   __read_header(self)
+    #
+    # @brief    Sets up the decompressor once the header is complete.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    #
+    # @return   The bytes following the header ("" if it is still incomplete).
+    def __read_header(self):
+        global MAGIC, FLAG_DICTIONARY
+        data = self.pending
+        if len(data) < len(MAGIC) or (len(data) < 4 and data.startswith(MAGIC)):
+            return b""
+        if not data.startswith(MAGIC):
+            # A legacy blob, a bare zlib stream.
+            self.codec = CODEC_ZLIB
+            self.decompressor = zlib.decompressobj()
+            self.pending = b""
+            return data
+        codec = data[2]
+        flags = data[3]
+        start = 4
+        dictionary = None
+        if flags & FLAG_DICTIONARY:
+            if len(data) < 8:
+                return b""
+            dictionary_id = struct.unpack(">I", data[4:8])[0]
+            dictionary = CompressionHelper.dictionaries.get(dictionary_id)
+            if dictionary is None:
+                raise ValueError("Unknown compression dictionary: {}".format(dictionary_id))
+            start = 8
+        CompressionHelper.require_codec(codec)
+        if codec == CODEC_ZLIB:
+            if dictionary is not None:
+                self.decompressor = zlib.decompressobj(zdict = dictionary.data)
+            else:
+                self.decompressor = zlib.decompressobj()
+        elif codec == CODEC_LZMA:
+            self.decompressor = lzma.LZMADecompressor()
+        elif codec == CODEC_BZ2:
+            self.decompressor = bz2.BZ2Decompressor()
+        elif codec == CODEC_ZSTD:
+            zstd_dictionary = dictionary.zstd_data if dictionary is not None else None
+            self.decompressor = zstandard.ZstdDecompressor(dict_data = zstd_dictionary).decompressobj()
+        self.codec = codec
+        self.pending = b""
+        return data[start:]
 
 ##
 # @class    CompressionHelper
 #
 # @brief    Class that helps with compression throughout search engine.
+#           Blobs start with a small header naming their codec (and dictionary), so the codec
+#           and level can change without breaking what was stored before; blobs from before the
+#           header existed decode as zlib.
 #
 # @author   Edward Callahan
 # @date 6/16/2016
 class CompressionHelper:
-    DATA_COMPRESSION_LEVEL = 9 #< Max compression level.
+    DATA_CODEC = CODEC_ZLIB             #< Codec used when none is given. zstd is opt-in: hosts without the
+                                        #  zstandard package can not read what it writes.
+    DATA_COMPRESSION_LEVEL = LEVEL_FAST #< Tier used when none is given (level 9 zlib cost a lot of CPU for little).
+    dictionaries = {}                   #< Dictionary of id -> CompressionDictionary known to the decompressors.
 
     ##
-    # @fn   compress_data(data)
+    # @fn   compress_data(data, codec = None, level = None, dictionary = None)
     #
     # @brief    Compress data for caching.
+    #           Data the codec can not shrink is stored as is.
     #
     # @author   Edward Callahan
     # @date 6/16/2016
     #
-    # @param    data    The data to compress.
-    def compress_data(data):
-        return zlib.compress(data, CompressionHelper.DATA_COMPRESSION_LEVEL)
+    # @param    data                The data to compress.
+    # @param    optional codec      One of the CODEC_* values, DATA_CODEC if None.
+    # @param    optional level      A tier or a level of the codec, DATA_COMPRESSION_LEVEL if None.
+    # @param    optional dictionary CompressionDictionary to compress with (its codec is used).
+    def compress_data(data, codec = None, level = None, dictionary = None):
+        if dictionary is not None:
+            codec = dictionary.codec
+            CompressionHelper.register_dictionary(dictionary)
+        compressor = CompressionHelper.compressor(codec, level, dictionary)
+        compressed = compressor.compress(data) + compressor.flush()
+        if len(compressed) > len(data) + len(MAGIC) + 2:
+            return StreamCompressor(CODEC_NONE, None).compress(data)
+        return compressed
 
     ##
     # @fn   decompress_data(orig)
@@ -32,4 +394,78 @@ class CompressionHelper:
     #
     # @param    orig    The compressed data.
     def decompress_data(orig):
-        return zlib.decompress(orig)
\ No newline at end of file
+        decompressor = StreamDecompressor()
+        return decompressor.decompress(orig) + decompressor.flush()
+
+    ##
+    # @fn   compressor(codec = None, level = None, dictionary = None)
+    #
+    # @brief    Gets a StreamCompressor, to compress data too large to hold in memory at once.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    optional codec      One of the CODEC_* values, DATA_CODEC if None.
+    # @param    optional level      A tier or a level of the codec, DATA_COMPRESSION_LEVEL if None.
+    # @param    optional dictionary CompressionDictionary to compress with.
+    def compressor(codec = None, level = None, dictionary = None):
+        if codec is None:
+            codec = CompressionHelper.DATA_CODEC
+        if level is None:
+            level = CompressionHelper.DATA_COMPRESSION_LEVEL
+        return StreamCompressor(codec, level, dictionary)
+
+    ##
+    # @fn   decompressor()
+    #
+    # @brief    Gets a StreamDecompressor for data written by compress_data or a StreamCompressor.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    def decompressor():
+        return StreamDecompressor()
+
+    ##
+    # @fn   register_dictionary(dictionary)
+    #
+    # @brief    Makes a dictionary known to the decompressors.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    dictionary  The CompressionDictionary.
+    def register_dictionary(dictionary):
+        CompressionHelper.dictionaries[dictionary.id] = dictionary
+
+    ##
+    # @fn   codec_level(codec, level)
+    #
+    # @brief    Gets the level of a codec for a tier.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    codec   One of the CODEC_* values.
+    # @param    level   A tier, or already a level of the codec.
+    def codec_level(codec, level):
+        global LEVELS
+        if codec not in LEVELS:
+            return None
+        if isinstance(level, str):
+            return LEVELS[codec][level]
+        return level
+
+    ##
+    # @fn   require_codec(codec)
+    #
+    # @brief    Checks that a codec can be used here.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    codec   One of the CODEC_* values.
+    def require_codec(codec):
+        if codec not in CODEC_NAMES.values():
+            raise ValueError("Unknown compression codec: {}".format(codec))
+        if codec == CODEC_ZSTD and zstandard is None:
+            raise ImportError("zstandard is not installed")
@@ -0,0 +1,8 @@
+__all__ = [
+    "NearDuplicateIndex",
+    "simhash",
+    "index"
+]
+
+from searchengine.dedup.simhash import simhash, hamming_distance, band_keys, fingerprint_fields
+from searchengine.dedup.index import NearDuplicateIndex, fold_duplicates
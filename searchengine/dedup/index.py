@@ -0,0 +1,185 @@
+import pysolr
+import searchengine.debugtools
+from collections import OrderedDict
+from searchengine.dedup.simhash import hamming_distance, band_keys
+
+MAX_DISTANCE = 3            #< Bits two fingerprints may differ in for their pages to be near-duplicates.
+CANDIDATE_ROWS = 100        #< Docs sharing a band with a page that are compared with it.
+RECENT_SIZE = 10000         #< Fingerprints posted by this process kept in memory (solr only sees them after a commit).
+ALTERNATE_ROWS = 10000      #< Duplicates looked up per delta merge batch when folding.
+DUPLICATE_ACTION = "fold"   #< What the delta merge does with a near-duplicate: "skip" leaves it out of the main
+                            #  core, "fold" also lists its id in the alternate_urls of its canonical doc.
+
+##
+# @class    NearDuplicateIndex
+#
+# @brief    Finds the canonical doc of a page that is a near-duplicate of one crawled before.
+#           Fingerprints are looked up by their bands (the simhash_bands field of the working
+#           core, and the fingerprints this process posted recently), and candidates are only
+#           kept if they are within max_distance bits. A page matching a doc that is itself a
+#           duplicate is folded into that doc's canonical, so chains never form.
+#
+# @author   agent
+# @date 10/17/2026
+class NearDuplicateIndex:
+
+    ##
+    # @fn   __init__(self, solr, max_distance = MAX_DISTANCE, recent_size = RECENT_SIZE)
+    #
+    # @brief    Class initializer.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self                    The class instance that this method operates on.
+    # @param    solr                    The working core.
+    # @param    optional max_distance   Bits two near-duplicates may differ in.
+    # @param    optional recent_size    Fingerprints kept in memory.
+    def __init__(self, solr, max_distance = MAX_DISTANCE, recent_size = RECENT_SIZE):
+        self.solr = solr
+        self.max_distance = max_distance
+        self.recent_size = recent_size
+        self.recent = OrderedDict() #< Dictionary of id -> (fingerprint, canonical id or None), oldest first.
+        self.bands = {}             #< Dictionary of band key -> set of ids in recent.
+
+    ##
+    # @fn   find(self, doc_id, fingerprint)
+    #
+    # @brief    Gets the canonical doc a page is a near-duplicate of.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self        The class instance that this method operates on.
+    # @param    doc_id      The id of the page.
+    # @param    fingerprint The SimHash of the page.
+    #
+    # @return   The id of the canonical doc, None if the page is not a duplicate.
+    def find(self, doc_id, fingerprint):
+        keys = band_keys(fingerprint)
+        candidates = {}
+        for key in keys:
+            for candidate_id in self.bands.get(key, ()):
+                candidates[candidate_id] = self.recent[candidate_id]
+        try:
+            response = self.solr.search(
+                "simhash_bands:(" + " OR ".join('"' + key + '"' for key in keys) + ")",
+                rows = CANDIDATE_ROWS,
+                fl = "id,simhash,duplicate_of"
+            )
+            for doc in response.docs:
+                if "simhash" in doc and doc["id"] not in candidates:
+                    candidates[doc["id"]] = (int(doc["simhash"], 16), doc.get("duplicate_of"))
+        except pysolr.SolrError as ex:
+            # Still checking against the recent fingerprints, a page indexed twice is not fatal.
+            searchengine.debugtools.log_exception(ex)
+
+        best = None
+        best_distance = self.max_distance + 1
+        for candidate_id, (candidate_fingerprint, canonical) in candidates.items():
+            canonical = canonical or candidate_id
+            if candidate_id == doc_id or canonical == doc_id:
+                continue
+            distance = hamming_distance(fingerprint, candidate_fingerprint)
+            if distance < best_distance or (best is not None and distance == best_distance and canonical < best):
+                best = canonical
+                best_distance = distance
+        return best
+
+    ##
+    # @fn   remember(self, doc_id, fingerprint, canonical)
+    #
+    # @brief    Keeps the fingerprint of a page that was just posted, so pages crawled before the
+    #           next solr commit are still compared with it.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self        The class instance that this method operates on.
+    # @param    doc_id      The id of the page.
+    # @param    fingerprint The SimHash of the page.
+    # @param    canonical   The id of the doc it duplicates, None if it is canonical itself.
+    def remember(self, doc_id, fingerprint, canonical):
+        self.__forget(doc_id)
+        self.recent[doc_id] = (fingerprint, canonical)
+        for key in band_keys(fingerprint):
+            self.bands.setdefault(key, set()).add(doc_id)
+        while len(self.recent) > self.recent_size:
+            self.__forget(next(iter(self.recent)))
+
+    ##
+    # @fn   __forget(self, doc_id)
+    #
+    # @brief    Drops a page from the recent fingerprints.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    doc_id  The id of the page.
+    def __forget(self, doc_id):
+        entry = self.recent.pop(doc_id, None)
+        if entry is None:
+            return
+        for key in band_keys(entry[0]):
+            ids = self.bands[key]
+            ids.discard(doc_id)
+            if len(ids) == 0:
+                del self.bands[key]
+
+##
+# @fn   fold_duplicates(solr_working, solr_main, main_docs, duplicate_docs)
+#
+# @brief    Lists the ids of near-duplicates in the alternate_urls field of their canonical docs.
+#           Docs about to be added to the main core get the field set directly. Canonical docs
+#           already in the main core get an atomic update, which the caller adds after main_docs
+#           (canonical docs not in the main core yet get the field when they are merged).
+#
+# @author   agent
+# @date 10/17/2026
+#
+# @param    solr_working    The working core.
+# @param    solr_main       The main core.
+# @param    main_docs       List of docs about to be added to the main core (changed in place).
+# @param    duplicate_docs  List of working core docs that are near-duplicates.
+#
+# @return   List of atomic updates of the alternate_urls field for the main core.
+def fold_duplicates(solr_working, solr_main, main_docs, duplicate_docs):
+    global ALTERNATE_ROWS
+    merged_ids = set(doc["id"] for doc in main_docs)
+    other_ids = set(doc["duplicate_of"] for doc in duplicate_docs) - merged_ids
+    if len(merged_ids) + len(other_ids) == 0:
+        return []
+    response = solr_working.search(
+        id_query("duplicate_of", merged_ids | other_ids),
+        rows = ALTERNATE_ROWS,
+        fl = "id,duplicate_of"
+    )
+    alternates = {}
+    for doc in response.docs:
+        alternates.setdefault(doc["duplicate_of"], []).append(doc["id"])
+    for doc in main_docs:
+        if doc["id"] in alternates:
+            doc["alternate_urls"] = sorted(alternates[doc["id"]])
+    other_ids = [canonical for canonical in other_ids if canonical in alternates]
+    if len(other_ids) == 0:
+        return []
+    # Only updating canonical docs that exist, an atomic update would create the others.
+    existing = solr_main.search(id_query("id", other_ids), rows = len(other_ids), fl = "id")
+    return [{ "id" : doc["id"], "alternate_urls" : sorted(alternates[doc["id"]]) } for doc in existing.docs]
+
+##
+# @fn   id_query(field, values)
+#
+# @brief    Builds a query matching any of a set of exact values of a field.
+#
+# @author   agent
+# @date 10/17/2026
+#
+# @param    field   The field.
+# @param    values  Iterable of values.
+#
+# @return   The query string.
+def id_query(field, values):
+    quoted = ['"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"' for value in values]
+    return field + ":(" + " OR ".join(quoted) + ")"
@@ -0,0 +1,94 @@
+import hashlib
+from collections import Counter
+
+FINGERPRINT_BITS = 64   #< Bits of a fingerprint.
+SHINGLE_SIZE = 2        #< Words per feature hashed into a fingerprint.
+BANDS = 4               #< Pieces a fingerprint is split into for lookups. Fingerprints at most
+                        #  BANDS - 1 bits apart always have at least one band in common.
+MIN_TOKENS = 30         #< Words a page needs before it is fingerprinted (short pages collide too easily).
+
+##
+# @fn   simhash(tokens, shingle_size = SHINGLE_SIZE)
+#
+# @brief    Computes the 64 bit SimHash fingerprint of a token stream.
+#           Every shingle of shingle_size words is hashed, and each bit of the fingerprint is set
+#           if the shingles with that bit set outweigh the ones without it (a shingle weighs as
+#           much as the times it occurs). Pages that differ in a few words end up a few bits apart.
+#           The bit counts are summed per byte value first, so the cost per shingle is one hash
+#           and eight additions instead of 64.
+#
+# @author   agent
+# @date 10/17/2026
+#
+# @param    tokens                  List of words (see WebCrawler.split_key_words).
+# @param    optional shingle_size   Words per feature.
+#
+# @return   The fingerprint, as an int.
+def simhash(tokens, shingle_size = SHINGLE_SIZE):
+    global FINGERPRINT_BITS
+    features = Counter(" ".join(tokens[i:i + shingle_size]) for i in range(max(len(tokens) - shingle_size + 1, 1)))
+    byte_count = FINGERPRINT_BITS // 8
+    histograms = [[0] * 256 for i in range(byte_count)]
+    total = 0
+    for feature, weight in features.items():
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size = byte_count).digest()
+        for position, value in enumerate(digest):
+            histograms[position][value] += weight
+        total += weight
+    fingerprint = 0
+    for position, histogram in enumerate(histograms):
+        for bit in range(8):
+            mask = 1 << bit
+            weight = sum(count for value, count in enumerate(histogram) if value & mask)
+            if weight * 2 > total:
+                fingerprint |= 1 << (position * 8 + bit)
+    return fingerprint
+
+##
+# @fn   hamming_distance(a, b)
+#
+# @brief    Counts the bits two fingerprints differ in.
+#
+# @author   agent
+# @date 10/17/2026
+#
+# @param    a   A fingerprint.
+# @param    b   Another fingerprint.
+def hamming_distance(a, b):
+    return bin(a ^ b).count("1")
+
+##
+# @fn   band_keys(fingerprint)
+#
+# @brief    Splits a fingerprint into its bands, e.g. ["0:1f2e", "1:03aa", "2:9c01", "3:ffe0"].
+#           The band number is part of the key, so equal bits in different places do not match.
+#
+# @author   agent
+# @date 10/17/2026
+#
+# @param    fingerprint The fingerprint.
+#
+# @return   List of BANDS strings.
+def band_keys(fingerprint):
+    global FINGERPRINT_BITS, BANDS
+    band_bits = FINGERPRINT_BITS // BANDS
+    mask = (1 << band_bits) - 1
+    return ["{}:{:0{}x}".format(band, (fingerprint >> (band * band_bits)) & mask, band_bits // 4) for band in range(BANDS)]
+
+##
+# @fn   fingerprint_fields(fingerprint)
+#
+# @brief    Gets the solr fields a fingerprint is stored in.
+#
+# @author   agent
+# @date 10/17/2026
+#
+# @param    fingerprint The fingerprint.
+#
+# @return   Dictionary with the "simhash" (hex) and "simhash_bands" (list of band keys) fields.
+def fingerprint_fields(fingerprint):
+    global FINGERPRINT_BITS
+    return {
+        "simhash"       : "{:0{}x}".format(fingerprint, FINGERPRINT_BITS // 4),
+        "simhash_bands" : band_keys(fingerprint)
+    }
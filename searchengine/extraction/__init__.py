@@ -0,0 +1,7 @@
+__all__ = [
+    "ExtractionEngine",
+    "engine",
+    "benchmark"
+]
+
+from searchengine.extraction.engine import ExtractionEngine, BACKEND_LXML, BACKEND_HTMLPARSER, DEFAULT_BACKEND
@@ -0,0 +1,173 @@
+import sys
+import time
+import random
+from html.parser import HTMLParser
+from searchengine.extraction.engine import ExtractionEngine, BACKEND_LXML, BACKEND_HTMLPARSER, etree
+
+CHUNK_SIZE = 64 * 1024  #< Characters fed at a time, like pages streamed by the crawler.
+MIN_SECONDS = 2         #< Time each parser is run for.
+
+##
+# @class    LegacyParser
+#
+# @brief    The HTMLParser subclass the crawler used before the ExtractionEngine, kept as the
+#           baseline of the benchmark (including the list of skipped tags it built per text node
+#           and the tag queue that never shrank).
+#
+# @author   agent
+# @date 10/17/2026
+class LegacyParser(HTMLParser):
+
+    def __init__(self):
+        HTMLParser.__init__(self)
+        self.tagQueue = []
+        self.title = ""
+        self.content = ""
+        self.urls = []
+
+    def handle_starttag(self, tag, attrs):
+        self.tagQueue.append(tag)
+        if tag == "a":
+            for attr in attrs:
+                if attr[0] == "href":
+                    self.urls.append(attr[1])
+
+    def handle_data(self, data):
+        if len(self.tagQueue) == 0:
+            return
+        if self.tagQueue[-1] == "title":
+            self.title += data
+        disallowedTags = [
+            "title", "input", "textarea", "button", "select", "optgroup", "option", "fieldset",
+            "output", "keygen", "datalist", "frame", "frameset", "noframes", "iframe", "img",
+            "map", "area", "canvas", "figcaption", "figure", "audio", "source", "track", "video",
+            "style", "link", "meta", "base", "script", "noscript", "applet", "embed", "object",
+            "param"
+        ]
+        if self.tagQueue[-1] not in disallowedTags:
+            self.content += data
+
+##
+# @class    BenchmarkParser
+#
+# @brief    ExtractionEngine collecting the same things as LegacyParser.
+#
+# @author   agent
+# @date 10/17/2026
+class BenchmarkParser(ExtractionEngine):
+
+    def __init__(self, backend):
+        ExtractionEngine.__init__(self, backend)
+        self.title_chunks = []
+        self.content_chunks = []
+        self.urls = []
+
+    def found_url(self, url):
+        self.urls.append(url)
+
+    def found_title(self, title):
+        self.title_chunks.append(title)
+
+    def found_content(self, content):
+        self.content_chunks.append(content)
+
+    def close(self):
+        ExtractionEngine.close(self)
+        self.title = "".join(self.title_chunks)
+        self.content = "".join(self.content_chunks)
+
+##
+# @fn   sample_page(seed)
+#
+# @brief    Generates a page shaped like a typical article: navigation, inline scripts and
+#           styles, a form, images and a few hundred paragraphs with links.
+#
+# @author   agent
+# @date 10/17/2026
+#
+# @param    seed    Seed of the random words.
+#
+# @return   The markup.
+def sample_page(seed):
+    rand = random.Random(seed)
+    words = ["search", "engine", "crawler", "index", "page", "solr", "query", "result", "link", "text"]
+    sentence = lambda count: " ".join(rand.choice(words) for i in range(count))
+    parts = ["<!DOCTYPE html><html><head><title>", sentence(6), "</title>",
+             '<meta name="description" content="', sentence(20), '">',
+             "<style>body { margin: 0 } .nav a { color: #333 }</style>",
+             "<script>var config = { tracking: true, ids: [1, 2, 3] };</script></head><body>",
+             '<div class="nav"><ul>']
+    for i in range(40):
+        parts.append('<li><a href="/section/{}">{}</a></li>'.format(i, sentence(2)))
+    parts.append("</ul></div><form><input name=q><select><option>a<option>b</select><button>Go</button></form>")
+    for i in range(300):
+        parts.append('<p class="text">{} <a href="/article/{}">{}</a> <b>{}</b> {}<br></p>'.format(
+            sentence(25), i, sentence(3), sentence(2), sentence(15)))
+        if i % 25 == 0:
+            parts.append('<figure><img src="/img/{}.png"><figcaption>{}</figcaption></figure>'.format(i, sentence(5)))
+            parts.append("<script>track({});</script>".format(i))
+    parts.append("</body></html>")
+    return "".join(parts)
+
+##
+# @fn   run_parser(make_parser, pages)
+#
+# @brief    Parses the pages over and over for MIN_SECONDS.
+#
+# @author   agent
+# @date 10/17/2026
+#
+# @param    make_parser Function returning a new parser.
+# @param    pages       List of page markup.
+#
+# @return   (pages per second, megabytes per second)
+def run_parser(make_parser, pages):
+    global CHUNK_SIZE, MIN_SECONDS
+    parsed = 0
+    characters = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < MIN_SECONDS:
+        for page in pages:
+            parser = make_parser()
+            for i in range(0, len(page), CHUNK_SIZE):
+                parser.feed(page[i:i + CHUNK_SIZE])
+            parser.close()
+            parsed += 1
+            characters += len(page)
+    elapsed = time.perf_counter() - start
+    return parsed / elapsed, characters / elapsed / (1024 * 1024)
+
+##
+# @fn   main(paths)
+#
+# @brief    Prints the throughput of the legacy parser and of every available engine backend.
+#
+# @author   agent
+# @date 10/17/2026
+#
+# @param    paths   Html files to parse, the generated sample pages if empty.
+def main(paths):
+    if len(paths) > 0:
+        pages = []
+        for page_path in paths:
+            with open(page_path, "rb") as page_file:
+                pages.append(page_file.read().decode("utf-8", errors = "replace"))
+    else:
+        pages = [sample_page(seed) for seed in range(10)]
+    print("{} pages, {:,} characters on average".format(len(pages), sum(len(page) for page in pages) // len(pages)))
+    parsers = [
+        ("legacy HTMLParser", LegacyParser),
+        ("engine (html.parser)", lambda: BenchmarkParser(BACKEND_HTMLPARSER))
+    ]
+    if etree is not None:
+        parsers.append(("engine (lxml)", lambda: BenchmarkParser(BACKEND_LXML)))
+    else:
+        print("lxml is not installed, skipping the lxml backend.")
+    baseline = None
+    for name, make_parser in parsers:
+        pages_per_second, megabytes_per_second = run_parser(make_parser, pages)
+        baseline = baseline or pages_per_second
+        print("{:<22} {:>9.1f} pages/s {:>7.2f} MB/s {:>6.2f}x".format(name, pages_per_second, megabytes_per_second, pages_per_second / baseline))
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
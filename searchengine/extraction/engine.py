@@ -0,0 +1,402 @@
+from html.parser import HTMLParser
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None    #< lxml is optional, html.parser is used without it.
+
+SKIPPED_TAGS = frozenset([
+    # Title (disabled because it is used for other purposes in ranking)
+    "title",
+
+    # Form tags
+    "input",
+    "textarea",
+    "button",
+    "select",
+    "optgroup",
+    "option",
+    "fieldset",
+    "output",
+    "keygen",
+    "datalist",
+
+    # Frame tags
+    "frame",
+    "frameset",
+    "noframes",
+    "iframe",
+
+    # Image tags
+    "img",
+    "map",
+    "area",
+    "canvas",
+    "figcaption",
+    "figure",
+
+    # Playable media tags
+    "audio",
+    "source",
+    "track",
+    "video",
+
+    # Style and semantic tags
+    "style",
+    "link",
+
+    # Meta info
+    "meta",
+    "base",
+
+    # Programming tags
+    "script",
+    "noscript",
+    "applet",
+    "embed",
+    "object",
+    "param"
+])  #< Tags whose text (and the text of everything inside them) is not page content.
+
+VOID_TAGS = frozenset([
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen",
+    "link", "meta", "param", "source", "track", "wbr"
+])  #< Tags that never have an end tag, so they are never put on the tag stack.
+
+MAX_TAG_DEPTH = 512 #< Open tags tracked before further (unclosed) tags are ignored.
+
+BACKEND_LXML = "lxml"
+BACKEND_HTMLPARSER = "html.parser"
+DEFAULT_BACKEND = BACKEND_LXML if etree is not None else BACKEND_HTMLPARSER
+
+##
+# @class    ExtractionEngine
+#
+# @brief    Streaming HTML extraction shared by the crawler and the indexer.
+#           Markup is fed in chunks to a tokenizer backend (lxml's libxml2 parser when lxml is
+#           installed, html.parser otherwise), which reports tags and text back here. Open tags
+#           are kept on a stack that end tags unwind, so text after a </script> or an <img> is
+#           content again, and text is skipped while any SKIPPED_TAGS element is open.
+#           Whatever is found is reported through the found_* methods, which child classes
+#           override.
+#
+# @author   agent
+# @date 10/17/2026
+class ExtractionEngine:
+
+    ##
+    # @fn   __init__(self, backend = None)
+    #
+    # @brief    Class initializer.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self                The class instance that this method operates on.
+    # @param    optional backend    BACKEND_LXML or BACKEND_HTMLPARSER, None for DEFAULT_BACKEND.
+    def __init__(self, backend = None):
+        self.backend_name = backend if backend is not None else DEFAULT_BACKEND
+        if self.backend_name == BACKEND_LXML and etree is None:
+            raise ImportError("lxml is not installed")
+        self.reset()
+
+    ##
+    # @fn   reset(self)
+    #
+    # @brief    Forgets any document fed so far, so the engine can parse the next one.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def reset(self):
+        self.tag_stack = []
+        self.skip_depth = 0     #< Number of SKIPPED_TAGS on the tag stack.
+        if self.backend_name == BACKEND_LXML:
+            self.backend = etree.HTMLParser(target = LxmlTarget(self), recover = True)
+        else:
+            self.backend = HtmlParserBackend(self)
+
+    ##
+    # @fn   feed(self, data)
+    #
+    # @brief    Parses the next chunk of the document.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    data    The markup (str).
+    def feed(self, data):
+        self.backend.feed(data)
+
+    ##
+    # @fn   close(self)
+    #
+    # @brief    Parses whatever the backend still buffers once the whole document was fed.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def close(self):
+        if self.backend_name != BACKEND_LXML:
+            self.backend.close()
+            return
+        try:
+            self.backend.close()
+        except etree.LxmlError:
+            # libxml2 gives up on documents with nothing it can parse, there is nothing to report then.
+            pass
+
+    ##
+    # @fn   handle_starttag(self, tag, attrs)
+    #
+    # @brief    Called by the backend for an opening tag.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    tag     The tag name (lower case).
+    # @param    attrs   The attributes, as a dictionary or a list of (name, value) pairs.
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            url = dict(attrs).get("href")
+            if url is not None:
+                self.found_url(url)
+        elif tag == "img":
+            url = dict(attrs).get("src")
+            if url is not None:
+                self.found_image(url)
+        elif tag == "meta":
+            attrs = dict(attrs)
+            name = attrs.get("name")
+            content = attrs.get("content")
+            if name is not None and content is not None:
+                self.found_meta_name_content_pair(name, content)
+        if tag in VOID_TAGS:
+            return
+        if tag in SKIPPED_TAGS:
+            self.skip_depth += 1
+        elif len(self.tag_stack) >= MAX_TAG_DEPTH:
+            return
+        self.tag_stack.append(tag)
+
+    ##
+    # @fn   handle_endtag(self, tag)
+    #
+    # @brief    Called by the backend for an ending tag. Closes the innermost open tag with that
+    #           name and every tag opened inside it; end tags that match no open tag are ignored.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    tag     The tag name (lower case).
+    def handle_endtag(self, tag):
+        stack = self.tag_stack
+        if len(stack) > 0 and stack[-1] == tag:
+            # The common case, a properly nested document.
+            stack.pop()
+            if tag in SKIPPED_TAGS:
+                self.skip_depth -= 1
+            return
+        if tag in VOID_TAGS:
+            return
+        for i in range(len(stack) - 2, -1, -1):
+            if stack[i] == tag:
+                for closed in stack[i:]:
+                    if closed in SKIPPED_TAGS:
+                        self.skip_depth -= 1
+                del stack[i:]
+                return
+
+    ##
+    # @fn   handle_data(self, data)
+    #
+    # @brief    Called by the backend for the text between tags.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    data    The text.
+    def handle_data(self, data):
+        stack = self.tag_stack
+        if len(stack) == 0:
+            return # Text outside of any tag is not part of the page
+        if stack[-1] == "title":
+            self.found_title(data)
+        elif self.skip_depth == 0:
+            self.found_content(data)
+
+    # ======================================================
+    # Abstract Functions
+    # ======================================================
+
+    ##
+    # @fn   found_url(self, url)
+    #
+    # @brief    Executed any time we locate a URL.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    url     URL that was found.
+    def found_url(self, url):
+        pass
+
+    ##
+    # @fn   found_image(self, url)
+    #
+    # @brief    Executed when we find an image.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    url     The image source.
+    def found_image(self, url):
+        pass
+
+    ##
+    # @fn   found_content(self, content)
+    #
+    # @brief    Executed any time we locate content from inside tags.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    content The text.
+    def found_content(self, content):
+        pass
+
+    ##
+    # @fn   found_title(self, title)
+    #
+    # @brief    Executed any time we locate (a piece of) the title.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    title   The title text.
+    def found_title(self, title):
+        pass
+
+    ##
+    # @fn   found_meta_name_content_pair(self, name, content)
+    #
+    # @brief    Found a tag that is structured as followed <meta name="{}" content="{}" />
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    name    The name.
+    # @param    content The content.
+    def found_meta_name_content_pair(self, name, content):
+        pass
+
+##
+# @class    HtmlParserBackend
+#
+# @brief    Tokenizer backend built on the standard library's html.parser.
+#
+# @author   agent
+# @date 10/17/2026
+class HtmlParserBackend(HTMLParser):
+
+    ##
+    # @fn   __init__(self, engine)
+    #
+    # @brief    Class initializer.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    engine  The ExtractionEngine the tokens are reported to.
+    def __init__(self, engine):
+        HTMLParser.__init__(self)
+        # Bound directly, so every token costs a single call.
+        self.handle_starttag = engine.handle_starttag
+        self.handle_endtag = engine.handle_endtag
+        self.handle_data = engine.handle_data
+
+##
+# @class    LxmlTarget
+#
+# @brief    Parser target receiving the tokens of lxml's HTML parser (the libxml2 fast path).
+#
+# @author   agent
+# @date 10/17/2026
+class LxmlTarget:
+
+    ##
+    # @fn   __init__(self, engine)
+    #
+    # @brief    Class initializer.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    engine  The ExtractionEngine the tokens are reported to.
+    def __init__(self, engine):
+        self.engine = engine
+
+    ##
+    # @fn   start(self, tag, attrib)
+    #
+    # @brief    Called by lxml for an opening tag.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    tag     The tag name.
+    # @param    attrib  Dictionary of attributes.
+    def start(self, tag, attrib):
+        self.engine.handle_starttag(tag, attrib)
+
+    ##
+    # @fn   end(self, tag)
+    #
+    # @brief    Called by lxml for an ending tag.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    tag     The tag name.
+    def end(self, tag):
+        self.engine.handle_endtag(tag)
+
+    ##
+    # @fn   data(self, data)
+    #
+    # @brief    Called by lxml for text.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    data    The text.
+    def data(self, data):
+        self.engine.handle_data(data)
+
+    ##
+    # @fn   close(self)
+    #
+    # @brief    Called by lxml at the end of the document.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def close(self):
+        return None
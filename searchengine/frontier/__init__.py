@@ -0,0 +1,6 @@
+__all__ = [
+    "Frontier",
+    "frontier"
+]
+
+from searchengine.frontier.frontier import Frontier
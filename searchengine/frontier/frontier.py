@@ -0,0 +1,218 @@
+import os
+import json
+import searchengine
+from collections import deque
+
+FRONTIER_DIRECTORY = os.path.join(searchengine.DATA_DIRECTORY, "frontier") #< Default root for crawler frontiers.
+SEGMENT_SUFFIX = ".seg"
+
+##
+# @class    Frontier
+#
+# @brief    Persistent FIFO queue of urls waiting to be crawled.
+#           Entries are appended as json lines to numbered segment files on local disk. A small
+#           in-memory head is loaded from the oldest segment in large reads, and a cursor file
+#           records how far the queue has been consumed so a restarted crawler picks up where it
+#           stopped. Fully consumed segments are deleted.
+#
+# @author   agent
+# @date 10/17/2026
+class Frontier:
+
+    ##
+    # @fn   __init__(self, directory, segment_size = 4 * 1024 * 1024, head_size = 1000)
+    #
+    # @brief    Class initializer. Opens (or creates) the frontier stored in directory.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self                    The class instance that this method operates on.
+    # @param    directory               Directory holding the segments and cursor.
+    # @param    optional segment_size   Bytes written to a segment before starting a new one.
+    # @param    optional head_size      Entries loaded into memory per disk read.
+    def __init__(self, directory, segment_size = 4 * 1024 * 1024, head_size = 1000):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.head_size = head_size
+        self.head = deque()     #< Entries read from disk but not popped yet, as (entry, segment, end offset).
+        os.makedirs(directory, exist_ok = True)
+
+        segments = self.__list_segments()
+        self.read_segment, self.read_offset = self.__read_cursor()
+        if len(segments) > 0 and self.read_segment < segments[0]:
+            self.read_segment, self.read_offset = segments[0], 0
+        self.write_segment = segments[-1] if len(segments) > 0 else self.read_segment
+        self.writer = open(self.__segment_path(self.write_segment), "ab")
+
+    ##
+    # @fn   push(self, entries)
+    #
+    # @brief    Appends entries to the tail of the frontier.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    entries List of json serializable entries.
+    def push(self, entries):
+        if len(entries) == 0:
+            return
+        self.writer.write("".join(json.dumps(entry) + "\n" for entry in entries).encode("utf-8"))
+        self.writer.flush()
+        if self.writer.tell() >= self.segment_size:
+            self.writer.close()
+            self.write_segment += 1
+            self.writer = open(self.__segment_path(self.write_segment), "ab")
+
+    ##
+    # @fn   pop_batch(self, count)
+    #
+    # @brief    Removes up to count entries from the head of the frontier.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    count   Maximum number of entries to return.
+    #
+    # @return   List of entries (empty if the frontier is empty).
+    def pop_batch(self, count):
+        batch = []
+        last = None
+        while len(batch) < count:
+            if len(self.head) == 0 and not self.__load_head():
+                break
+            last = self.head.popleft()
+            batch.append(last[0])
+        if last is not None:
+            self.__write_cursor(last[1], last[2])
+        return batch
+
+    ##
+    # @fn   empty(self)
+    #
+    # @brief    Checks if there is nothing left to pop.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def empty(self):
+        if len(self.head) > 0:
+            return False
+        return self.read_segment == self.write_segment and self.read_offset >= self.writer.tell()
+
+    ##
+    # @fn   close(self)
+    #
+    # @brief    Closes the tail segment.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def close(self):
+        self.writer.close()
+
+    ##
+    # @fn   __load_head(self)
+    #
+    # @brief    Reads the next head_size entries from disk into the in-memory head.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    #
+    # @return   False if there was nothing left on disk.
+    def __load_head(self):
+        while True:
+            path = self.__segment_path(self.read_segment)
+            if os.path.exists(path):
+                with open(path, "rb") as segment:
+                    segment.seek(self.read_offset)
+                    while len(self.head) < self.head_size:
+                        line = segment.readline()
+                        if not line.endswith(b"\n"):
+                            break
+                        self.read_offset += len(line)
+                        try:
+                            entry = json.loads(line.decode("utf-8"))
+                        except ValueError:
+                            continue # Skipping lines damaged by a crash mid-write
+                        self.head.append((entry, self.read_segment, self.read_offset))
+            if len(self.head) > 0:
+                return True
+            if self.read_segment >= self.write_segment:
+                return False
+            # This segment is used up, moving on to the next one.
+            if os.path.exists(path):
+                os.remove(path)
+            self.read_segment += 1
+            self.read_offset = 0
+
+    ##
+    # @fn   __list_segments(self)
+    #
+    # @brief    Lists the segment numbers stored in the frontier directory, oldest first.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def __list_segments(self):
+        segments = []
+        for name in os.listdir(self.directory):
+            if name.endswith(SEGMENT_SUFFIX):
+                segments.append(int(name[:-len(SEGMENT_SUFFIX)]))
+        return sorted(segments)
+
+    ##
+    # @fn   __segment_path(self, segment)
+    #
+    # @brief    Gets the path of a segment file.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    segment The segment number.
+    def __segment_path(self, segment):
+        return os.path.join(self.directory, "{:08d}{}".format(segment, SEGMENT_SUFFIX))
+
+    ##
+    # @fn   __read_cursor(self)
+    #
+    # @brief    Reads the consumed position from the cursor file.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    #
+    # @return   (segment, offset)
+    def __read_cursor(self):
+        try:
+            with open(os.path.join(self.directory, "cursor"), "r") as cursor_file:
+                cursor = json.load(cursor_file)
+            return cursor["segment"], cursor["offset"]
+        except (IOError, ValueError, KeyError):
+            return 0, 0
+
+    ##
+    # @fn   __write_cursor(self, segment, offset)
+    #
+    # @brief    Saves the consumed position (written to a temp file then renamed so it is never torn).
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    segment The segment number.
+    # @param    offset  The offset just past the last consumed entry.
+    def __write_cursor(self, segment, offset):
+        path = os.path.join(self.directory, "cursor")
+        with open(path + ".tmp", "w") as cursor_file:
+            json.dump({ "segment" : segment, "offset" : offset }, cursor_file)
+        os.replace(path + ".tmp", path)
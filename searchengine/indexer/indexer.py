@@ -1,14 +1,15 @@
 ﻿from searchengine.database.connector import DatabaseConnector
 from searchengine.compression.compressionhelper import CompressionHelper
 from searchengine.indexer.parser import Parser
+from searchengine.analysis.analyzer import WHITESPACE_PATTERN
 from threading import Lock
 from concurrent.futures import ThreadPoolExecutor
 import searchengine.debugtools
 import time
-import re
-import pysolr
+import searchengine.analysis
+import searchengine.solr_tools
+from searchengine.solr_tools import BufferedSolrWriter
 
-SOLR_URL = "http://localhost:8983/solr/search_engine"
 SOLR_CORE = "search_engine"
 
 ##
@@ -115,13 +116,15 @@ class Indexer(Parser):
     # @param    self    The class instance that this method operates on.
     def __init__(self, indexer_executor, id):
         Parser.__init__(self)
-        global SOLR_URL
-        self.solr_instance = pysolr.Solr(SOLR_URL)
+        self.solr_instance = searchengine.solr_tools.get_solr_instance('main', id)
+        self.solr_writer = BufferedSolrWriter(self.solr_instance)
         self.meta_title = ""
         self.meta_description = ""
         self.meta_keywords = ""
         self.title = ""
         self.content = ""
+        self.title_chunks = []
+        self.content_chunks = []
         self.running = False
         self.indexer_executor = indexer_executor
         self.id = id
@@ -138,7 +141,6 @@ class Indexer(Parser):
     #
     # @param    self    The class instance that this method operates on.
     def __post_to_solr(self):
-        global SOLR_URL
         global SOLR_CORE
         if len(self.title) == 0 or len(self.content) == 0 or self.path_id is None or self.path_id < 1:
             return
@@ -150,8 +152,8 @@ class Indexer(Parser):
                 "title"            : self.meta_title if len(self.meta_title) > 0 else self.title,
                 "content"          : self.content
         }
-        self.solr_instance.add([doc])
-        self.solr_instance.optimize()
+        # Buffered and soft committed, the optimizer takes care of merging segments.
+        self.solr_writer.add([doc])
     ##
     # @fn   run(self)
     #
@@ -175,19 +177,23 @@ class Indexer(Parser):
                 try:
                     #decompressed = CompressionHelper.decompress_data(self.page_data).decode("utf-8")
                     self.feed(self.page_data.decode('utf-8'))
-                    self.cleanup_string(self.content)
-                    self.cleanup_string(self.title)
+                    self.close()
+                    self.title = "".join(self.title_chunks)
+                    self.content = "".join(self.content_chunks)
+                    self.title = self.cleanup_string(self.title)
                     self.content = " ".join(self.split_key_words(self.content))
                     self.__post_to_solr()
-
+                except Exception as ex:
+                    searchengine.debugtools.log_exception(ex)
+                finally:
                     # Cleanup
                     self.meta_title = ""
                     self.meta_description = ""
                     self.title = ""
                     self.content = ""
-                    self.tagQueue.clear()
-                except Exception as ex:
-                    searchengine.debugtools.log_exception(ex)
+                    self.title_chunks.clear()
+                    self.content_chunks.clear()
+                    self.reset()
 
     ##
     # @fn   get_cached_page(self)
@@ -215,8 +221,7 @@ class Indexer(Parser):
     # @param    self        The class instance that this method operates on.
     # @param    orig_string The string to clean up.
     def cleanup_string(self, orig_string):
-        regex = re.compile(r"[\s|[\\n]+]+") # Removing large groupings of white space as well as "\n" strings in text
-        return regex.sub(" ", orig_string)
+        return WHITESPACE_PATTERN.sub(" ", orig_string) # Removing large groupings of white space as well as "\n" strings in text
 
     ##
     # @fn   split_key_words(self, orig_string)
@@ -229,12 +234,7 @@ class Indexer(Parser):
     # @param    self        The class instance that this method operates on.
     # @param    orig_string The string to split.
     def split_key_words(self, orig_string):
-        all_words = re.findall(r"\w+", orig_string)
-
-        # Removing invalid words
-        all_words = [word.lower() for word in all_words if re.match("[A-Za-z]", word)]
-
-        return all_words
+        return searchengine.analysis.split_key_words(orig_string)
 
     ##
     # @fn   foundContent(self, content)
@@ -247,7 +247,7 @@ class Indexer(Parser):
     # @param    self    The class instance that this method operates on.
     # @param    content The content.
     def found_content(self, content):
-        self.content += content
+        self.content_chunks.append(content)
 
     ##
     # @fn   found_title(self, title)
@@ -260,7 +260,7 @@ class Indexer(Parser):
     # @param    self    The class instance that this method operates on.
     # @param    title   The title.
     def found_title(self, title):
-        self.title += title
+        self.title_chunks.append(title)
 
     ##
     # @fn   found_meta_name_content_pair(self, name, content)
@@ -1,3 +1,5 @@
-__all__ = ["ServerManager", "ClientManager"]
+__all__ = ["ServerManager", "ClientManager", "ClaimService", "RobotsStore"]
 
-from searchengine.manager.managers import ServerManager, ClientManager
\ No newline at end of file
+from searchengine.manager.managers import ServerManager, ClientManager
+from searchengine.manager.claims import ClaimService
+from searchengine.manager.robotsstore import RobotsStore
\ No newline at end of file
@@ -0,0 +1,211 @@
+import time
+import threading
+import searchengine.debugtools
+import searchengine.solr_tools
+from collections import deque
+from searchengine.solr_tools import VALIDATOR_FIELDS, REVISIT_FIELDS
+from searchengine.solr_tools.writer import BufferedSolrWriter
+
+LEASE_TIME = 60 * 60        #< Default seconds a worker may hold claimed urls before they are handed out again.
+REFILL_SIZE = 5000          #< Urls pulled from solr each time the pool runs low.
+RECRAWL_AGE = 60 * 60 * 24 * 7     #< Age after which urls crawled before revisit scheduling (no next_crawl_time) are recrawled.
+
+##
+# @class    ClaimService
+#
+# @brief    Hands out batches of urls to crawl under time-limited leases.
+#           Lives in the ServerManager process and is reached by workers through a proxy, so each
+#           batch costs a worker one RPC instead of a lock and a solr round trip. Leases that are
+#           not acked before they expire (e.g. the worker died) go back into the pool.
+#
+# @author   agent
+# @date 10/17/2026
+class ClaimService:
+
+    ##
+    # @fn   __init__(self, refill_size = REFILL_SIZE, lease_time = LEASE_TIME)
+    #
+    # @brief    Class initializer.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self                    The class instance that this method operates on.
+    # @param    optional refill_size    Urls pulled from solr when the pool runs low.
+    # @param    optional lease_time     Default lease length in seconds.
+    def __init__(self, refill_size = REFILL_SIZE, lease_time = LEASE_TIME):
+        self.mutex = threading.Lock()
+        self.refill_size = refill_size
+        self.lease_time = lease_time
+        self.pool = deque()         #< Entries ready to be claimed.
+        self.leases = {}            #< Dictionary of lease id -> [expire time, entries].
+        self.next_lease_id = 1
+        self.solr_working = None
+        self.working_writer = None  #< BufferedSolrWriter of the working core, for the claim timestamps.
+
+    ##
+    # @fn   claim(self, count, lease_time = None)
+    #
+    # @brief    Claims up to count urls under a new lease.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self                The class instance that this method operates on.
+    # @param    count               Maximum number of urls to claim.
+    # @param    optional lease_time Lease length in seconds (defaults to self.lease_time).
+    #
+    # @return   (lease id, list of entries). Entries are dictionaries with the "url" and the validators
+    #           stored with it by the last crawl (see solr_tools.VALIDATOR_FIELDS) if any.
+    #           The lease id is None if there was nothing to claim.
+    def claim(self, count, lease_time = None):
+        with self.mutex:
+            self.__expire_leases()
+            if len(self.pool) < count:
+                try:
+                    self.__refill()
+                except Exception as ex:
+                    searchengine.debugtools.log_exception(ex)
+                    self.solr_working = None
+            entries = [self.pool.popleft() for i in range(min(count, len(self.pool)))]
+            if len(entries) == 0:
+                return None, []
+            lease_id = self.next_lease_id
+            self.next_lease_id += 1
+            self.leases[lease_id] = [time.time() + (lease_time or self.lease_time), entries]
+            return lease_id, entries
+
+    ##
+    # @fn   ack(self, lease_ids)
+    #
+    # @brief    Marks leases as completed.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self        The class instance that this method operates on.
+    # @param    lease_ids   List of completed lease ids.
+    def ack(self, lease_ids):
+        with self.mutex:
+            for lease_id in lease_ids:
+                self.leases.pop(lease_id, None)
+
+    ##
+    # @fn   renew(self, lease_ids, lease_time = None)
+    #
+    # @brief    Extends leases that are still being worked on.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self                The class instance that this method operates on.
+    # @param    lease_ids           List of lease ids to extend.
+    # @param    optional lease_time New lease length in seconds from now.
+    #
+    # @return   List of the lease ids that had already expired and could not be renewed.
+    def renew(self, lease_ids, lease_time = None):
+        expired = []
+        with self.mutex:
+            self.__expire_leases()
+            for lease_id in lease_ids:
+                if lease_id in self.leases:
+                    self.leases[lease_id][0] = time.time() + (lease_time or self.lease_time)
+                else:
+                    expired.append(lease_id)
+        return expired
+
+    ##
+    # @fn   stats(self)
+    #
+    # @brief    Gets the pool and lease counts.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def stats(self):
+        with self.mutex:
+            return {
+                "pooled" : len(self.pool),
+                "leases" : len(self.leases),
+                "leased" : sum(len(lease[1]) for lease in self.leases.values())
+            }
+
+    ##
+    # @fn   __expire_leases(self)
+    #
+    # @brief    Puts the urls of expired leases back at the front of the pool.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def __expire_leases(self):
+        now = time.time()
+        for lease_id in [lease_id for lease_id, lease in self.leases.items() if lease[0] < now]:
+            urls = self.leases.pop(lease_id)[1]
+            searchengine.debugtools.log("Lease {} expired, requeueing {:,} urls.".format(lease_id, len(urls)))
+            self.pool.extendleft(reversed(urls))
+
+    ##
+    # @fn   __refill(self)
+    #
+    # @brief    Pulls the next urls due for crawling out of solr into the pool.
+    #           Urls are due once their next_crawl_time (set by the crawler's RevisitScheduler) has
+    #           passed, or RECRAWL_AGE after their last crawl if they have none yet.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def __refill(self):
+        if self.solr_working is None:
+            self.solr_working = searchengine.solr_tools.get_solr_instance('working')
+        if self.working_writer is None or self.working_writer.solr is not self.solr_working:
+            if self.working_writer is not None:
+                self.working_writer.close()
+            self.working_writer = BufferedSolrWriter(self.solr_working)
+        now = int(time.time())
+        response = self.solr_working.search(
+            "next_crawl_time:[0 TO {}] OR (*:* -next_crawl_time:[* TO *] AND last_update_time:[0 TO {}])".format(now, now - RECRAWL_AGE),
+            rows=self.refill_size,
+            fl=",".join(("id", "is_https") + VALIDATOR_FIELDS + REVISIT_FIELDS)
+        )
+        if len(response.docs) == 0:
+            return
+        entries = []
+        for doc in response.docs:
+            # Only the timestamps change, the rest of the document (validators, content) is kept.
+            # The crawler sets the real next_crawl_time once the url has been fetched.
+            self.working_writer.update(doc["id"], set_fields = {
+                "last_update_time" : now,
+                "next_crawl_time"  : now + RECRAWL_AGE
+            })
+            entry = { field : doc[field] for field in VALIDATOR_FIELDS + REVISIT_FIELDS if field in doc }
+            entry["url"] = "http" + ("s" if doc["is_https"] else "") + "://" + doc["id"]
+            entries.append(entry)
+        if not self.working_writer.flush():
+            # Unclaimed urls must not be pushed back RECRAWL_AGE by a later flush, the next refill
+            # pulls them again.
+            self.working_writer.discard()
+            return
+        # Made searchable right away, so the next refill does not pull these urls again.
+        self.solr_working.commit(softCommit = True)
+        self.pool.extend(entries)
+
+claim_service = None #< The ClaimService of this manager process.
+
+##
+# @fn   get_claim_service()
+#
+# @brief    Gets the ClaimService singleton of this process (creating it on first use).
+#
+# @author   agent
+# @date 10/17/2026
+#
+# @return   The claim service.
+def get_claim_service():
+    global claim_service
+    if claim_service is None:
+        claim_service = ClaimService()
+    return claim_service
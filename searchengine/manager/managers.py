@@ -1,6 +1,8 @@
 import os
 import threading
 from multiprocessing import managers, current_process
+from searchengine.manager.claims import get_claim_service
+from searchengine.manager.robotsstore import get_robots_store
 
 ##
 # @fn   generate_authkey()
@@ -49,3 +51,11 @@ class ClientManager(managers.SyncManager):
 # This is just registering the Lock and its proxy class with the manager
 ServerManager.register('Lock', threading.Lock, managers.AcquirerProxy)
 ClientManager.register('Lock', threading.Lock, managers.AcquirerProxy)
+
+# Every worker shares the single ClaimService living in the server process
+ServerManager.register('ClaimService', get_claim_service)
+ClientManager.register('ClaimService')
+
+# robots.txt files fetched by one worker are shared with every other worker
+ServerManager.register('RobotsStore', get_robots_store)
+ClientManager.register('RobotsStore')
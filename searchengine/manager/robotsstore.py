@@ -0,0 +1,85 @@
+import time
+import threading
+from collections import OrderedDict
+
+MAX_ENTRIES = 200000    #< robots.txt files kept before the oldest ones are dropped.
+
+##
+# @class    RobotsStore
+#
+# @brief    robots.txt files shared by every crawler process, kept in the ServerManager process.
+#           Entries are the raw text plus the time it expires, keyed by "scheme://host:port".
+#
+# @author   agent
+# @date 10/17/2026
+class RobotsStore:
+
+    ##
+    # @fn   __init__(self, max_entries = MAX_ENTRIES)
+    #
+    # @brief    Class initializer.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self                    The class instance that this method operates on.
+    # @param    optional max_entries    Entries kept before the oldest ones are dropped.
+    def __init__(self, max_entries = MAX_ENTRIES):
+        self.mutex = threading.Lock()
+        self.max_entries = max_entries
+        self.entries = OrderedDict()    #< Dictionary of key -> (expire time, robots.txt text).
+
+    ##
+    # @fn   get(self, key)
+    #
+    # @brief    Gets a robots.txt that has not expired.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    key     "scheme://host:port" of the site.
+    #
+    # @return   (expire time, text), or None if unknown or expired.
+    def get(self, key):
+        with self.mutex:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] < time.time():
+                return None
+            return entry
+
+    ##
+    # @fn   put(self, key, expires, text)
+    #
+    # @brief    Stores a robots.txt.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    key     "scheme://host:port" of the site.
+    # @param    expires Time the entry expires.
+    # @param    text    The robots.txt text.
+    def put(self, key, expires, text):
+        with self.mutex:
+            self.entries.pop(key, None)
+            self.entries[key] = (expires, text)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last = False)
+
+robots_store = None #< The RobotsStore of this manager process.
+
+##
+# @fn   get_robots_store()
+#
+# @brief    Gets the RobotsStore singleton of this process (creating it on first use).
+#
+# @author   agent
+# @date 10/17/2026
+#
+# @return   The robots store.
+def get_robots_store():
+    global robots_store
+    if robots_store is None:
+        robots_store = RobotsStore()
+    return robots_store
@@ -52,6 +52,7 @@ class Scanner:
     def __init__(self, scanner_id):
         self.scanner_id = scanner_id
         self.solr_instance = None
+        self.solr_writer = None
 
     def run(self, args):
         pass
@@ -83,6 +84,8 @@ class PtrScanner(Scanner):
     def scan_range(self, start_ip, end_ip):
         if self.solr_instance is None:
             self.solr_instance = searchengine.solr_tools.get_solr_instance('working', url_offset = 0)
+        if self.solr_writer is None:
+            self.solr_writer = searchengine.solr_tools.BufferedSolrWriter(self.solr_instance)
         for i in range(start_ip, end_ip):
             try:
                 ipv4_address = IPv4Address(i).exploded
@@ -92,6 +95,7 @@ class PtrScanner(Scanner):
             except socket.error as e:
                 log_exception(e.args)
                 log_exception("not found ({})".format(ipv4_address))
+        self.solr_writer.flush()
 
     def __probe_http(self, hostname):
         try:
@@ -108,13 +112,11 @@ class PtrScanner(Scanner):
             log_exception(e.args)
 
     def __post_host_to_solr(self, is_https, hostname):
-        docs = []
-        docs.append({
-            'id'                : hostname,
+        # Atomic update, a host that was already crawled keeps its content until its recrawl.
+        self.solr_writer.update(hostname, set_fields = {
             'is_https'          : is_https,
             'last_update_time'  : 0
         })
-        self.solr_instance.add(docs, commit = True, overwrite = True)
 
 
 ##
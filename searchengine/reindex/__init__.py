@@ -0,0 +1,8 @@
+__all__ = [
+    "ReindexExecutor",
+    "WarcSource",
+    "CachedPageSource",
+    "reindexer"
+]
+
+from searchengine.reindex.reindexer import ReindexExecutor, WarcSource, CachedPageSource
@@ -0,0 +1,502 @@
+import os
+import json
+import time
+import calendar
+import searchengine.debugtools
+import searchengine.solr_tools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from searchengine.solr_tools import BufferedSolrWriter
+from searchengine.archive import WARC_DIRECTORY, iter_records, parse_record
+from searchengine.webcrawler.crawler import page_document, PAGE_CONTENT_TYPES
+from searchengine.webcrawler.pagereader import PageReader
+from searchengine.webcrawler.parser import PageParser
+from searchengine.webcrawler.publicsuffix import get_public_suffix_list
+from searchengine.dedup import simhash, fingerprint_fields
+from searchengine.dedup.simhash import MIN_TOKENS
+from searchengine.analysis.analyzer import default_analyzer, WHITESPACE_PATTERN
+
+CHUNK_SIZE = 100                #< Pages parsed by a worker process at a time.
+CHUNKS_PER_WORKER = 2           #< Chunks queued per worker process, so no worker waits for the next one.
+CHECKPOINT_INTERVAL = 30        #< Seconds between checkpoints (each one flushes the docs parsed so far to solr).
+CHECKPOINT_DIRECTORY = os.path.join(searchengine.DATA_DIRECTORY, "reindex") #< Default root for the checkpoints.
+CACHED_PAGE_BATCH = 1000        #< Rows read from the cached page table at a time.
+CACHED_PAGES_QUERY = """
+    SELECT path_id, page_data
+    FROM cached_pages
+    WHERE path_id > %s
+    ORDER BY path_id
+    LIMIT %s
+    """                         #< Keyset paged query over the pages the GET_CACHED_PAGE procedure hands to the indexers.
+
+worker_suffixes = None          #< PublicSuffixList of a worker process.
+
+##
+# @class    WarcSource
+#
+# @brief    Reads the response records of the WARC files written by the crawlers (see
+#           searchengine.archive). Files are read in the order of their paths, and the position
+#           holds the files read to the end, the file being read and the offset of the next record
+#           in it, so a run can resume mid-file. Crawlers keep writing while a reindex runs, and
+#           a file they rename once it is complete may sort before the ones already read, which is
+#           why finished files are listed instead of a single place in the path order.
+#
+# @author   agent
+# @date 10/17/2026
+class WarcSource:
+    name = "warc"
+    default_collection = "working"  #< Core the crawlers post these pages to.
+
+    ##
+    # @fn   __init__(self, paths = None)
+    #
+    # @brief    Class initializer.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self            The class instance that this method operates on.
+    # @param    optional paths  List of WARC files and directories holding them, WARC_DIRECTORY if None.
+    def __init__(self, paths = None):
+        self.paths = paths if paths else [WARC_DIRECTORY]
+        self.parse_chunk = parse_warc_chunk
+
+    ##
+    # @fn   files(self)
+    #
+    # @brief    Gets the WARC files to read. Files that are still being written are left out.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    #
+    # @return   Sorted list of paths.
+    def files(self):
+        files = set()
+        for warc_path in self.paths:
+            if not os.path.isdir(warc_path):
+                files.add(os.path.abspath(warc_path))
+                continue
+            for directory, directories, names in os.walk(warc_path):
+                for name in names:
+                    if name.endswith(".warc.gz"):
+                        files.add(os.path.abspath(os.path.join(directory, name)))
+        return sorted(files)
+
+    ##
+    # @fn   read(self, position)
+    #
+    # @brief    Reads the records after a position.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self        The class instance that this method operates on.
+    # @param    position    Dictionary with the "done" files, the "file" being read and the "offset"
+    #                       of its next record, None to start from the beginning.
+    #
+    # @return   Generator of (position after the record, (url, fetch time, http message) or
+    #           None for records that are not responses).
+    def read(self, position):
+        files = self.files()
+        if isinstance(position, list):
+            # Checkpoint of an older run: a [path, offset] place in the path order.
+            position = { "done" : [warc_path for warc_path in files if warc_path < position[0]], "file" : position[0], "offset" : position[1] }
+        done = list(position["done"]) if position is not None else []
+        finished = set(done)
+        for warc_path in files:
+            if warc_path in finished:
+                continue
+            offset = position["offset"] if position is not None and warc_path == position["file"] else 0
+            for offset, length, record in iter_records(warc_path, offset):
+                fields, block = parse_record(record)
+                # The done list is only replaced, never changed, so positions can share it.
+                next_position = { "done" : done, "file" : warc_path, "offset" : offset + length }
+                if fields.get("warc-type") != "response" or "warc-target-uri" not in fields:
+                    yield next_position, None
+                    continue
+                try:
+                    fetch_time = calendar.timegm(time.strptime(fields.get("warc-date", ""), "%Y-%m-%dT%H:%M:%SZ"))
+                except ValueError:
+                    fetch_time = None
+                yield next_position, (fields["warc-target-uri"], fetch_time, block)
+            done = done + [warc_path]
+            yield { "done" : done, "file" : None, "offset" : 0 }, None
+
+    ##
+    # @fn   describe(self, position)
+    #
+    # @brief    Gets a short description of a position for the logs.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self        The class instance that this method operates on.
+    # @param    position    The position.
+    def describe(self, position):
+        if isinstance(position, list):
+            return "{} @ {}".format(*position)
+        return "{} @ {} ({} files done)".format(position["file"] or "next file", position["offset"], len(position["done"]))
+
+##
+# @class    CachedPageSource
+#
+# @brief    Reads the pages of the cached page table the indexers work from, in path_id order.
+#           The position is the last path_id read.
+#
+# @author   agent
+# @date 10/17/2026
+class CachedPageSource:
+    name = "cache"
+    default_collection = "main"     #< Core the indexers post these pages to.
+
+    ##
+    # @fn   __init__(self, batch_size = CACHED_PAGE_BATCH)
+    #
+    # @brief    Class initializer.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self                The class instance that this method operates on.
+    # @param    optional batch_size Rows read at a time.
+    def __init__(self, batch_size = CACHED_PAGE_BATCH):
+        self.batch_size = batch_size
+        self.parse_chunk = parse_cached_chunk
+
+    ##
+    # @fn   read(self, position)
+    #
+    # @brief    Reads the rows after a position.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self        The class instance that this method operates on.
+    # @param    position    The last path_id read, None to start from the beginning.
+    #
+    # @return   Generator of (path_id, (path_id, page bytes)).
+    def read(self, position):
+        global CACHED_PAGES_QUERY
+        # Only this source needs mysql, so the connector is not imported with the module.
+        from searchengine.database.connector import DatabaseConnector
+        last_id = position if position is not None else 0
+        while True:
+            rows = DatabaseConnector.execute_query(CACHED_PAGES_QUERY, last_id, self.batch_size)
+            if rows is False:
+                raise IOError("Could not read the cached pages after path_id {}".format(last_id))
+            for row in rows:
+                last_id = row["path_id"]
+                yield last_id, (last_id, row["page_data"])
+            if len(rows) < self.batch_size:
+                return
+
+    ##
+    # @fn   describe(self, position)
+    #
+    # @brief    Gets a short description of a position for the logs.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self        The class instance that this method operates on.
+    # @param    position    The position.
+    def describe(self, position):
+        return "path_id {}".format(position)
+
+##
+# @class    ReindexExecutor
+#
+# @brief    A child class of ProcessPoolExecutor
+#           Rebuilds the docs of a core offline from stored pages. The pages of a source are read
+#           in order and handed out to the worker processes in chunks of CHUNK_SIZE, and the docs
+#           they return are bulk loaded through a BufferedSolrWriter (as atomic "set" updates,
+#           so fields kept by the crawl, like its revisit state, are left alone). Chunks are
+#           loaded in the order they were read, and every CHECKPOINT_INTERVAL seconds the writer
+#           is flushed and the position after the last loaded chunk is saved, so a run that
+#           stops resumes from there.
+#
+# @author   agent
+# @date 10/17/2026
+class ReindexExecutor(ProcessPoolExecutor):
+
+    ##
+    # @fn   __init__(self, source, collection = None, max_workers = None, checkpoint_path = None, restart = False)
+    #
+    # @brief    Class initializer.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self                        The class instance that this method operates on.
+    # @param    source                      The WarcSource or CachedPageSource.
+    # @param    optional collection         Core to load ('main', 'working'...), the source's default if None.
+    # @param    optional max_workers        The maximum workers.
+    # @param    optional checkpoint_path    File of the checkpoint, one per source and core in
+    #                                       CHECKPOINT_DIRECTORY if None.
+    # @param    optional restart            True to ignore the checkpoint and start over.
+    def __init__(self, source, collection = None, max_workers = None, checkpoint_path = None, restart = False):
+        global CHECKPOINT_DIRECTORY
+        self.source = source
+        self.collection = collection if collection is not None else source.default_collection
+        if checkpoint_path is None:
+            checkpoint_path = os.path.join(CHECKPOINT_DIRECTORY, "{}_{}.json".format(source.name, self.collection))
+        self.checkpoint_path = checkpoint_path
+        self.restart = restart
+        self.pages = 0
+        self.docs = 0
+        self.position = None        #< Source position after the last chunk handed to the writer.
+        self.start_time = time.time()
+        self.last_checkpoint = time.time()
+        return super().__init__(max_workers, initializer = init_worker)
+
+    ##
+    # @fn   execute_tasks(self)
+    #
+    # @brief    Reindexes every page of the source after the checkpoint.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def execute_tasks(self):
+        global CHUNK_SIZE, CHUNKS_PER_WORKER, CHECKPOINT_INTERVAL
+        position = None if self.restart else self.load_checkpoint()
+        if position is not None:
+            searchengine.debugtools.log("[RI] Resuming {} reindex of the {} core at {}".format(self.source.name, self.collection, self.source.describe(position)))
+        writer = BufferedSolrWriter(searchengine.solr_tools.get_solr_instance(self.collection))
+        pending = deque()   #< (future, position after the chunk, pages in the chunk), in the order they were read.
+        self.start_time = time.time()
+        self.last_checkpoint = time.time()
+        try:
+            chunk = []
+            chunk_position = position
+            for chunk_position, record in self.source.read(position):
+                if record is not None:
+                    chunk.append(record)
+                if len(chunk) >= CHUNK_SIZE:
+                    pending.append((self.submit(self.source.parse_chunk, chunk), chunk_position, len(chunk)))
+                    chunk = []
+                    while len(pending) >= self._max_workers * CHUNKS_PER_WORKER:
+                        self.__load(writer, *pending.popleft())
+            if chunk_position != position:
+                pending.append((self.submit(self.source.parse_chunk, chunk), chunk_position, len(chunk)))
+            while len(pending) > 0:
+                self.__load(writer, *pending.popleft())
+            self.__checkpoint(writer)
+            searchengine.debugtools.log("[RI] Reindex done: {:,} pages, {:,} docs in {:.0f}s".format(self.pages, self.docs, time.time() - self.start_time))
+        finally:
+            for future, chunk_position, count in pending:
+                future.cancel()
+            self.shutdown(wait = True)
+            writer.close()
+
+    ##
+    # @fn   __load(self, writer, future, position, count)
+    #
+    # @brief    Waits for the docs of a chunk and hands them to the writer.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self        The class instance that this method operates on.
+    # @param    writer      The BufferedSolrWriter of the core.
+    # @param    future      Future of the worker's list of docs.
+    # @param    position    Source position after the chunk.
+    # @param    count       Pages in the chunk.
+    def __load(self, writer, future, position, count):
+        global CHECKPOINT_INTERVAL
+        docs = future.result()
+        for doc in docs:
+            writer.add([doc], fieldUpdates = { field : "set" for field in doc if field != "id" })
+        self.pages += count
+        self.docs += len(docs)
+        self.position = position
+        if time.time() - self.last_checkpoint >= CHECKPOINT_INTERVAL:
+            self.__checkpoint(writer)
+
+    ##
+    # @fn   __checkpoint(self, writer)
+    #
+    # @brief    Flushes the writer and, once solr has every doc loaded so far, saves the position.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    writer  The BufferedSolrWriter of the core.
+    def __checkpoint(self, writer):
+        self.last_checkpoint = time.time()
+        elapsed = max(time.time() - self.start_time, 0.001)
+        searchengine.debugtools.log("[RI] {:,} pages, {:,} docs, {:.1f} pages/s".format(self.pages, self.docs, self.pages / elapsed))
+        if self.position is None or not writer.flush():
+            return
+        self.save_checkpoint(self.position)
+
+    ##
+    # @fn   load_checkpoint(self)
+    #
+    # @brief    Reads the position saved by an earlier run.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    #
+    # @return   The position, None if there is no checkpoint.
+    def load_checkpoint(self):
+        if not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path, "r") as checkpoint_file:
+            return json.load(checkpoint_file)["position"]
+
+    ##
+    # @fn   save_checkpoint(self, position)
+    #
+    # @brief    Saves a position (written to a temporary file first, so a crash never leaves a
+    #           broken checkpoint behind).
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self        The class instance that this method operates on.
+    # @param    position    The source position.
+    def save_checkpoint(self, position):
+        directory = os.path.dirname(self.checkpoint_path)
+        if len(directory) > 0:
+            os.makedirs(directory, exist_ok = True)
+        checkpoint = {
+            "source"     : self.source.name,
+            "collection" : self.collection,
+            "position"   : position,
+            "time"       : int(time.time())
+        }
+        with open(self.checkpoint_path + ".tmp", "w") as checkpoint_file:
+            json.dump(checkpoint, checkpoint_file)
+        os.replace(self.checkpoint_path + ".tmp", self.checkpoint_path)
+
+##
+# @fn   init_worker()
+#
+# @brief    Loads what the worker processes need to build docs.
+#
+# @author   agent
+# @date 10/17/2026
+def init_worker():
+    global worker_suffixes
+    worker_suffixes = get_public_suffix_list()
+
+##
+# @fn   read_http_response(url, message)
+#
+# @brief    Parses an archived HTTP response the way the crawler parses a fetched page.
+#
+# @author   agent
+# @date 10/17/2026
+#
+# @param    url     The url of the page.
+# @param    message The raw HTTP response (status line, headers and decoded body).
+#
+# @return   (PageReader, dictionary of headers), None if the response is not a page the
+#           crawler would have parsed.
+def read_http_response(url, message):
+    head, sep, body = message.partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = lines[0].split(" ", 2)
+    if len(status) < 2 or not status[1].isdigit() or not 200 <= int(status[1]) < 300:
+        return None
+    headers = {}
+    for line in lines[1:]:
+        name, sep, value = line.partition(":")
+        name = name.strip().lower()
+        headers[name] = headers[name] + ", " + value.strip() if name in headers else value.strip()
+    media_type = headers.get("content-type", "").split(";")[0].strip().lower()
+    if len(media_type) > 0 and media_type not in PAGE_CONTENT_TYPES:
+        return None
+    page = PageReader()
+    page.begin(url, headers)
+    page.feed(body)
+    page.close()
+    return page, headers
+
+##
+# @fn   parse_warc_chunk(records)
+#
+# @brief    Builds the working core docs of a chunk of archived pages (runs in a worker process).
+#           The content of the whole chunk is tokenized at once.
+#
+# @author   agent
+# @date 10/17/2026
+#
+# @param    records List of (url, fetch time, http message).
+#
+# @return   List of docs.
+def parse_warc_chunk(records):
+    global worker_suffixes
+    pages = []
+    for url, fetch_time, message in records:
+        try:
+            result = read_http_response(url, message)
+        except Exception as ex:
+            searchengine.debugtools.log("[RI] Could not parse {}: {}".format(url, ex))
+            continue
+        if result is not None:
+            pages.append((url, fetch_time) + result)
+    docs = []
+    token_lists = default_analyzer.tokenize_batch([page.parser.content for url, fetch_time, page, headers in pages])
+    for (url, fetch_time, page, headers), tokens in zip(pages, token_lists):
+        page.parser.content = " ".join(tokens)
+        doc = page_document(url, page.parser, worker_suffixes, fetch_time)
+        if doc is None:
+            continue
+        doc["content_hash"] = page.content_hash()
+        if "etag" in headers:
+            doc["etag"] = headers["etag"]
+        if "last-modified" in headers:
+            doc["last_modified"] = headers["last-modified"]
+        if len(tokens) >= MIN_TOKENS:
+            doc.update(fingerprint_fields(simhash(tokens)))
+        docs.append(doc)
+    return docs
+
+##
+# @fn   parse_cached_chunk(rows)
+#
+# @brief    Builds the docs of a chunk of cached pages the way the Indexer does (runs in a
+#           worker process).
+#
+# @author   agent
+# @date 10/17/2026
+#
+# @param    rows    List of (path_id, page bytes).
+#
+# @return   List of docs.
+def parse_cached_chunk(rows):
+    parsers = []
+    for path_id, page_data in rows:
+        if path_id is None or path_id < 1:
+            continue
+        parser = PageParser(None)
+        try:
+            parser.feed(page_data.decode("utf-8", errors = "replace"))
+            parser.close()
+        except Exception as ex:
+            searchengine.debugtools.log("[RI] Could not parse page {}: {}".format(path_id, ex))
+            continue
+        parsers.append((path_id, parser))
+    docs = []
+    token_lists = default_analyzer.tokenize_batch([parser.content for path_id, parser in parsers])
+    for (path_id, parser), tokens in zip(parsers, token_lists):
+        title = WHITESPACE_PATTERN.sub(" ", parser.title)
+        if len(title) == 0 or len(tokens) == 0:
+            continue
+        docs.append({
+            "id"               : str(path_id),
+            "path_id"          : path_id,
+            "meta_keywords"    : parser.meta_keywords,
+            "meta_description" : parser.meta_description,
+            "title"            : parser.meta_title if len(parser.meta_title) > 0 else title,
+            "content"          : " ".join(tokens)
+        })
+    return docs
@@ -2,7 +2,12 @@
 import time
 import searchengine.debugtools
 import urllib
-import math
+from searchengine.dedup.index import DUPLICATE_ACTION
+from searchengine.solr_tools.writer import BufferedSolrWriter
+from searchengine.solr_tools.pool import PooledSolr, get_node_pool, SOLR_TIMEOUT
+from searchengine.solr_tools.merge import DeltaMerge, MERGE_ROWS, MERGE_WORKERS
+from searchengine.solr_tools.rebooster import Rebooster
+from searchengine.solr_tools.optimizer import SegmentOptimizer
 
 SOLR_URLS = {
     'main' : [
@@ -26,10 +31,16 @@ SUBDOMAIN_DOMAIN_BOOST           = '1000'
 SUBDOMAIN_SUBDOMAIN_BOOST        = '600'
 SUBDOMAIN_META_KEYWORDS_BOOST    = '400'
 
+VALIDATOR_FIELDS = ("etag", "last_modified", "content_hash") #< Working core fields the crawlers use for conditional recrawls.
+REVISIT_FIELDS = ("revisit_interval", "fetch_count", "change_count") #< Working core fields the crawlers use to schedule recrawls.
+DEDUP_FIELDS = ("simhash", "simhash_bands", "duplicate_of") #< Working core fields used to find near-duplicate pages.
+
 ##
 # @fn   get_solr_instance(collection = 'main', url_offset = 0)
 #
-# @brief    Gets a solr instance.
+# @brief    Gets a solr instance. Requests go through the pooled sessions of the collection's
+#           nodes: reads to the fastest healthy node, writes to the node at url_offset first, and
+#           failed requests are retried on another node (see PooledSolr).
 #
 # @author   Edward Callahan
 # @date 8/16/2016
@@ -43,8 +54,28 @@ SUBDOMAIN_META_KEYWORDS_BOOST    = '400'
 # @return   The solr instance.
 
 def get_solr_instance(collection = 'main', url_offset = 0):
-    global SOLR_URLS
-    return pysolr.Solr(SOLR_URLS[collection][url_offset % len(SOLR_URLS[collection])])
+    return PooledSolr(get_node_pool(collection), url_offset)
+
+##
+# @fn   get_solr_node(collection = 'main', url_offset = 0, timeout = SOLR_TIMEOUT)
+#
+# @brief    Gets a solr instance bound to a single node (for per node maintenance), sharing the
+#           pooled session of the node.
+#
+# @author   agent
+# @date 10/17/2026
+#
+# @param    optional collection The core.
+# @param    optional url_offset Index of the node in SOLR_URLS.
+# @param    optional timeout    Seconds a request may take.
+#
+# @return   The pysolr.Solr instance.
+def get_solr_node(collection = 'main', url_offset = 0, timeout = SOLR_TIMEOUT):
+    nodes = get_node_pool(collection).nodes
+    node = nodes[url_offset % len(nodes)]
+    solr = pysolr.Solr(node.url, timeout = timeout)
+    solr.session = node.client.session
+    return solr
 
 ##
 # @fn   get_boost(doc)
@@ -83,106 +114,46 @@ def get_boost(doc):
 ##
 # @fn   run_optimizer()
 #
-# @brief    Executes the optimizer operation.
+# @brief    Executes the optimizer operation: keeps the segments of every core in shape, merging
+#           them only when needed and during quiet windows (see SegmentOptimizer).
 #
 # @author   Edward Callahan
 # @date 8/15/2016
 def run_optimizer():
-    solr = None
-    while(True):
-        try:
-            if solr is None:
-                solr = get_solr_instance() 
-            searchengine.debugtools.log("Optimizing...")
-            solr.commit()
-            solr.optimize()
-            searchengine.debugtools.log("Done.")
-            time.sleep(60 * 5)
-        except:
-            searchengine.debugtools.log("Disconnected.")
-            SOLR_INSTANCE = None
-            time.sleep(60 * 10) # Sleeping because we crashed due to timeout.
+    SegmentOptimizer().run()
 
 ##
-# @fn   run_rebooster()
+# @fn   run_rebooster(full = False)
 #
-# @brief    Run the rebooster (used for rewriting index-time boost values).
+# @brief    Run the rebooster (used for rewriting index-time boost values) over the root docs
+#           changed since its last run (see Rebooster).
 #
 # @author   Edward Callahan
 # @date 8/15/2016
-def run_rebooster():
-    solr = None
-    i = 0
-    while(True):
-        if solr is None:
-            solr = get_solr_instance('main')
-        result = solr.search(q='domain:* AND -path:*', rows = 100, start = (i * 100), timeout=999)
-        try:
-            if len(result.docs) == 0 or result.docs is None:
-                break
-            for doc in result.docs:
-                searchengine.debugtools.log("Reboosting {}...".format(doc["id"]))
-                boost = get_boost(doc)
-                doc.pop('_version_', None) # Removing version history if it is in there
-                solr.add([doc], boost=boost, commit=False, overwrite=True)
-            i += 1
-        except Exception as ex:
-            searchengine.debugtools.log_exception(ex)
-            solr = None
-    solr.commit()
+#
+# @param    optional full   True to reboost every root doc.
+def run_rebooster(full = False):
+    try:
+        Rebooster().run(full)
+    except Exception as ex:
+        searchengine.debugtools.log_exception(ex)
 
 ##
-# @fn   run_delta_merge(rows_per_iteration = 500)
+# @fn   run_delta_merge(rows_per_iteration = MERGE_ROWS, duplicate_action = DUPLICATE_ACTION, workers = MERGE_WORKERS)
 #
-# @brief    Migrate new data from working core to live core.
+# @brief    Migrate new data from working core to live core (see DeltaMerge), then reboost.
+#           An unfinished merge is resumed.
 #
 # @author   Edward Callahan
 # @date 8/17/2016
 #
-# @param    optional rows_per_iteration Rows to migrate per iteration.
+# @param    optional rows_per_iteration Rows read from the working core per page.
+# @param    optional duplicate_action   "skip" or "fold" (see searchengine.dedup.index.DUPLICATE_ACTION).
+# @param    optional workers            Hash ranges of the id space merged in parallel.
 
-def run_delta_merge(rows_per_iteration = 500):
-    solr_working = None
-    solr_main = None
-    i = 0
-    num_iterations = -1
-    has_printed = False
-    start_time = str(int(time.time()))
-    while(num_iterations < 0 or i < num_iterations):
-        if solr_working is None:
-            solr_working = get_solr_instance('working')
-        if solr_main is None:
-            solr_main = get_solr_instance('main')
-        result = solr_working.search(q= '*:*', fq="last_update_time:[0 TO " + start_time + "] AND domain:*", rows = rows_per_iteration)
-        docs_to_add_working = []
-        docs_to_add_main = []
-        if not has_printed:
-            num_found = result.raw_response["response"]["numFound"]
-            num_iterations = math.ceil(num_found / rows_per_iteration)
-            searchengine.debugtools.log("Total: {:,}, {:,} iterations".format(num_found, num_iterations))
-            has_printed = True
-        try:
-            if len(result.docs) == 0 or result.docs is None:
-                break
-            for doc in result.docs:
-                docs_to_add_working.append({
-                    "id"               : doc["id"],
-                    "is_https"         : doc["is_https"],
-                    "last_update_time" : int(time.time())
-                })
-                if 'domain' in doc and 'content' in doc:
-                    doc.pop('_version_', None) # Removing version history if it is in there
-                    doc.pop('last_update_time', None) # Removing last_update_time (not needed in main core)
-                    docs_to_add_main.append(doc)
-            searchengine.debugtools.log("Migrating {:,} documents... ({}/{})".format(len(docs_to_add_main), i + 1, num_iterations))
-            solr_main.add(docs_to_add_main, overwrite=True)
-            solr_working.add(docs_to_add_working, overwrite=True)
-            i += 1
-        except Exception as ex:
-            searchengine.debugtools.log("EXCEPTION:")
-            searchengine.debugtools.log_exception(ex)
-            solr_working = None
-            solr_main = None
-    searchengine.debugtools.log("Running rebooster...")
-    run_rebooster()  
-    searchengine.debugtools.log("Done.")  
\ No newline at end of file
+def run_delta_merge(rows_per_iteration = MERGE_ROWS, duplicate_action = DUPLICATE_ACTION, workers = MERGE_WORKERS):
+    merge = DeltaMerge(rows_per_iteration, workers, duplicate_action)
+    if merge.run():
+        searchengine.debugtools.log("Running rebooster...")
+        run_rebooster()
+    searchengine.debugtools.log("Done.")
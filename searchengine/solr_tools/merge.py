@@ -0,0 +1,289 @@
+import os
+import json
+import time
+import threading
+import searchengine.debugtools
+import searchengine.solr_tools
+from concurrent.futures import ThreadPoolExecutor
+from searchengine.solr_tools.writer import BufferedSolrWriter
+from searchengine.dedup.index import fold_duplicates, DUPLICATE_ACTION
+
+MERGE_ROWS = 500            #< Docs read from the working core per page.
+MERGE_WORKERS = 4           #< Hash ranges of the id space merged in parallel.
+MAX_RETRIES = 5             #< Failed attempts at a page before its range is left for the next run.
+RETRY_WAIT = 30             #< Seconds to wait before retrying a page.
+MERGE_CHECKPOINT_PATH = os.path.join(searchengine.DATA_DIRECTORY, "solr_tools", "delta_merge.json")  #< Progress of an unfinished merge.
+HASH_FILTER = "{{!hash workers={} worker={} partitionKeys=id}}"  #< Filter keeping the docs of one hash range.
+
+##
+# @class    DeltaMerge
+#
+# @brief    Migrates new data from the working core to the main core.
+#           The id space is split into hash ranges, and each range is streamed from the working
+#           core with cursorMark deep paging (sorted by id) by its own worker thread. While a
+#           page is written, the next one is already being read. A page is written to the main
+#           core first and only then replaced by stubs in the working core, so a page that could
+#           not reach the main core is left to be merged again. The cursor of every range is
+#           checkpointed after each page, so a merge that stopped resumes where each range was.
+#
+# @author   agent
+# @date 10/17/2026
+class DeltaMerge:
+
+    ##
+    # @fn   __init__(self, rows = MERGE_ROWS, workers = MERGE_WORKERS, duplicate_action = DUPLICATE_ACTION, checkpoint_path = MERGE_CHECKPOINT_PATH)
+    #
+    # @brief    Class initializer.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self                        The class instance that this method operates on.
+    # @param    optional rows               Docs read per page.
+    # @param    optional workers            Hash ranges merged in parallel.
+    # @param    optional duplicate_action   "skip" or "fold" (see searchengine.dedup.index.DUPLICATE_ACTION).
+    # @param    optional checkpoint_path    File the progress is kept in.
+    def __init__(self, rows = MERGE_ROWS, workers = MERGE_WORKERS, duplicate_action = DUPLICATE_ACTION, checkpoint_path = MERGE_CHECKPOINT_PATH):
+        self.rows = rows
+        self.workers = workers
+        self.duplicate_action = duplicate_action
+        self.checkpoint_path = checkpoint_path
+        self.mutex = threading.Lock()
+        self.start_time = None      #< Docs updated after this time are left for the next merge.
+        self.cursors = {}           #< Dictionary of range -> cursorMark of its next page, None once it is done.
+        self.migrated = 0
+
+    ##
+    # @fn   run(self)
+    #
+    # @brief    Merges every range (resuming an unfinished merge if there is one).
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    #
+    # @return   True if every range was merged.
+    def run(self):
+        self.__load_checkpoint()
+        remaining = [worker for worker in range(self.workers) if self.cursors[worker] is not None]
+        try:
+            total = searchengine.solr_tools.get_solr_instance('working').search(q = '*:*', fq = self.__filter(), rows = 0).hits
+            searchengine.debugtools.log("[DM] Total: {:,} documents in {} ranges".format(total, len(remaining)))
+        except Exception as ex:
+            searchengine.debugtools.log_exception(ex)
+        with ThreadPoolExecutor(max(len(remaining), 1)) as executor:
+            results = list(executor.map(self.merge_range, remaining))
+        searchengine.debugtools.log("[DM] Migrated {:,} documents".format(self.migrated))
+        if not all(results):
+            searchengine.debugtools.log("[DM] Some ranges did not finish, the next run resumes them.")
+            return False
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        return True
+
+    ##
+    # @fn   merge_range(self, worker)
+    #
+    # @brief    Streams a hash range of the working core and merges it page by page.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    worker  The range.
+    #
+    # @return   True if the whole range was merged.
+    def merge_range(self, worker):
+        global MAX_RETRIES, RETRY_WAIT
+        solr_working = searchengine.solr_tools.get_solr_instance('working', worker)
+        solr_main = searchengine.solr_tools.get_solr_instance('main', worker)
+        working_writer = BufferedSolrWriter(solr_working)
+        main_writer = BufferedSolrWriter(solr_main)
+        reader = ThreadPoolExecutor(1)
+        cursor = self.cursors[worker]
+        failures = 0
+        try:
+            next_page = reader.submit(self.__read_page, solr_working, worker, cursor)
+            while True:
+                try:
+                    result = next_page.result()
+                    next_cursor = result.nextCursorMark
+                    if len(result.docs) == 0 or next_cursor == cursor:
+                        break
+                    # Reading the next page while this one is written.
+                    next_page = reader.submit(self.__read_page, solr_working, worker, next_cursor)
+                    self.__merge_page(result.docs, solr_working, solr_main, working_writer, main_writer)
+                except Exception as ex:
+                    failures += 1
+                    searchengine.debugtools.log("[DM:{}] Could not merge a page ({}/{})".format(worker, failures, MAX_RETRIES))
+                    searchengine.debugtools.log_exception(ex)
+                    if failures >= MAX_RETRIES:
+                        return False
+                    time.sleep(RETRY_WAIT)
+                    next_page = reader.submit(self.__read_page, solr_working, worker, cursor)
+                    continue
+                failures = 0
+                cursor = next_cursor
+                self.__save_cursor(worker, cursor, len(result.docs))
+            if not working_writer.flush():
+                return False
+            self.__save_cursor(worker, None, 0)
+            return True
+        finally:
+            reader.shutdown(wait = True)
+            working_writer.close()
+            main_writer.close()
+
+    ##
+    # @fn   __read_page(self, solr_working, worker, cursor)
+    #
+    # @brief    Reads a page of a range from the working core.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self            The class instance that this method operates on.
+    # @param    solr_working    The working core.
+    # @param    worker          The range.
+    # @param    cursor          The cursorMark of the page.
+    #
+    # @return   The pysolr Results.
+    def __read_page(self, solr_working, worker, cursor):
+        global HASH_FILTER
+        return solr_working.search(
+            q = '*:*',
+            fq = [self.__filter(), HASH_FILTER.format(self.workers, worker)],
+            sort = "id asc",
+            rows = self.rows,
+            cursorMark = cursor
+        )
+
+    ##
+    # @fn   __merge_page(self, docs, solr_working, solr_main, working_writer, main_writer)
+    #
+    # @brief    Writes a page of working core docs to the main core, then replaces them in the
+    #           working core by stubs keeping the crawl state.
+    #           Near-duplicate pages (docs with duplicate_of) are removed from the main core
+    #           instead, and with the "fold" action their ids are listed in their canonical doc.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self            The class instance that this method operates on.
+    # @param    docs            The docs read from the working core.
+    # @param    solr_working    The working core.
+    # @param    solr_main       The main core.
+    # @param    working_writer  BufferedSolrWriter of the working core.
+    # @param    main_writer     BufferedSolrWriter of the main core.
+    def __merge_page(self, docs, solr_working, solr_main, working_writer, main_writer):
+        docs_to_add_working = []
+        docs_to_add_main = []
+        duplicate_docs = []
+        for doc in docs:
+            working_doc = {
+                "id"               : doc["id"],
+                "is_https"         : doc["is_https"],
+                "last_update_time" : int(time.time())
+            }
+            # Keeping the crawl validators, revisit state and fingerprint, they drive the next
+            # recrawl and the duplicate lookups
+            for field in searchengine.solr_tools.VALIDATOR_FIELDS + searchengine.solr_tools.REVISIT_FIELDS + searchengine.solr_tools.DEDUP_FIELDS + ("next_crawl_time",):
+                if field in doc:
+                    working_doc[field] = doc.pop(field)
+            docs_to_add_working.append(working_doc)
+            if 'duplicate_of' in working_doc:
+                duplicate_docs.append(working_doc)
+            elif 'domain' in doc and 'content' in doc:
+                doc.pop('_version_', None) # Removing version history if it is in there
+                doc.pop('last_update_time', None) # Removing last_update_time (not needed in main core)
+                docs_to_add_main.append(doc)
+        alternate_updates = []
+        if self.duplicate_action == "fold":
+            alternate_updates = fold_duplicates(solr_working, solr_main, docs_to_add_main, duplicate_docs)
+        main_writer.add(docs_to_add_main, overwrite = True)
+        if len(alternate_updates) > 0:
+            main_writer.add(alternate_updates, fieldUpdates = { "alternate_urls" : "set" })
+        if len(duplicate_docs) > 0:
+            # Pages indexed before they turned out to be duplicates
+            main_writer.delete([doc["id"] for doc in duplicate_docs])
+        if not main_writer.flush():
+            raise IOError("Could not write {:,} documents to the main core".format(len(docs_to_add_main)))
+        working_writer.add(docs_to_add_working, overwrite = True)
+        with self.mutex:
+            self.migrated += len(docs_to_add_main)
+
+    ##
+    # @fn   __filter(self)
+    #
+    # @brief    Gets the filter matching the working core docs this merge migrates.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def __filter(self):
+        return "last_update_time:[0 TO {}] AND domain:*".format(self.start_time)
+
+    ##
+    # @fn   __load_checkpoint(self)
+    #
+    # @brief    Picks up the start time and cursors of an unfinished merge, or starts a new one.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def __load_checkpoint(self):
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, "r") as checkpoint_file:
+                checkpoint = json.load(checkpoint_file)
+            # The ranges depend on the number of workers, so a checkpoint of another split is not usable.
+            if checkpoint["workers"] == self.workers:
+                self.start_time = checkpoint["start_time"]
+                self.cursors = { int(worker) : cursor for worker, cursor in checkpoint["cursors"].items() }
+                searchengine.debugtools.log("[DM] Resuming the merge started at {}".format(self.start_time))
+                return
+        self.start_time = int(time.time())
+        self.cursors = { worker : "*" for worker in range(self.workers) }
+        self.__write_checkpoint()
+
+    ##
+    # @fn   __save_cursor(self, worker, cursor, count)
+    #
+    # @brief    Records the progress of a range.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    worker  The range.
+    # @param    cursor  The cursorMark of its next page, None once it is done.
+    # @param    count   Docs of the page that was merged.
+    def __save_cursor(self, worker, cursor, count):
+        with self.mutex:
+            self.cursors[worker] = cursor
+            self.__write_checkpoint()
+        if count > 0:
+            searchengine.debugtools.log("[DM:{}] Merged {:,} documents ({:,} migrated in total)".format(worker, count, self.migrated))
+
+    ##
+    # @fn   __write_checkpoint(self)
+    #
+    # @brief    Writes the progress to the checkpoint file (through a temporary file, so a crash
+    #           never leaves a broken checkpoint behind).
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def __write_checkpoint(self):
+        os.makedirs(os.path.dirname(self.checkpoint_path), exist_ok = True)
+        checkpoint = {
+            "start_time" : self.start_time,
+            "workers"    : self.workers,
+            "cursors"    : { str(worker) : cursor for worker, cursor in self.cursors.items() }
+        }
+        with open(self.checkpoint_path + ".tmp", "w") as checkpoint_file:
+            json.dump(checkpoint, checkpoint_file)
+        os.replace(self.checkpoint_path + ".tmp", self.checkpoint_path)
@@ -0,0 +1,174 @@
+import math
+import json
+import time
+import searchengine.debugtools
+import searchengine.solr_tools
+
+POLL_INTERVAL = 60 * 5              #< Seconds between two polls of the segment stats of every core.
+QUIET_WINDOWS = [(1, 6)]            #< Local (start hour, end hour) windows merges may run in, empty to allow them any time.
+MAX_SEGMENTS = 30                   #< Segment count past which the segments of a core are merged.
+TARGET_SEGMENTS = 10                #< Segment count a merge brings a core down to.
+MAX_SEGMENT_SIZE = 5 * 1024 ** 3    #< Largest segment a merge may produce (bytes), big cores keep more segments.
+DELETED_RATIO = 0.2                 #< Ratio of deleted docs past which they are expunged.
+MERGE_COOLDOWN = 60 * 60            #< Seconds a core is left alone after a merge, so merges never pile up.
+MERGE_TIMEOUT = 60 * 60             #< Seconds to wait for a merge to finish.
+
+##
+# @class    SegmentOptimizer
+#
+# @brief    Keeps the segments of every core in SOLR_URLS in shape without rewriting whole
+#           indexes. The segment stats of each core (segment count, deleted docs, index size) are
+#           polled, and only a core crossing a threshold gets work: expungeDeletes when too many
+#           of its docs are deleted, or a merge bounded by maxSegments when it has too many
+#           segments. Solr sends a merge to every replica of the collection, so the stats of each
+#           node are read but at most one merge is issued per collection. Merges only run inside
+#           the quiet windows, one at a time, and a collection that was merged is left alone for
+#           MERGE_COOLDOWN seconds.
+#
+# @author   agent
+# @date 10/17/2026
+class SegmentOptimizer:
+
+    ##
+    # @fn   __init__(self, quiet_windows = QUIET_WINDOWS, max_segments = MAX_SEGMENTS, target_segments = TARGET_SEGMENTS, deleted_ratio = DELETED_RATIO)
+    #
+    # @brief    Class initializer.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self                        The class instance that this method operates on.
+    # @param    optional quiet_windows      List of local (start hour, end hour) windows merges may run in.
+    # @param    optional max_segments       Segment count past which a core is merged.
+    # @param    optional target_segments    Segment count a merge brings a core down to.
+    # @param    optional deleted_ratio      Ratio of deleted docs past which they are expunged.
+    def __init__(self, quiet_windows = QUIET_WINDOWS, max_segments = MAX_SEGMENTS, target_segments = TARGET_SEGMENTS, deleted_ratio = DELETED_RATIO):
+        self.quiet_windows = quiet_windows
+        self.max_segments = max_segments
+        self.target_segments = target_segments
+        self.deleted_ratio = deleted_ratio
+        self.last_merges = {}       #< Dictionary of collection -> time of its last merge.
+
+    ##
+    # @fn   run(self)
+    #
+    # @brief    Polls every core forever.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def run(self):
+        global POLL_INTERVAL
+        while True:
+            self.poll()
+            time.sleep(POLL_INTERVAL)
+
+    ##
+    # @fn   poll(self)
+    #
+    # @brief    Reads the segment stats of every core and maintains the ones that need it.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def poll(self):
+        global MERGE_TIMEOUT
+        for collection, urls in searchengine.solr_tools.SOLR_URLS.items():
+            for offset in range(len(urls)):
+                try:
+                    solr = searchengine.solr_tools.get_solr_node(collection, offset, MERGE_TIMEOUT)
+                    if self.maintain(collection, solr, self.segment_stats(solr)) is not None:
+                        # The merge reached every node of the collection.
+                        break
+                except Exception as ex:
+                    searchengine.debugtools.log("[OPT] Could not maintain {}".format(urls[offset]))
+                    searchengine.debugtools.log_exception(ex)
+
+    ##
+    # @fn   maintain(self, collection, solr, stats)
+    #
+    # @brief    Expunges deletes or merges the segments of a core if its stats cross a threshold.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self        The class instance that this method operates on.
+    # @param    collection  The collection of the core (see SOLR_URLS).
+    # @param    solr        The core.
+    # @param    stats       Its segment stats (see segment_stats).
+    #
+    # @return   The operation that ran ("expunge" or "merge"), None if the core was left alone.
+    def maintain(self, collection, solr, stats):
+        global MAX_SEGMENT_SIZE, MERGE_COOLDOWN
+        searchengine.debugtools.log("[OPT] {}: {} segments, {:,} docs ({:.1%} deleted), {:,} MB".format(
+            solr.url, stats["segments"], stats["docs"], stats["deleted_ratio"], stats["size"] // (1024 * 1024)))
+        # Big cores keep more segments, so no merge produces a segment past MAX_SEGMENT_SIZE.
+        target = max(self.target_segments, int(math.ceil(stats["size"] / MAX_SEGMENT_SIZE)))
+        if stats["deleted_ratio"] >= self.deleted_ratio:
+            operation = "expunge"
+        elif stats["segments"] > max(self.max_segments, target):
+            operation = "merge"
+        else:
+            return None
+        if not self.in_quiet_window():
+            searchengine.debugtools.log("[OPT] {} needs {}, waiting for a quiet window.".format(solr.url, operation))
+            return None
+        if time.time() - self.last_merges.get(collection, 0) < MERGE_COOLDOWN:
+            return None
+        self.last_merges[collection] = time.time()
+        searchengine.debugtools.log("[OPT] Running {} on {}...".format(operation, solr.url))
+        if operation == "expunge":
+            solr.commit(expungeDeletes = True, waitSearcher = True)
+        else:
+            solr.optimize(maxSegments = target, waitSearcher = True)
+        searchengine.debugtools.log("[OPT] Done.")
+        return operation
+
+    ##
+    # @fn   segment_stats(self, solr)
+    #
+    # @brief    Reads the segment stats of a core from its segments admin handler.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    solr    The core.
+    #
+    # @return   Dictionary with the segment count, the doc count (deleted ones included), the ratio
+    #           of deleted docs and the index size in bytes.
+    def segment_stats(self, solr):
+        response = json.loads(solr._send_request("get", "admin/segments?wt=json"))
+        segments = response.get("segments", {}).values()
+        docs = sum(segment.get("size", 0) for segment in segments)
+        deleted = sum(segment.get("delCount", 0) for segment in segments)
+        return {
+            "segments"      : len(segments),
+            "docs"          : docs,
+            "deleted_ratio" : deleted / docs if docs > 0 else 0.0,
+            "size"          : sum(segment.get("sizeInBytes", 0) for segment in segments)
+        }
+
+    ##
+    # @fn   in_quiet_window(self, now = None)
+    #
+    # @brief    Tells whether merges may run now.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self            The class instance that this method operates on.
+    # @param    optional now    The time to check (defaults to the current time).
+    #
+    # @return   True inside a quiet window (or if there are none).
+    def in_quiet_window(self, now = None):
+        if len(self.quiet_windows) == 0:
+            return True
+        hour = time.localtime(now).tm_hour
+        for start, end in self.quiet_windows:
+            # Windows may wrap around midnight, like (22, 4).
+            if (start <= hour < end) if start <= end else (hour >= start or hour < end):
+                return True
+        return False
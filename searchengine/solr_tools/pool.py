@@ -0,0 +1,266 @@
+import os
+import time
+import pysolr
+import threading
+import searchengine.debugtools
+import searchengine.solr_tools
+from requests.adapters import HTTPAdapter
+
+SOLR_TIMEOUT = 30                   #< Seconds a request may take before it counts as a failure of its node.
+POOL_CONNECTIONS = 20               #< Connections kept open to each node.
+FAILURE_THRESHOLD = 5               #< Consecutive failures that open the circuit of a node.
+OPEN_TIME = 30                      #< Seconds an open circuit rejects requests before the node is health checked again.
+STATS_DECAY = 0.2                   #< Weight of the latest request in the latency and error rate averages.
+NON_IDEMPOTENT_UPDATES = ('update="inc"', 'update="add"', 'update="remove"')  #< Atomic updates that must not be sent twice.
+NON_IDEMPOTENT_PARAMS = ("overwrite=false",)    #< Update parameters that make a resent add index its docs twice (no dedupe on id).
+REJECTED_ERRORS = ("(HTTP 400)", "(HTTP 409)")  #< Errors of requests solr rejects (every node would).
+
+node_pools = {}                     #< Dictionary of collection -> SolrNodePool of this process.
+node_pools_pid = None               #< Process the pools were made in (sessions are not shared with forked processes).
+node_pools_mutex = threading.Lock()
+
+##
+# @class    SolrNode
+#
+# @brief    A solr node of a collection: its pooled HTTP session, latency and error rate, and
+#           circuit breaker. After FAILURE_THRESHOLD failures in a row the circuit opens and the
+#           node gets no requests for OPEN_TIME seconds, then it is pinged, and the circuit closes
+#           again once the node answers.
+#
+# @author   agent
+# @date 10/17/2026
+class SolrNode:
+
+    ##
+    # @fn   __init__(self, url, timeout = SOLR_TIMEOUT)
+    #
+    # @brief    Class initializer.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self                The class instance that this method operates on.
+    # @param    url                 The url of the core on this node.
+    # @param    optional timeout    Seconds a request may take.
+    def __init__(self, url, timeout = SOLR_TIMEOUT):
+        global POOL_CONNECTIONS
+        self.url = url
+        self.client = pysolr.Solr(url, timeout = timeout)
+        adapter = HTTPAdapter(pool_connections = 1, pool_maxsize = POOL_CONNECTIONS)
+        self.client.session.mount("http://", adapter)
+        self.client.session.mount("https://", adapter)
+        self.mutex = threading.Lock()
+        self.latency = None         #< Average seconds of a request, None until one succeeded.
+        self.error_rate = 0.0       #< Average ratio of failed requests.
+        self.failures = 0           #< Failures in a row.
+        self.open_until = None      #< Time the open circuit gets a health check, None while it is closed.
+
+    ##
+    # @fn   available(self)
+    #
+    # @brief    Tells whether the node may get requests, health checking it if its circuit is
+    #           open and its OPEN_TIME is over.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    #
+    # @return   True if the circuit is closed.
+    def available(self):
+        global OPEN_TIME
+        with self.mutex:
+            if self.open_until is None:
+                return True
+            if self.open_until > time.time():
+                return False
+            # One caller checks the node, the others keep away from it meanwhile.
+            self.open_until = time.time() + OPEN_TIME
+        start = time.time()
+        try:
+            self.client._send_request("get", "admin/ping?wt=json")
+        except Exception:
+            self.record(time.time() - start, False)
+            return False
+        self.record(time.time() - start, True)
+        searchengine.debugtools.log("[SOLR] {} is back.".format(self.url))
+        return True
+
+    ##
+    # @fn   record(self, elapsed, success)
+    #
+    # @brief    Records the outcome of a request.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    elapsed Seconds it took.
+    # @param    success False if the node failed it.
+    def record(self, elapsed, success):
+        global STATS_DECAY, FAILURE_THRESHOLD, OPEN_TIME
+        with self.mutex:
+            self.error_rate += STATS_DECAY * ((0.0 if success else 1.0) - self.error_rate)
+            if success:
+                self.latency = elapsed if self.latency is None else self.latency + STATS_DECAY * (elapsed - self.latency)
+                self.failures = 0
+                self.open_until = None
+                return
+            self.failures += 1
+            if self.failures >= FAILURE_THRESHOLD:
+                if self.open_until is None:
+                    searchengine.debugtools.log("[SOLR] {} failed {} times in a row, leaving it alone for {} seconds.".format(self.url, self.failures, OPEN_TIME))
+                self.open_until = time.time() + OPEN_TIME
+
+    ##
+    # @fn   score(self)
+    #
+    # @brief    Gets the expected cost of a request to the node (lower is better). Nodes that
+    #           never answered come first, so every node gets measured.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def score(self):
+        if self.latency is None:
+            return 0.0
+        return self.latency * (1.0 + self.error_rate * 10)
+
+##
+# @class    SolrNodePool
+#
+# @brief    The nodes of a collection.
+#
+# @author   agent
+# @date 10/17/2026
+class SolrNodePool:
+
+    ##
+    # @fn   __init__(self, urls)
+    #
+    # @brief    Class initializer.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    urls    The urls of the core on each node.
+    def __init__(self, urls):
+        self.nodes = [SolrNode(url) for url in urls]
+
+    ##
+    # @fn   route(self, preferred, read)
+    #
+    # @brief    Gets the nodes to try a request on, in order. Reads go to the fastest healthy
+    #           node, writes to the preferred node first (spreading the writers over the nodes).
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self        The class instance that this method operates on.
+    # @param    preferred   Index of the preferred node.
+    # @param    read        True for reads.
+    #
+    # @return   List of SolrNode, empty if every circuit is open.
+    def route(self, preferred, read):
+        count = len(self.nodes)
+        nodes = [self.nodes[(preferred + i) % count] for i in range(count)]
+        if read:
+            nodes.sort(key = lambda node: node.score())
+        return [node for node in nodes if node.available()]
+
+##
+# @class    PooledSolr
+#
+# @brief    A pysolr.Solr sending its requests to the nodes of a collection through their pooled
+#           sessions (see SolrNodePool.route). A request that fails on a node (timeout, connection
+#           error or server error) is retried on the next one, unless it is an update that must
+#           not be applied twice (atomic updates, adds with overwrite=false).
+#
+# @author   agent
+# @date 10/17/2026
+class PooledSolr(pysolr.Solr):
+
+    ##
+    # @fn   __init__(self, pool, preferred)
+    #
+    # @brief    Class initializer.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self        The class instance that this method operates on.
+    # @param    pool        The SolrNodePool of the collection.
+    # @param    preferred   Index of the node writes go to first.
+    def __init__(self, pool, preferred):
+        global SOLR_TIMEOUT
+        preferred = preferred % len(pool.nodes)
+        super().__init__(pool.nodes[preferred].url, timeout = SOLR_TIMEOUT)
+        self.pool = pool
+        self.preferred = preferred
+
+    ##
+    # @fn   _send_request(self, method, path = '', body = None, headers = None, files = None)
+    #
+    # @brief    Sends a request to the first node of the route that answers it.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self                The class instance that this method operates on.
+    # @param    method              The HTTP method.
+    # @param    optional path       The path, relative to the core.
+    # @param    optional body       The body.
+    # @param    optional headers    Dictionary of headers.
+    # @param    optional files      Files to upload.
+    #
+    # @return   The response body.
+    def _send_request(self, method, path = '', body = None, headers = None, files = None):
+        global NON_IDEMPOTENT_UPDATES, NON_IDEMPOTENT_PARAMS, REJECTED_ERRORS
+        read = method.lower() == "get" or path.startswith(self.search_handler)
+        query = path.partition("?")[2]
+        retry = read or not (
+            any(param in query for param in NON_IDEMPOTENT_PARAMS) or
+            (isinstance(body, str) and any(update in body for update in NON_IDEMPOTENT_UPDATES))
+        )
+        nodes = self.pool.route(self.preferred, read)
+        if len(nodes) == 0:
+            raise pysolr.SolrError("No healthy solr node for {}".format(self.url))
+        for i, node in enumerate(nodes):
+            start = time.time()
+            try:
+                response = node.client._send_request(method, path, body, headers, files)
+            except pysolr.SolrError as ex:
+                # Solr rejecting the request is no fault of the node, and every node would reject it.
+                if any(error in str(ex) for error in REJECTED_ERRORS):
+                    node.record(time.time() - start, True)
+                    raise
+                node.record(time.time() - start, False)
+                if not retry or i == len(nodes) - 1:
+                    raise
+                searchengine.debugtools.log("[SOLR] {} failed, retrying on {}".format(node.url, nodes[i + 1].url))
+                continue
+            node.record(time.time() - start, True)
+            return response
+
+##
+# @fn   get_node_pool(collection)
+#
+# @brief    Gets the SolrNodePool of a collection (creating it on first use in this process).
+#
+# @author   agent
+# @date 10/17/2026
+#
+# @param    collection  The collection (see SOLR_URLS).
+#
+# @return   The pool.
+def get_node_pool(collection):
+    global node_pools, node_pools_pid, node_pools_mutex
+    with node_pools_mutex:
+        if node_pools_pid != os.getpid():
+            node_pools = {}
+            node_pools_pid = os.getpid()
+        if collection not in node_pools:
+            node_pools[collection] = SolrNodePool(searchengine.solr_tools.SOLR_URLS[collection])
+        return node_pools[collection]
@@ -0,0 +1,177 @@
+import os
+import json
+import time
+import searchengine.debugtools
+import searchengine.solr_tools
+from searchengine.solr_tools.writer import BufferedSolrWriter
+from searchengine.solr_tools.merge import MAX_RETRIES, RETRY_WAIT
+
+REBOOST_ROWS = 500                  #< Docs read from the main core per page.
+REBOOST_QUERY = "domain:* AND -path:*"  #< Root docs, the only ones get_boost boosts.
+REBOOST_WATERMARK_PATH = os.path.join(searchengine.DATA_DIRECTORY, "solr_tools", "rebooster.json")  #< Last _version_ reboosted.
+
+##
+# @class    Rebooster
+#
+# @brief    Rewrites the index-time boosts of the root docs of the main core.
+#           Docs are streamed with cursorMark deep paging and re-added in bulk through a
+#           BufferedSolrWriter, which sends the docs of each boost profile together. Only docs
+#           whose _version_ is past the watermark of the last run (docs the merge added or
+#           changed since) are reboosted. Reboosting changes the _version_ of the docs it
+#           rewrites, so the watermark is moved past them when nothing else wrote to the core
+#           during the run; otherwise it stays at the start of the run and the next run looks
+#           at those docs again.
+#
+# @author   agent
+# @date 10/17/2026
+class Rebooster:
+
+    ##
+    # @fn   __init__(self, rows = REBOOST_ROWS, watermark_path = REBOOST_WATERMARK_PATH)
+    #
+    # @brief    Class initializer.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self                    The class instance that this method operates on.
+    # @param    optional rows           Docs read per page.
+    # @param    optional watermark_path File the watermark is kept in.
+    def __init__(self, rows = REBOOST_ROWS, watermark_path = REBOOST_WATERMARK_PATH):
+        self.rows = rows
+        self.watermark_path = watermark_path
+        self.reboosted = 0
+
+    ##
+    # @fn   run(self, full = False)
+    #
+    # @brief    Reboosts the root docs changed since the last run.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self            The class instance that this method operates on.
+    # @param    optional full   True to reboost every root doc, whatever the watermark.
+    #
+    # @return   True if every doc was reboosted.
+    def run(self, full = False):
+        solr = searchengine.solr_tools.get_solr_instance('main')
+        watermark = None if full else self.load_watermark()
+        high = self.__max_version(solr)
+        if high is None or (watermark is not None and high <= watermark):
+            searchengine.debugtools.log("[RB] Nothing changed since the last reboost.")
+            return True
+        low = "{" + str(watermark) if watermark is not None else "[*"
+        version_filter = "_version_:{} TO {}]".format(low, high)
+        writer = BufferedSolrWriter(solr)
+        try:
+            if not self.__reboost(solr, writer, version_filter):
+                return False
+            if not writer.flush():
+                return False
+        finally:
+            writer.close()
+        if writer.dropped > 0:
+            # Docs the writer dropped were never reboosted, the watermark stays where it was.
+            searchengine.debugtools.log("[RB] {:,} documents could not be reboosted, the next run retries them.".format(writer.dropped))
+            return False
+        solr.commit()
+        # Docs past high are the ones rewritten here, unless something else wrote to the core meanwhile.
+        after = self.__max_version(solr)
+        written = solr.search(q = "*:*", fq = "_version_:{{{} TO {}]".format(high, after), rows = 0).hits
+        self.save_watermark(after if written <= self.reboosted else high)
+        searchengine.debugtools.log("[RB] Reboosted {:,} documents.".format(self.reboosted))
+        return True
+
+    ##
+    # @fn   __reboost(self, solr, writer, version_filter)
+    #
+    # @brief    Streams the root docs matching the filter and re-adds them with their boost.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self            The class instance that this method operates on.
+    # @param    solr            The main core.
+    # @param    writer          BufferedSolrWriter of the main core.
+    # @param    version_filter  Filter on the _version_ of the docs.
+    #
+    # @return   False if the main core could not be read.
+    def __reboost(self, solr, writer, version_filter):
+        global REBOOST_QUERY, MAX_RETRIES, RETRY_WAIT
+        cursor = "*"
+        failures = 0
+        while True:
+            try:
+                result = solr.search(q = REBOOST_QUERY, fq = version_filter, sort = "id asc", rows = self.rows, cursorMark = cursor)
+            except Exception as ex:
+                failures += 1
+                searchengine.debugtools.log_exception(ex)
+                if failures >= MAX_RETRIES:
+                    return False
+                time.sleep(RETRY_WAIT)
+                continue
+            failures = 0
+            for doc in result.docs:
+                boost = searchengine.solr_tools.get_boost(doc)
+                if boost is None:
+                    continue
+                doc.pop('_version_', None) # Removing version history if it is in there
+                writer.add([doc], boost = boost, overwrite = True)
+                self.reboosted += 1
+            if len(result.docs) == 0 or result.nextCursorMark == cursor:
+                return True
+            cursor = result.nextCursorMark
+            searchengine.debugtools.log("[RB] Reboosting... {:,} documents so far".format(self.reboosted))
+
+    ##
+    # @fn   __max_version(self, solr)
+    #
+    # @brief    Gets the highest _version_ in the core.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    solr    The core.
+    #
+    # @return   The version, None if the core is empty.
+    def __max_version(self, solr):
+        result = solr.search(q = "*:*", sort = "_version_ desc", rows = 1, fl = "_version_")
+        if len(result.docs) == 0:
+            return None
+        return result.docs[0]["_version_"]
+
+    ##
+    # @fn   load_watermark(self)
+    #
+    # @brief    Reads the watermark of the last run.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    #
+    # @return   The _version_, None if the rebooster never ran.
+    def load_watermark(self):
+        if not os.path.exists(self.watermark_path):
+            return None
+        with open(self.watermark_path, "r") as watermark_file:
+            return json.load(watermark_file)["version"]
+
+    ##
+    # @fn   save_watermark(self, version)
+    #
+    # @brief    Saves the watermark (through a temporary file, so a crash never leaves a broken
+    #           one behind).
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    version The _version_ docs have to be past to be reboosted by the next run.
+    def save_watermark(self, version):
+        os.makedirs(os.path.dirname(self.watermark_path), exist_ok = True)
+        with open(self.watermark_path + ".tmp", "w") as watermark_file:
+            json.dump({ "version" : version, "time" : int(time.time()) }, watermark_file)
+        os.replace(self.watermark_path + ".tmp", self.watermark_path)
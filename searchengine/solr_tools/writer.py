@@ -0,0 +1,396 @@
+import time
+import atexit
+import weakref
+import threading
+import searchengine.debugtools
+from xml.etree import ElementTree
+
+FLUSH_DOCS = 500                    #< Buffered adds and deletes that trigger a flush.
+FLUSH_BYTES = 4 * 1024 * 1024       #< Rough size of the buffered docs that triggers a flush.
+FLUSH_AGE = 5                       #< Seconds the oldest buffered change may wait before it is sent.
+COMMIT_WITHIN = 10000               #< Milliseconds solr may take to make a flushed change searchable.
+MAX_BUFFERED_DOCS = FLUSH_DOCS * 20 #< Changes kept while solr is unreachable, older ones are dropped past this.
+
+open_writers = weakref.WeakSet()    #< BufferedSolrWriters the flusher thread looks after (it does not keep them alive).
+flusher = None                      #< The flusher thread shared by every writer of the process.
+flusher_mutex = threading.RLock()
+flusher_wakeup = threading.Event()  #< Set when a writer is added, so the flusher picks up its max_age.
+
+##
+# @class    BufferedSolrWriter
+#
+# @brief    Buffers adds and deletes for a solr core and sends them in bulk.
+#           Changes are flushed once FLUSH_DOCS of them (or FLUSH_BYTES) are buffered, or when the
+#           oldest is FLUSH_AGE seconds old, and none of them commit: solr makes them searchable
+#           within commit_within milliseconds instead (a soft commit on our nodes), so writers never
+#           force a hard commit. Adds with the same options are sent in one request, and a change
+#           to a doc that is still buffered with different options flushes the buffer first, so
+#           changes to one doc are applied in order (if solr is down, the change is buffered in a
+#           new generation, sent after everything buffered before it). Whatever is buffered is
+#           flushed by close(), which also runs when the process exits or the writer is collected.
+#
+# @author   agent
+# @date 10/17/2026
+class BufferedSolrWriter:
+
+    ##
+    # @fn   __init__(self, solr, max_docs = FLUSH_DOCS, max_bytes = FLUSH_BYTES, max_age = FLUSH_AGE, commit_within = COMMIT_WITHIN)
+    #
+    # @brief    Class initializer.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self                    The class instance that this method operates on.
+    # @param    solr                    The pysolr.Solr instance of the core.
+    # @param    optional max_docs       Buffered changes that trigger a flush.
+    # @param    optional max_bytes      Buffered bytes that trigger a flush.
+    # @param    optional max_age        Seconds a change may be buffered.
+    # @param    optional commit_within  Milliseconds solr may take to make changes searchable.
+    def __init__(self, solr, max_docs = FLUSH_DOCS, max_bytes = FLUSH_BYTES, max_age = FLUSH_AGE, commit_within = COMMIT_WITHIN):
+        self.solr = solr
+        self.max_docs = max_docs
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.commit_within = commit_within
+        self.mutex = threading.RLock()
+        self.generations = [{}]     #< List of dictionaries of options -> list of docs (None -> list of ids to delete), sent in order.
+        self.pending = {}           #< Dictionary of doc id -> options it is buffered with in the last generation.
+        self.size = 0
+        self.bytes = 0
+        self.oldest = None          #< Time the oldest buffered change arrived.
+        self.retry_time = 0         #< Time before which a failed flush is not retried by add/delete.
+        self.dropped = 0            #< Changes dropped while solr was unreachable (they never reached it).
+        self.closed = False
+        start_flusher(self)
+
+    ##
+    # @fn   add(self, docs, overwrite = True, fieldUpdates = None, boost = None)
+    #
+    # @brief    Buffers docs to add (same options as pysolr.Solr.add).
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self                    The class instance that this method operates on.
+    # @param    docs                    List of docs.
+    # @param    optional overwrite      False to keep docs that already exist.
+    # @param    optional fieldUpdates   Dictionary of field -> atomic update ("set", "inc", ...).
+    # @param    optional boost          Dictionary of field -> index time boost.
+    def add(self, docs, overwrite = True, fieldUpdates = None, boost = None):
+        options = (
+            overwrite,
+            tuple(sorted(fieldUpdates.items())) if fieldUpdates else None,
+            tuple(sorted(boost.items())) if boost else None
+        )
+        with self.mutex:
+            for doc in docs:
+                self.__buffer(options, doc, len(str(doc)))
+            self.__flush_if_due()
+
+    ##
+    # @fn   update(self, doc_id, set_fields = None, inc_fields = None)
+    #
+    # @brief    Buffers an atomic update of some fields of a doc, the rest of the doc is kept (and
+    #           solr creates the doc if it does not exist). Updates touching the same fields the
+    #           same way are sent together.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self                The class instance that this method operates on.
+    # @param    doc_id              The id of the doc.
+    # @param    optional set_fields Dictionary of field -> value to set.
+    # @param    optional inc_fields Dictionary of field -> amount to add to it.
+    def update(self, doc_id, set_fields = None, inc_fields = None):
+        doc = { "id" : doc_id }
+        field_updates = {}
+        for operation, fields in (("set", set_fields), ("inc", inc_fields)):
+            for field, value in (fields or {}).items():
+                doc[field] = value
+                field_updates[field] = operation
+        if len(field_updates) > 0:
+            self.add([doc], fieldUpdates = field_updates)
+
+    ##
+    # @fn   delete(self, ids)
+    #
+    # @brief    Buffers docs to delete.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    ids     An id or list of ids.
+    def delete(self, ids):
+        if isinstance(ids, str):
+            ids = [ids]
+        with self.mutex:
+            for doc_id in ids:
+                self.__buffer(None, doc_id, len(doc_id))
+            self.__flush_if_due()
+
+    ##
+    # @fn   flush(self)
+    #
+    # @brief    Sends everything that is buffered. If solr fails, the changes that were not sent
+    #           stay buffered for the next flush.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    #
+    # @return   True if the buffer is empty now.
+    def flush(self):
+        with self.mutex:
+            while len(self.generations) > 0:
+                batches = self.generations[0]
+                while len(batches) > 0:
+                    options = next(iter(batches))
+                    batch = batches[options]
+                    try:
+                        self.__send(options, batch)
+                    except Exception as ex:
+                        searchengine.debugtools.log("Could not write {:,} changes to solr, keeping them for the next flush.".format(self.size))
+                        searchengine.debugtools.log_exception(ex)
+                        self.__drop_overflow()
+                        self.retry_time = time.time() + self.max_age
+                        return False
+                    del batches[options]
+                    if len(self.generations) == 1:
+                        for item in batch:
+                            self.pending.pop(item if options is None else item["id"], None)
+                    self.size -= len(batch)
+                self.generations.pop(0)
+            self.generations = [{}]
+            self.pending = {}
+            self.size = 0
+            self.bytes = 0
+            self.oldest = None
+            return True
+
+    ##
+    # @fn   discard(self)
+    #
+    # @brief    Drops everything that is buffered, for changes that must not reach solr late.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def discard(self):
+        with self.mutex:
+            self.generations = [{}]
+            self.pending = {}
+            self.size = 0
+            self.bytes = 0
+            self.oldest = None
+
+    ##
+    # @fn   close(self)
+    #
+    # @brief    Flushes the buffer and stops the background flushes.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def close(self):
+        global open_writers, flusher_mutex
+        with self.mutex:
+            if self.closed:
+                return
+            self.closed = True
+            self.flush()
+        with flusher_mutex:
+            open_writers.discard(self)
+
+    ##
+    # @fn   flush_if_due(self)
+    #
+    # @brief    Flushes the buffer if it is full or too old (called by the flusher thread).
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def flush_if_due(self):
+        with self.mutex:
+            if not self.closed:
+                self.__flush_if_due()
+
+    ##
+    # @fn   __del__(self)
+    #
+    # @brief    Flushes what is still buffered when a writer that was not closed is collected.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    ##
+    # @fn   __buffer(self, options, item, size)
+    #
+    # @brief    Adds a change to the buffer. Called with mutex held.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    options The options of its batch (None for deletes).
+    # @param    item    The doc (or the id to delete).
+    # @param    size    Rough size of the change in bytes.
+    def __buffer(self, options, item, size):
+        doc_id = item if options is None else item["id"]
+        if self.pending.get(doc_id, options) != options:
+            # The doc has a buffered change of another kind, which has to reach solr first.
+            if self.retry_time > time.time() or not self.flush():
+                # Solr is down, the change waits in a new generation, sent after the older ones.
+                self.generations.append({})
+                self.pending = {}
+        self.generations[-1].setdefault(options, []).append(item)
+        self.pending[doc_id] = options
+        self.size += 1
+        self.bytes += size
+        if self.oldest is None:
+            self.oldest = time.time()
+
+    ##
+    # @fn   __flush_if_due(self)
+    #
+    # @brief    Flushes the buffer if it is full or too old. Called with mutex held.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def __flush_if_due(self):
+        if self.retry_time > time.time():
+            return
+        if self.size >= self.max_docs or self.bytes >= self.max_bytes or (self.oldest is not None and self.oldest + self.max_age <= time.time()):
+            self.flush()
+
+    ##
+    # @fn   __send(self, options, batch)
+    #
+    # @brief    Sends one batch of changes to solr.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    options The options of the batch (None for deletes).
+    # @param    batch   List of docs (or ids to delete).
+    def __send(self, options, batch):
+        if options is None:
+            # pysolr deletes a single id per request, so the delete message is built here.
+            message = ElementTree.Element("delete")
+            message.set("commitWithin", str(self.commit_within))
+            for doc_id in batch:
+                ElementTree.SubElement(message, "id").text = doc_id
+            self.solr._update(ElementTree.tostring(message, encoding = "unicode"), commit = False)
+            return
+        overwrite, field_updates, boost = options
+        self.solr.add(
+            batch,
+            overwrite = overwrite,
+            fieldUpdates = dict(field_updates) if field_updates else None,
+            boost = dict(boost) if boost else None,
+            commit = False,
+            commitWithin = str(self.commit_within)
+        )
+
+    ##
+    # @fn   __drop_overflow(self)
+    #
+    # @brief    Drops the oldest changes once more than MAX_BUFFERED_DOCS are waiting for solr to
+    #           come back. Called with mutex held.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def __drop_overflow(self):
+        global MAX_BUFFERED_DOCS
+        while self.size > MAX_BUFFERED_DOCS and self.size > 0:
+            batches = self.generations[0]
+            if len(batches) == 0:
+                self.generations.pop(0)
+                continue
+            options = next(iter(batches))
+            batch = batches.pop(options)
+            if len(self.generations) == 1:
+                for item in batch:
+                    self.pending.pop(item if options is None else item["id"], None)
+            self.size -= len(batch)
+            self.dropped += len(batch)
+            searchengine.debugtools.log("Dropped {:,} buffered solr changes ({:,} so far).".format(len(batch), self.dropped))
+        if self.size == 0:
+            self.generations = [{}]
+            self.pending = {}
+            self.bytes = 0
+            self.oldest = None
+
+##
+# @fn   start_flusher(writer)
+#
+# @brief    Hands a writer to the flusher thread, starting the thread with the first writer of
+#           the process.
+#
+# @author   agent
+# @date 10/17/2026
+#
+# @param    writer  The BufferedSolrWriter.
+def start_flusher(writer):
+    global open_writers, flusher, flusher_mutex, flusher_wakeup
+    with flusher_mutex:
+        open_writers.add(writer)
+        flusher_wakeup.set()
+        if flusher is None or not flusher.is_alive():
+            flusher = threading.Thread(target = flush_loop, daemon = True)
+            flusher.start()
+
+##
+# @fn   flush_loop()
+#
+# @brief    Flusher thread: flushes the changes that waited max_age in every open writer, so a
+#           writer that is not called for a while still gets its changes to solr.
+#
+# @author   agent
+# @date 10/17/2026
+def flush_loop():
+    global open_writers, flusher_mutex, flusher_wakeup, FLUSH_AGE
+    while True:
+        with flusher_mutex:
+            interval = min([writer.max_age for writer in open_writers] or [FLUSH_AGE])
+            flusher_wakeup.clear()
+        flusher_wakeup.wait(max(interval / 2, 0.1))
+        with flusher_mutex:
+            writers = list(open_writers)
+        for writer in writers:
+            writer.flush_if_due()
+        # Not holding on to the writers while sleeping, so they can be collected.
+        del writers
+
+##
+# @fn   close_open_writers()
+#
+# @brief    Flushes and closes every open writer when the process exits.
+#
+# @author   agent
+# @date 10/17/2026
+def close_open_writers():
+    global open_writers, flusher_mutex
+    with flusher_mutex:
+        writers = list(open_writers)
+    for writer in writers:
+        writer.close()
+
+atexit.register(close_open_writers)
@@ -34,6 +34,7 @@ class BaseExploit:
         self.__exploit_human_readable_name = exploit_human_readable_name    #< A string defining the human readable vulnerability that this exploits.
         self.__current_endpoint = ""                                        #< A string correlating to the current endpoint being tested.
         self.__solr_vulnerable_hosts = searchengine.solr_tools.get_solr_instance('vulnerable_hosts', url_offset = 0)
+        self.__solr_writer = searchengine.solr_tools.BufferedSolrWriter(self.__solr_vulnerable_hosts)
 
     ##
     # @fn   _set_endpoint_is_vulnerable(self)
@@ -52,7 +53,7 @@ class BaseExploit:
             'vulnerable_to'     : {"exploit_cve" : self.__exploit_cve, "exploit_human_readable_name" : self.__exploit_human_readable_name},
             'last_pentest_time' : time.time()
         })
-        self.__solr_vulnerable_hosts.add(docs, commit = True, overwrite = True)
+        self.__solr_writer.add(docs, overwrite = True)
         log("{} is vulnerable to {}({})".format(self.__current_endpoint, self.__exploit_cve, self.__exploit_human_readable_name))
 
     ###################################################################
@@ -94,6 +95,7 @@ class ExploitManager:
         self.lock = None
         self.hosts_to_pentest = []
         self.__solr_vulnerable_hosts = searchengine.solr_tools.get_solr_instance('vulnerable_hosts', url_offset = 0)
+        self.__solr_writer = searchengine.solr_tools.BufferedSolrWriter(self.__solr_vulnerable_hosts)
         self.__exploit_modules = []
         self.__load_exploit_modules()
 
@@ -117,15 +119,11 @@ class ExploitManager:
                     )
                 if len(response.docs) == 0:
                     return False
-                doc_updates = []
                 for doc in response.docs:
-                    doc_updates.append({
-                        "id"                : doc["id"],
-                        "vulnerable_to"     : doc["vulnerable_to"],
-                        "last_pentest_time" : int(time.time())
-                    })
+                    self.__solr_writer.update(doc["id"], set_fields = { "last_pentest_time" : int(time.time()) })
                     self.hosts_to_pentest.append(doc["id"])
-                self.__solr_vulnerable_hosts.add(doc_updates)
+                if self.__solr_writer.flush():
+                    self.__solr_vulnerable_hosts.commit(softCommit = True)
         next_host = self.hosts_to_pentest.pop(0)
         return next_host
 
@@ -1,9 +1,12 @@
 __all__ = [
     "CrawlerExecutor",
     "WebCrawler",
+    "AsyncWebCrawler",
     "parser",
+    "fetcher",
+    "robots",
     "webcrawler",
     "swarmcontroller"
 ]
 
-from searchengine.webcrawler.crawler import CrawlerExecutor, WebCrawler
+from searchengine.webcrawler.crawler import CrawlerExecutor, WebCrawler, AsyncWebCrawler
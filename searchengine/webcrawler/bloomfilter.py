@@ -0,0 +1,162 @@
+import os
+import math
+import mmap
+import time
+import struct
+import hashlib
+import searchengine
+
+SEEN_URLS_PATH = os.path.join(searchengine.DATA_DIRECTORY, "seen_urls.bloom") #< Default file for the crawlers' seen-url filter.
+SEEN_URLS_CAPACITY = 50000000   #< Urls the default filter holds before its error rate goes above SEEN_URLS_ERROR_RATE.
+SEEN_URLS_ERROR_RATE = 0.01
+
+HEADER = struct.Struct("<8sQI")
+MAGIC = b"OSSEBLM1"
+
+##
+# @class    BloomFilter
+#
+# @brief    Bloom filter of url fingerprints stored in a memory mapped file.
+#           Every crawler process on a host maps the same file, so a url seen by one worker is
+#           seen by all of them, and the filter survives restarts. Bits are set without locking:
+#           two processes racing on the same byte can drop a bit, which only lets an already seen
+#           url through once more.
+#
+# @author   agent
+# @date 10/17/2026
+class BloomFilter:
+
+    ##
+    # @fn   __init__(self, path, capacity = SEEN_URLS_CAPACITY, error_rate = SEEN_URLS_ERROR_RATE)
+    #
+    # @brief    Class initializer. Opens the filter stored at path, creating it if needed.
+    #           The size of an existing file wins over capacity and error_rate.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self                    The class instance that this method operates on.
+    # @param    path                    The filter file.
+    # @param    optional capacity       Expected number of keys.
+    # @param    optional error_rate     Wanted false positive rate at capacity.
+    def __init__(self, path, capacity = SEEN_URLS_CAPACITY, error_rate = SEEN_URLS_ERROR_RATE):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok = True)
+        try:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_EXCL)
+            num_bits = int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+            num_bits += (8 - num_bits % 8) % 8
+            num_hashes = max(1, int(round(num_bits / capacity * math.log(2))))
+            os.ftruncate(fd, HEADER.size + num_bits // 8)
+            # The header goes in last, other processes wait for it before mapping the file.
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.write(fd, HEADER.pack(MAGIC, num_bits, num_hashes))
+        except FileExistsError:
+            fd = os.open(path, os.O_RDWR)
+            num_bits, num_hashes = self.__wait_for_header(fd)
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.map = mmap.mmap(fd, HEADER.size + num_bits // 8)
+        os.close(fd)
+
+    ##
+    # @fn   add(self, key)
+    #
+    # @brief    Adds a key to the filter.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    key     The key (string).
+    #
+    # @return   True if the key was (probably) already in the filter.
+    def add(self, key):
+        found = True
+        for position in self.__positions(key):
+            index = HEADER.size + (position >> 3)
+            mask = 1 << (position & 7)
+            byte = self.map[index]
+            if not byte & mask:
+                found = False
+                self.map[index] = byte | mask
+        return found
+
+    ##
+    # @fn   __contains__(self, key)
+    #
+    # @brief    Checks if a key is (probably) in the filter.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    key     The key (string).
+    def __contains__(self, key):
+        for position in self.__positions(key):
+            if not self.map[HEADER.size + (position >> 3)] & (1 << (position & 7)):
+                return False
+        return True
+
+    ##
+    # @fn   flush(self)
+    #
+    # @brief    Writes dirty pages back to the filter file.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def flush(self):
+        self.map.flush()
+
+    ##
+    # @fn   close(self)
+    #
+    # @brief    Flushes and unmaps the filter.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def close(self):
+        self.map.flush()
+        self.map.close()
+
+    ##
+    # @fn   __positions(self, key)
+    #
+    # @brief    Gets the bit positions of a key (double hashing over one 128 bit digest).
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    key     The key (string).
+    def __positions(self, key):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size = 16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    ##
+    # @fn   __wait_for_header(self, fd)
+    #
+    # @brief    Reads the header of a filter file, waiting for the process creating it to finish.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    fd      Open descriptor of the filter file.
+    #
+    # @return   (number of bits, number of hashes)
+    def __wait_for_header(self, fd):
+        for i in range(100):
+            os.lseek(fd, 0, os.SEEK_SET)
+            magic, num_bits, num_hashes = HEADER.unpack(os.read(fd, HEADER.size).ljust(HEADER.size, b"\0"))
+            if magic == MAGIC:
+                return num_bits, num_hashes
+            time.sleep(0.1)
+        os.close(fd)
+        raise IOError("Not a bloom filter file: " + self.path)
@@ -1,4 +1,5 @@
 ﻿import re
+import asyncio
 import searchengine.debugtools
 import urllib.request
 import time
@@ -8,12 +9,77 @@ import searchengine.solr_tools
 from datetime import date, timedelta
 from os import path
 from urllib.parse import urlparse, urlsplit, quote, urlunsplit
-from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from searchengine.solr_tools import VALIDATOR_FIELDS, REVISIT_FIELDS, BufferedSolrWriter
 from searchengine.manager.managers import ClientManager
 from searchengine.compression.compressionhelper import CompressionHelper
-from searchengine.webcrawler.parser import Parser
+from searchengine.frontier.frontier import Frontier, FRONTIER_DIRECTORY
+from searchengine.webcrawler.pagereader import PageReader
+from searchengine.webcrawler.fetcher import AsyncFetcher, FetchError
+from searchengine.webcrawler.scheduler import HostScheduler, BACKOFF_CODES
+from searchengine.webcrawler.revisit import RevisitScheduler
+from searchengine.webcrawler.bloomfilter import BloomFilter, SEEN_URLS_PATH
+from searchengine.webcrawler.robots import RobotsCache, RobotsError, ROBOTS_ERROR_TTL
+from searchengine.webcrawler.publicsuffix import get_public_suffix_list
+from searchengine.dedup import NearDuplicateIndex, simhash, fingerprint_fields
+from searchengine.dedup.simhash import MIN_TOKENS
+from searchengine.archive import WarcWriter, WARC_DIRECTORY
+import searchengine.analysis
 
-TLD_LIST_URL = "https://publicsuffix.org/list/effective_tld_names.dat"
+FRONTIER_REFILL_SIZE = 1000 #< Urls claimed from solr each time a crawler's frontier runs dry.
+URL_FLUSH_SIZE = 1000       #< Found urls buffered before they are posted to solr.
+LEASE_RENEW_INTERVAL = 60 * 10  #< Seconds between renewals of the leases a crawler is still working on.
+LEASE_SYNC_INTERVAL = 30    #< Seconds between two acks of the leases a crawler completed.
+IDLE_WAIT = 10              #< Seconds to wait before asking for more urls after finding none.
+MAX_PAGE_SIZE = 2 * 1024 * 1024 #< Bytes of a page downloaded and parsed, the rest is cut off.
+PAGE_CONTENT_TYPES = (
+    "text/html",
+    "application/xhtml+xml",
+    "text/xml",
+    "application/xml",
+    "application/rss+xml",
+    "text/plain"
+)                           #< Media types of pages the crawler parses (checked before downloading the body).
+
+##
+# @fn   page_document(url, page, public_suffixes, update_time = None)
+#
+# @brief    Builds the working core doc of a crawled page.
+#
+# @author   Edward Callahan
+# @date 8/12/2016
+#
+# @param    url                     The url of the page.
+# @param    page                    The closed PageParser of the page.
+# @param    public_suffixes         The PublicSuffixList used to split the host.
+# @param    optional update_time    Time the page was fetched, now if None.
+#
+# @return   The doc, None if the page has no title or content.
+def page_document(url, page, public_suffixes, update_time = None):
+    if len(page.title) == 0 or len(page.content) == 0:
+        return None
+    parsed = urlparse(url)
+    is_https = parsed.scheme == "https"
+    host = parsed.hostname
+    while host.endswith('/'):
+        host = host[:-1]
+    path = parsed.path
+    while path.endswith('/'):
+        path = path[:-1]
+    subdomain, domain, this_tld = public_suffixes.split_host(host)
+    return {
+            "id"               : host + path,
+            "meta_keywords"    : searchengine.analysis.clean_string(page.meta_keywords),
+            "meta_description" : searchengine.analysis.clean_string(page.meta_description),
+            "title"            : searchengine.analysis.clean_string(page.meta_title if len(page.meta_title) > 0 else page.title),
+            "content"          : searchengine.analysis.clean_string(page.content),
+            "is_https"         : is_https,
+            "subdomain"        : subdomain,
+            "domain"           : domain,
+            "tld"              : this_tld,
+            "path"             : path,
+            "last_update_time" : int(update_time if update_time is not None else time.time())
+    }
 
 ##
 # @class    CrawlerExecutor
@@ -26,8 +92,9 @@ TLD_LIST_URL = "https://publicsuffix.org/list/effective_tld_names.dat"
 # @author   Edward Callahan
 # @date 6/13/2016
 class CrawlerExecutor(ProcessPoolExecutor):
-    def __init__(self, crawler_type = None, max_workers = None, ip_address = 'localhost', port = 4948, authkey = None):
+    def __init__(self, crawler_type = None, max_workers = None, ip_address = 'localhost', port = 4948, authkey = None, crawler_args = None):
         self.crawler_type = crawler_type
+        self.crawler_args = crawler_args if crawler_args is not None else {}
         self.ip_address = ip_address
         self.port = port
         self.authkey = authkey
@@ -46,10 +113,11 @@ class CrawlerExecutor(ProcessPoolExecutor):
     # @return   A value.
     def execute_tasks(self):
         manager = ClientManager(self.ip_address, self.port, self.authkey)
-        lock = manager.Lock()
+        claims = manager.ClaimService()
+        robots_store = manager.RobotsStore()
         for i in range(self._max_workers):
-            crawler = self.crawler_type(i, download_images = False)
-            self.submit(crawler.run, lock)
+            crawler = self.crawler_type(i, download_images = False, **self.crawler_args)
+            self.submit(crawler.run, claims, robots_store)
         self.shutdown(wait = True)
 
 
@@ -61,10 +129,10 @@ class CrawlerExecutor(ProcessPoolExecutor):
 #
 # @author   Edward Callahan
 # @date 6/12/2016
-class WebCrawler(Parser):
+class WebCrawler:
 
     ##
-    # @fn   __init__(self, id, download_images = False)
+    # @fn   __init__(self, id, download_images = False, batch_size = 20, archive = False)
     #
     # @brief    Class initializer.
     #
@@ -74,115 +142,269 @@ class WebCrawler(Parser):
     # @param    self                        The class instance that this method operates on.
     # @param    id                          The identifier.
     # @param    optional download_images    The download images.
-    def __init__(self, id, download_images = False):
-        Parser.__init__(self)
+    # @param    optional batch_size         Number of urls taken from the frontier at a time.
+    # @param    optional archive            True to archive every fetched page in WARC files.
+    def __init__(self, id, download_images = False, batch_size = 20, archive = False):
         self.id = id
         self.download_images = download_images
+        self.archive = archive
+        self.batch_size = batch_size
         self.current_url = None
-        self.meta_title = ""
-        self.meta_description = ""
-        self.meta_keywords = ""
-        self.title = ""
-        self.content = ""
-        self.future_urls = []
-        self.found_urls = []
-        self.lock = None
-        self.tld_list = []
+        self.scheduler = HostScheduler()
+        self.max_scheduled = batch_size * 10
+        self.next_load_time = 0
+        self.found_urls = set()     #< New urls waiting to be posted, they go into seen_urls once solr has them.
+        self.seen_urls = None
+        self.claims = None
+        self.lease_remaining = {}
+        self.url_leases = {}
+        self.url_history = {}       #< Dictionary of url -> validators and revisit state stored by its last crawl.
+        self.page_state = {}        #< Validators and revisit state of the page being processed, posted with its content.
+        self.revisits = RevisitScheduler()
+        self.completed_leases = []
+        self.last_lease_renewal = time.time()
+        self.next_lease_sync = 0
+        self.public_suffixes = None
         self.solr_working = None
         self.solr_main = None
+        self.working_writer = None  #< BufferedSolrWriter of the working core.
+        self.main_writer = None     #< BufferedSolrWriter of the main core.
+        self.warc_writer = None     #< WarcWriter of the fetched pages, if archiving.
+        self.fetcher = None
+        self.robots = None
+        self.frontier = None
+        self.duplicates = None
         
 
     ##
-    # @fn   __clean_string(self, string)
+    # @fn   prepare(self)
     #
-    # @brief    Clean a string of uneeded white space or "\n" characters embedded in text.
-    #           Also cleans XML or HTML tags in string.
+    # @brief    Connects to solr and loads the public suffix list if this has not been done yet.
     #
-    # @author   Edward Callahan
-    # @date 8/13/2016
+    # @author   agent
+    # @date 10/17/2026
     #
     # @param    self    The class instance that this method operates on.
-    # @param    string  The string.
-    def __clean_string(self, string):
-        string = re.sub('[\s|\\n]+', ' ', string)
-        string = re.sub('<[^>]*>', '', string)
-        return string
-
+    def prepare(self):
+        if self.solr_working is None:
+            self.solr_working = searchengine.solr_tools.get_solr_instance('working', self.id)
+        if self.solr_main is None:
+            self.solr_main = searchengine.solr_tools.get_solr_instance('main', self.id)
+        if self.working_writer is None:
+            self.working_writer = BufferedSolrWriter(self.solr_working)
+        if self.main_writer is None:
+            self.main_writer = BufferedSolrWriter(self.solr_main)
+        if self.duplicates is None:
+            self.duplicates = NearDuplicateIndex(self.solr_working)
+        if self.archive and self.warc_writer is None:
+            self.warc_writer = WarcWriter(path.join(WARC_DIRECTORY, "wc_{}".format(self.id)), "wc{}".format(self.id))
+        if self.frontier is None:
+            self.frontier = Frontier(path.join(FRONTIER_DIRECTORY, "wc_{}".format(self.id)))
+        if self.seen_urls is None:
+            self.seen_urls = BloomFilter(SEEN_URLS_PATH)
+        # Loading the public suffix list (from its disk cache unless it is due for a refresh)
+        if self.public_suffixes is None:
+            self.public_suffixes = get_public_suffix_list()
 
     ##
-    # @fn   run(self, lock)
+    # @fn   run(self, claims, robots_store = None)
     #
     # @brief    Loop that is used to crawl through the web.
     #
     # @author   Edward Callahan
     # @date 6/13/2016
     #
-    # @param    self    The class instance that this method operates on.
-    # @param    lock    Global synchronization lock.
-    def run(self, lock):
-        global TLD_LIST_URL
-        self.lock = lock
-        while(True):
-            if self.solr_working is None:
-                self.solr_working = searchengine.solr_tools.get_solr_instance('working', self.id)
-            if self.solr_main is None:
-                self.solr_main = searchengine.solr_tools.get_solr_instance('main', self.id)
-            # Loading TLD list
-            if len(self.tld_list) == 0:
-                searchengine.debugtools.log("[WC:{}] Loading TLD list...".format(str(self.id)))
-                response = urllib.request.urlopen(TLD_LIST_URL)
-                full_text_list = response.read().decode()
-                tmp_tld_list = [s.strip() for s in full_text_list.splitlines()]
-                self.tld_list = [tld for tld in tmp_tld_list if not tld.startswith('//') and not tld.startswith('*') and len(tld) > 0]
-                continue
-            
-            try:
-                self.current_url = self.get_url_to_crawl()
+    # @param    self                    The class instance that this method operates on.
+    # @param    claims                  Proxy to the manager's ClaimService.
+    # @param    optional robots_store   Proxy to the manager's RobotsStore.
+    def run(self, claims, robots_store = None):
+        self.claims = claims
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self.fetcher = AsyncFetcher(max_connections = 10)
+        self.robots = RobotsCache(self.fetcher, robots_store)
+        try:
+            while(True):
+                self.prepare()
 
-                if not self.current_url or self.current_url is None:
+                try:
+                    self.sync_leases()
+                    self.current_url = self.get_url_to_crawl()
+
+                    if not self.current_url or self.current_url is None:
+                        time.sleep(10)
+                        continue
+                except Exception as ex:
+                    searchengine.debugtools.log_exception(ex)
                     time.sleep(10)
                     continue
-            except Exception as ex:
-                searchengine.debugtools.log_exception(ex)
-                time.sleep(10)
-                continue
 
+                url = self.current_url
+                status = retry_after = None
+                try:
+                    searchengine.debugtools.log("[WC:"+ str(self.id) + "] Crawling url: " + url)
+
+                    response, page = loop.run_until_complete(self.fetch_page(url))
+                    self.process_page(url, response, page)
+                except Exception as ex:
+                    status, retry_after = self.discard_page(url, ex)
+                finally:
+                    self.finish_url(url, status, retry_after)
+        finally:
+            self.close_writers()
+
+    ##
+    # @fn   close_writers(self)
+    #
+    # @brief    Sends whatever is still buffered for solr (found urls included) and finishes the
+    #           WARC file.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def close_writers(self):
+        if self.working_writer is not None:
             try:
-                searchengine.debugtools.log("[WC:"+ str(self.id) + "] Crawling url: " + self.current_url)
-
-                req = urllib.request.Request(
-                    self.current_url,
-                    headers = {
-                        "User-Agent" : "OS-SEARCH-ENGINE-CRAWLER"
-                    }
-                )
-                response = urllib.request.urlopen(req)
-                if self.current_url != response.geturl():
-                    self.__delete_from_solr()
-                    self.current_url = response.geturl()
-                    self.current_url = self.parse_url2(self.current_url)
- 
-                data = response.read()
-                html = data.decode("utf-8")
-                self.feed(html)
-                self.close()
-
-                if len(self.future_urls) == 0:
-                    self.__post_urls_to_solr()
-                    self.found_urls.clear()
-                self.content = " ".join(self.split_key_words(self.content))
-                self.__post_content_to_solr()
-
-                self.tagQueue.clear()
-                self.meta_title = ""
-                self.meta_description = ""
-                self.meta_description = ""
-                self.title = ""
-                self.content = ""
+                self.__post_urls_to_solr()
             except Exception as ex:
-                self.__delete_from_solr()
-                searchengine.debugtools.log("[WC:"+ str(self.id) + "] Could not grab url: " + self.current_url)
                 searchengine.debugtools.log_exception(ex)
+        for writer in (self.working_writer, self.main_writer, self.warc_writer):
+            if writer is not None:
+                writer.close()
+        self.working_writer = None
+        self.main_writer = None
+        self.warc_writer = None
+
+    ##
+    # @fn   fetch_page(self, url)
+    #
+    # @brief    Downloads a url if the site's robots.txt allows it.
+    #           The robots.txt Crawl-delay is handed to the scheduler for the following requests.
+    #           Urls crawled before are requested conditionally with the validators of the last crawl.
+    #           The body is decoded and parsed as it arrives, and cut off after MAX_PAGE_SIZE bytes.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    url     The url.
+    #
+    # @return   (FetchResponse, PageReader)
+    async def fetch_page(self, url):
+        rules = await self.robots.get_rules(url)
+        if rules.crawl_delay is not None:
+            self.scheduler.set_delay(self.scheduler.host_of(url), rules.crawl_delay)
+        if rules.unavailable:
+            raise RobotsError("robots.txt unavailable: " + url, unavailable = True, retry_after = ROBOTS_ERROR_TTL)
+        if not rules.is_allowed(url):
+            raise RobotsError("Disallowed by robots.txt: " + url)
+        headers = {}
+        validators = self.url_history.get(url, {})
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+        page = PageReader(keep_body = self.warc_writer is not None)
+        response = await self.fetcher.fetch(url, headers, page, MAX_PAGE_SIZE, PAGE_CONTENT_TYPES)
+        return response, page
+
+    ##
+    # @fn   process_page(self, url, response, page)
+    #
+    # @brief    Posts the content and outgoing urls of a downloaded page to solr.
+    #           Pages that did not change since the last crawl (304, or the same content hash) only
+    #           get their revisit state updated. The caller finishes the url (see finish_url).
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self        The class instance that this method operates on.
+    # @param    url         The url that was requested.
+    # @param    response    The FetchResponse.
+    # @param    page        The PageReader the body was streamed to.
+    def process_page(self, url, response, page):
+        final_url = response.geturl()
+        history = self.url_history.get(url, {})
+        unchanged = response.status == 304
+        if not unchanged:
+            page.close()
+            content_hash = page.content_hash()
+            if self.warc_writer is not None:
+                self.warc_writer.write_response(response, page.body())
+            unchanged = url == final_url and content_hash == history.get("content_hash")
+        crawled_before = any(field in history for field in VALIDATOR_FIELDS)
+        self.page_state = self.revisits.update(history, not unchanged if crawled_before else None)
+        # No body was parsed (a 3xx that is not a redirect), so there is no content to post either.
+        if unchanged or page.parser is None:
+            self.__post_revisit_to_solr(url)
+            self.page_state = {}
+            return
+        self.page_state["content_hash"] = content_hash
+        if "etag" in response.headers:
+            self.page_state["etag"] = response.headers["etag"]
+        if "last-modified" in response.headers:
+            self.page_state["last_modified"] = response.headers["last-modified"]
+
+        self.current_url = url
+        if self.current_url != final_url:
+            self.__delete_from_solr()
+            self.current_url = final_url
+            self.current_url = self.parse_url2(self.current_url)
+
+        if response.truncated:
+            searchengine.debugtools.log("[WC:"+ str(self.id) + "] Page cut off at {:,} bytes: {}".format(page.size, url))
+        for link in page.parser.urls:
+            self.found_url(link)
+        for image in page.parser.images:
+            self.found_image(image)
+
+        if len(self.found_urls) >= URL_FLUSH_SIZE:
+            self.__post_urls_to_solr()
+        tokens = self.split_key_words(page.parser.content)
+        page.parser.content = " ".join(tokens)
+        self.__post_content_to_solr(page.parser, tokens)
+
+        self.page_state = {}
+
+    ##
+    # @fn   discard_page(self, url, ex)
+    #
+    # @brief    Removes a url that could not be crawled from solr and logs why.
+    #           Urls of hosts that are throttling us (429/503) or whose robots.txt could not be
+    #           fetched are kept, and the host is backed off. Urls robots.txt disallows only leave
+    #           the working core, their indexed page is kept. The caller finishes the url with the
+    #           returned status (see finish_url).
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    url     The url that failed.
+    # @param    ex      The exception raised while crawling it.
+    #
+    # @return   (status, retry_after) for finish_url.
+    def discard_page(self, url, ex):
+        self.current_url = url
+        self.page_state = {}
+        status = ex.status if isinstance(ex, FetchError) else None
+        retry_after = None
+        if isinstance(ex, RobotsError) and ex.unavailable:
+            # Only robots.txt is down, the host is backed off as for a 503 and the url kept.
+            status = 503
+            retry_after = ex.retry_after
+        elif status in BACKOFF_CODES:
+            # The host is only throttling us, the url is kept for a later crawl.
+            if ex.headers.get("retry-after", "").isdigit():
+                retry_after = int(ex.headers["retry-after"])
+        else:
+            try:
+                self.__delete_from_solr(main = not isinstance(ex, RobotsError))
+            except Exception as delete_ex:
+                searchengine.debugtools.log_exception(delete_ex)
+        searchengine.debugtools.log("[WC:"+ str(self.id) + "] Could not grab url: " + url)
+        searchengine.debugtools.log_exception(ex)
+        return status, retry_after
 
     ##
     # @fn   parse_url2(self, resource_url)
@@ -236,50 +458,34 @@ class WebCrawler(Parser):
         return result_url
 
     ##
-    # @fn   __post_content_to_solr(self)
+    # @fn   __post_content_to_solr(self, page, tokens)
     #
     # @brief    Posts data and content to solr.
+    #           Pages that are near-duplicates of a page crawled before are posted without their
+    #           content, with duplicate_of naming the canonical page.
     #
     # @author   Edward Callahan
     # @date 8/12/2016
     #
     # @param    self    The class instance that this method operates on.
-    def __post_content_to_solr(self):
-        if len(self.title) == 0 or len(self.content) == 0:
+    # @param    page    The PageParser of the page.
+    # @param    tokens  The words of the page content (see split_key_words).
+    def __post_content_to_solr(self, page, tokens):
+        doc = page_document(self.current_url, page, self.public_suffixes)
+        if doc is None:
             return
-        parsed = urlparse(self.current_url)
-        is_https = parsed.scheme == "https"
-        host = parsed.hostname
-        while host.endswith('/'):
-            host = host[:-1]
-        subdomain = ""
-        domain = host
-        path = parsed.path
-        this_tld = ""
-        hostsplit = host.split('.')
-        while path.endswith('/'):
-            path = path[:-1]
-        for i in range(1, len(hostsplit)):
-            end = ".".join(hostsplit[i:])
-            if end in self.tld_list:
-                this_tld = end
-                domain = hostsplit[:i][-1]
-                subdomain = ".".join(hostsplit[:i-1])
-                break
-        doc = {
-                "id"               : host + path,
-                "meta_keywords"    : self.__clean_string(self.meta_keywords),
-                "meta_description" : self.__clean_string(self.meta_description),
-                "title"            : self.__clean_string(self.meta_title if len(self.meta_title) > 0 else self.title),
-                "content"          : self.__clean_string(self.content),
-                "is_https"         : is_https,
-                "subdomain"        : subdomain,
-                "domain"           : domain,
-                "tld"              : this_tld,
-                "path"             : path,
-                "last_update_time" : int(time.time())
-        }
-        self.solr_working.add([doc], overwrite=True, commit=False)
+        doc.update(self.page_state)
+        if len(tokens) >= MIN_TOKENS:
+            fingerprint = simhash(tokens)
+            doc.update(fingerprint_fields(fingerprint))
+            canonical = self.duplicates.find(doc["id"], fingerprint)
+            self.duplicates.remember(doc["id"], fingerprint, canonical)
+            if canonical is not None:
+                searchengine.debugtools.log("[WC:"+ str(self.id) + "] Near-duplicate of " + canonical + ": " + doc["id"])
+                for field in ("meta_keywords", "meta_description", "title", "content"):
+                    del doc[field]
+                doc["duplicate_of"] = canonical
+        self.working_writer.add([doc], overwrite=True)
 
     ##
     # @fn   split_key_words(self, orig_string)
@@ -292,17 +498,14 @@ class WebCrawler(Parser):
     # @param    self        The class instance that this method operates on.
     # @param    orig_string The string to split.
     def split_key_words(self, orig_string):
-        all_words = re.findall(r"\w+", orig_string)
-
-        # Removing invalid words
-        all_words = [word.lower() for word in all_words if re.match("[A-Za-z]", word)]
-
-        return all_words
+        return searchengine.analysis.split_key_words(orig_string)
 
     ##
     # @fn   __post_urls_to_solr(self)
     #
     # @brief    Posts the parsed urls to solr (does not overwrite existing urls).
+    #           They are only marked as seen once solr has them, urls that did not make it are
+    #           posted again the next time they are found.
     #
     # @author   Edward Callahan
     # @date 8/12/2016
@@ -326,18 +529,41 @@ class WebCrawler(Parser):
                 "is_https"         : is_https,
                 "last_update_time" : 0
             })
-        self.solr_working.add(docs, overwrite = False, commit=True)
+        self.working_writer.add(docs, overwrite = False)
+        if self.working_writer.flush():
+            for url in self.found_urls:
+                self.seen_urls.add(url)
+        self.found_urls.clear()
 
     ##
-    # @fn   __delete_from_solr(self)
+    # @fn   __post_revisit_to_solr(self, url)
+    #
+    # @brief    Stores the revisit state of an unchanged page (an atomic update, the page itself is kept).
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    url     The url.
+    def __post_revisit_to_solr(self, url):
+        parsed = urlparse(url)
+        host = parsed.hostname
+        path = parsed.path
+        while path.endswith('/'):
+            path = path[:-1]
+        self.working_writer.update(host + path, set_fields = self.page_state)
+
+    ##
+    # @fn   __delete_from_solr(self, main = True)
     #
     # @brief    Delete this url from solr.
     #
     # @author   Edward Callahan
     # @date 8/13/2016
     #
-    # @param    self    The class instance that this method operates on.
-    def __delete_from_solr(self):
+    # @param    self            The class instance that this method operates on.
+    # @param    optional main   False to keep the url in the main core.
+    def __delete_from_solr(self, main = True):
         parsed = urlparse(self.current_url)
         host = parsed.hostname
         path = parsed.path
@@ -345,8 +571,9 @@ class WebCrawler(Parser):
             host = host[:-1]
         while path.endswith('/'):
             path = path[:-1]
-        self.solr_working.delete(host + path, commit=False)
-        self.solr_main.delete(host + path, commit=True)
+        self.working_writer.delete(host + path)
+        if main:
+            self.main_writer.delete(host + path)
 
     ##
     # @fn   validate_url(self, url)
@@ -368,7 +595,7 @@ class WebCrawler(Parser):
     ##
     # @fn   add_url(self, url)
     #
-    # @brief    Adds a URL to our list to be crawled if it has not been crawled yet.
+    # @brief    Adds a URL to our list to be crawled if it has not been seen yet.
     #
     # @author   Edward Callahan
     # @date 6/12/2016
@@ -418,40 +645,240 @@ class WebCrawler(Parser):
             file_type = path_split[-1].split(".")
             if file_type[-1] not in allowed_types:
                 return
-        if url not in self.found_urls:
-            self.found_urls.append(url)
+        # Links into paths robots.txt has already excluded are not worth storing.
+        if not self.robots.is_allowed(url):
+            return
+
+        # Most links point at urls we already know about, skipping those saves a solr write each.
+        if url not in self.seen_urls:
+            self.found_urls.add(url)
 
     ##
     # @fn   get_url_to_crawl(self)
     #
-    # @brief    Gets URL to crawl.
+    # @brief    Gets URL to crawl, waiting for the politeness delay of its host if needed.
     #
     # @author   Edward Callahan
     # @date 6/13/2016
     #
     # @param    self    The class instance that this method operates on.
     def get_url_to_crawl(self):
-        # Querying database for url to crawl
-        if len(self.future_urls) == 0:
-            with self.lock:
-                response = self.solr_working.search("last_update_time:[0 TO " + str(int(time.time() - (60 * 60 * 24 * 7))) + "]", rows=20)
-                if len(response.docs) == 0:
-                    return False
-                doc_updates = []
-                for doc in response.docs:
-                    doc_updates.append({
-                        "id"               : doc["id"],
-                        "last_update_time" : int(time.time())
-                    })
-                    self.future_urls.append("http" + ("s" if doc["is_https"] else "") + "://" + doc["id"])
-                self.solr_working.add(doc_updates)
-        next_url = self.future_urls.pop(0)
+        next_url = self.next_scheduled_url()
+        if next_url is None:
+            wait = self.scheduler.wait_time()
+            if wait is None:
+                return False
+            time.sleep(wait)
+            next_url = self.scheduler.next_url()
+        return next_url if next_url is not None else False
+
+    ##
+    # @fn   next_scheduled_url(self)
+    #
+    # @brief    Gets a url whose host may be fetched right now, loading more urls from the
+    #           frontier while every queued host still has to wait.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    #
+    # @return   The url, or None if no host is ready.
+    def next_scheduled_url(self):
+        next_url = self.scheduler.next_url()
+        while next_url is None and len(self.scheduler) < self.max_scheduled and time.time() >= self.next_load_time:
+            if not self.load_urls_to_crawl():
+                self.next_load_time = time.time() + IDLE_WAIT
+                break
+            next_url = self.scheduler.next_url()
         return next_url
 
+    ##
+    # @fn   load_urls_to_crawl(self, refill = True)
+    #
+    # @brief    Moves the next batch of urls from the frontier into the scheduler, refilling the
+    #           frontier through the claim service first if it has run dry.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self            The class instance that this method operates on.
+    # @param    optional refill False if the caller already claimed urls for an empty frontier.
+    #
+    # @return   False if there was nothing to crawl, else True.
+    def load_urls_to_crawl(self, refill = True):
+        if refill and self.frontier.empty():
+            self.refill_frontier()
+        batch = self.frontier.pop_batch(self.batch_size)
+        for entry in batch:
+            self.scheduler.add(entry["url"])
+            self.seen_urls.add(entry["url"])
+            if entry.get("lease") in self.lease_remaining:
+                self.url_leases.setdefault(entry["url"], []).append(entry["lease"])
+            history = { field : entry[field] for field in VALIDATOR_FIELDS + REVISIT_FIELDS if field in entry }
+            if len(history) > 0:
+                self.url_history[entry["url"]] = history
+        # Resolving the batch's hosts now keeps DNS lookups out of the fetches.
+        self.fetcher.resolver.prefetch(self.scheduler.host_of(entry["url"]) for entry in batch)
+        return len(batch) > 0
+
+    ##
+    # @fn   refill_frontier(self)
+    #
+    # @brief    Claims a large batch of urls from the claim service and appends them to the frontier.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    #
+    # @return   False if there was nothing to crawl, else True.
+    def refill_frontier(self):
+        global FRONTIER_REFILL_SIZE
+        lease_id, entries = self.claims.claim(FRONTIER_REFILL_SIZE)
+        return self.push_lease(lease_id, entries)
+
+    ##
+    # @fn   push_lease(self, lease_id, entries)
+    #
+    # @brief    Appends the urls of a lease from the claim service to the frontier.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self        The class instance that this method operates on.
+    # @param    lease_id    The lease id (None if there was nothing to claim).
+    # @param    entries     The claimed entries.
+    #
+    # @return   False if there was nothing to crawl, else True.
+    def push_lease(self, lease_id, entries):
+        if lease_id is None:
+            return False
+        self.lease_remaining[lease_id] = len(entries)
+        for entry in entries:
+            entry["lease"] = lease_id
+        self.frontier.push(entries)
+        return True
+
+    ##
+    # @fn   finish_url(self, url, status = None, retry_after = None)
+    #
+    # @brief    Records that a url is done (crawled or discarded), frees its host in the scheduler
+    #           and completes its lease once every url in it is done.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self                    The class instance that this method operates on.
+    # @param    url                     The url taken from the scheduler.
+    # @param    optional status         HTTP status code of a failed fetch.
+    # @param    optional retry_after    Seconds from the Retry-After header of a failed fetch.
+    def finish_url(self, url, status = None, retry_after = None):
+        self.scheduler.done(url, status, retry_after)
+        self.url_history.pop(url, None)
+        leases = self.url_leases.get(url)
+        if not leases:
+            return
+        lease_id = leases.pop(0)
+        if len(leases) == 0:
+            del self.url_leases[url]
+        if lease_id in self.lease_remaining:
+            self.lease_remaining[lease_id] -= 1
+            if self.lease_remaining[lease_id] <= 0:
+                del self.lease_remaining[lease_id]
+                self.completed_leases.append(lease_id)
+
+    ##
+    # @fn   sync_leases(self)
+    #
+    # @brief    Acks completed leases in bulk and periodically renews the ones still in progress.
+    #           Does nothing until LEASE_SYNC_INTERVAL seconds passed since the last sync, so it is
+    #           called on every turn of the crawl loop, whether urls are being loaded or not.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def sync_leases(self):
+        sync = self.begin_lease_sync()
+        if sync is None:
+            return
+        try:
+            expired = self.send_lease_sync(*sync)
+        except Exception:
+            self.end_lease_sync(sync[0], None)
+            raise
+        self.end_lease_sync(sync[0], expired)
+
+    ##
+    # @fn   begin_lease_sync(self)
+    #
+    # @brief    Takes the leases to ack, and the ones to renew if a renewal is due.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    #
+    # @return   (list of completed lease ids, list of lease ids to renew), None if no sync is due.
+    def begin_lease_sync(self):
+        global LEASE_RENEW_INTERVAL, LEASE_SYNC_INTERVAL
+        if time.time() < self.next_lease_sync:
+            return None
+        self.next_lease_sync = time.time() + LEASE_SYNC_INTERVAL
+        completed = self.completed_leases
+        self.completed_leases = []
+        renewing = []
+        if len(self.lease_remaining) > 0 and time.time() - self.last_lease_renewal > LEASE_RENEW_INTERVAL:
+            renewing = list(self.lease_remaining.keys())
+            self.last_lease_renewal = time.time()
+        return completed, renewing
+
+    ##
+    # @fn   send_lease_sync(self, completed, renewing)
+    #
+    # @brief    Acks and renews leases through the claim service. This is the blocking part of a
+    #           sync and it touches no crawler state, so it may run on any thread.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self        The class instance that this method operates on.
+    # @param    completed   List of completed lease ids.
+    # @param    renewing    List of lease ids to renew.
+    #
+    # @return   List of the lease ids that could not be renewed.
+    def send_lease_sync(self, completed, renewing):
+        if len(completed) > 0:
+            self.claims.ack(completed)
+        if len(renewing) > 0:
+            return self.claims.renew(renewing)
+        return []
+
+    ##
+    # @fn   end_lease_sync(self, completed, expired)
+    #
+    # @brief    Applies the outcome of send_lease_sync.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self        The class instance that this method operates on.
+    # @param    completed   List of the lease ids that were acked.
+    # @param    expired     List of the lease ids that could not be renewed, None if the claim
+    #                       service could not be reached (the leases are acked by the next sync).
+    def end_lease_sync(self, completed, expired):
+        if expired is None:
+            self.completed_leases.extend(completed)
+            return
+        for lease_id in expired:
+            # Already handed out again, nothing left to ack.
+            self.lease_remaining.pop(lease_id, None)
+
     ##
     # @fn   found_url(self, url)
     #
-    # @brief    Override from Parser.
+    # @brief    Handles a link found on the current page.
     #
     # @author   Edward Callahan
     # @date 6/12/2016
@@ -465,7 +892,7 @@ class WebCrawler(Parser):
     ##
     # @fn   found_image(self, url)
     #
-    # @brief    Found image url.
+    # @brief    Handles an image found on the current page.
     #
     # @author   Edward Callahan
     # @date 6/12/2016
@@ -488,47 +915,145 @@ class WebCrawler(Parser):
             except Exception as ex:
                 searchengine.debugtools.log("[WC:"+ str(self.id) + "] Failed to download image: " + str(ex))
 
+
+##
+# @class    AsyncWebCrawler
+#
+# @brief    WebCrawler that keeps many fetches in flight at once on an asyncio event loop.
+#           Every page is parsed by its own PageParser as its body arrives, while link handling
+#           and solr posting still happen one page at a time, on a thread of their own so solr
+#           never blocks the loop. The crawl state (scheduler, frontier, leases) is only changed
+#           on the loop thread: the claim service calls run on executor threads and their results
+#           are applied once they return.
+#
+# @author   agent
+# @date 10/17/2026
+class AsyncWebCrawler(WebCrawler):
+
+    ##
+    # @fn   __init__(self, id, download_images = False, concurrency = 100, archive = False)
+    #
+    # @brief    Class initializer.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self                        The class instance that this method operates on.
+    # @param    id                          The identifier.
+    # @param    optional download_images    The download images.
+    # @param    optional concurrency        Number of fetches kept in flight.
+    # @param    optional archive            True to archive every fetched page in WARC files.
+    def __init__(self, id, download_images = False, concurrency = 100, archive = False):
+        WebCrawler.__init__(self, id, download_images, batch_size = max(20, concurrency), archive = archive)
+        self.concurrency = concurrency
+        self.robots_store = None
+        self.loop = None
+        self.page_executor = None   #< Thread the pages are posted to solr on, one at a time.
+
     ##
-    # @fn   foundContent(self, content)
+    # @fn   run(self, claims, robots_store = None)
     #
-    # @brief    Override from parser.
+    # @brief    Runs the crawl loop on a new event loop.
     #
-    # @author   Edward Callahan
-    # @date 6/16/2016
+    # @author   agent
+    # @date 10/17/2026
     #
-    # @param    self    The class instance that this method operates on.
-    # @param    content The content.
-    def found_content(self, content):
-        self.content += content
+    # @param    self                    The class instance that this method operates on.
+    # @param    claims                  Proxy to the manager's ClaimService.
+    # @param    optional robots_store   Proxy to the manager's RobotsStore.
+    def run(self, claims, robots_store = None):
+        self.claims = claims
+        self.robots_store = robots_store
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(self.crawl())
+        finally:
+            if self.page_executor is not None:
+                self.page_executor.shutdown(wait = True)
+            self.close_writers()
+            loop.close()
 
     ##
-    # @fn   found_title(self, title)
+    # @fn   crawl(self)
     #
-    # @brief    Override from parser.
+    # @brief    Keeps up to self.concurrency fetches in flight to hosts the scheduler allows,
+    #           refilling from the frontier as they complete.
     #
-    # @author   Edward Callahan
-    # @date 6/20/2016
+    # @author   agent
+    # @date 10/17/2026
     #
     # @param    self    The class instance that this method operates on.
-    # @param    title   The title.
-    def found_title(self, title):
-        self.title += title
+    async def crawl(self):
+        global FRONTIER_REFILL_SIZE
+        loop = asyncio.get_event_loop()
+        self.loop = loop
+        self.page_executor = ThreadPoolExecutor(max_workers = 1)
+        self.fetcher = AsyncFetcher(max_connections = self.concurrency)
+        self.robots = RobotsCache(self.fetcher, self.robots_store)
+        in_flight = set()
+        while(True):
+            sync = self.begin_lease_sync()
+            if sync is not None:
+                try:
+                    expired = await loop.run_in_executor(None, self.send_lease_sync, *sync)
+                except Exception as ex:
+                    searchengine.debugtools.log_exception(ex)
+                    expired = None
+                self.end_lease_sync(sync[0], expired)
+            try:
+                if len(in_flight) < self.concurrency and self.scheduler.wait_time() != 0 \
+                        and len(self.scheduler) < self.max_scheduled and time.time() >= self.next_load_time:
+                    await loop.run_in_executor(None, self.prepare)
+                    if self.frontier.empty():
+                        lease_id, entries = await loop.run_in_executor(None, self.claims.claim, FRONTIER_REFILL_SIZE)
+                        self.push_lease(lease_id, entries)
+                    if not self.load_urls_to_crawl(refill = False):
+                        self.next_load_time = time.time() + IDLE_WAIT
+            except Exception as ex:
+                searchengine.debugtools.log_exception(ex)
+                self.next_load_time = time.time() + IDLE_WAIT
+
+            while len(in_flight) < self.concurrency:
+                url = self.scheduler.next_url()
+                if url is None:
+                    break
+                in_flight.add(loop.create_task(self.crawl_url(url)))
+
+            # Waking up when a fetch completes, a host becomes ready, it is time to look for more urls
+            # or to sync the leases (even while every fetch slot is busy).
+            wait = self.scheduler.wait_time()
+            if wait is None or len(in_flight) >= self.concurrency:
+                wait = max(0, self.next_load_time - time.time()) if len(in_flight) == 0 else None
+            until_sync = max(0, self.next_lease_sync - time.time())
+            wait = until_sync if wait is None else min(wait, until_sync)
+            if len(in_flight) == 0:
+                await asyncio.sleep(wait)
+                continue
+            done, in_flight = await asyncio.wait(in_flight, timeout = wait, return_when = asyncio.FIRST_COMPLETED)
 
     ##
-    # @fn   found_meta_name_content_pair(self, name, content)
+    # @fn   crawl_url(self, url)
     #
-    # @brief    Override from Parser.
+    # @brief    Fetches a single url, then parses and posts it on the page thread. The url is
+    #           finished on the loop once whatever happened, so its host is never left active, and
+    #           no exception escapes the task.
     #
-    # @author   Edward Callahan
-    # @date 6/21/2016
+    # @author   agent
+    # @date 10/17/2026
     #
     # @param    self    The class instance that this method operates on.
-    # @param    name    The name.
-    # @param    content The content.
-    def found_meta_name_content_pair(self, name, content):
-        if name == "title":
-            self.meta_title = content
-        elif name == "description":
-            self.meta_description = content
-        elif name == "keywords":
-            self.meta_keywords = content
\ No newline at end of file
+    # @param    url     The url to crawl.
+    async def crawl_url(self, url):
+        status = retry_after = None
+        try:
+            searchengine.debugtools.log("[WC:"+ str(self.id) + "] Crawling url: " + url)
+            try:
+                response, page = await self.fetch_page(url)
+                await self.loop.run_in_executor(self.page_executor, self.process_page, url, response, page)
+            except Exception as ex:
+                status, retry_after = await self.loop.run_in_executor(self.page_executor, self.discard_page, url, ex)
+        except Exception as ex:
+            searchengine.debugtools.log_exception(ex)
+        finally:
+            self.finish_url(url, status, retry_after)
@@ -0,0 +1,680 @@
+import asyncio
+import ssl
+import time
+import zlib
+from urllib.parse import urlsplit, urljoin
+from searchengine.webcrawler.resolver import DnsCache
+
+USER_AGENT = "OS-SEARCH-ENGINE-CRAWLER"
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+READ_SIZE = 64 * 1024   #< Bytes read from a socket at a time while streaming a body.
+ACCEPT_ENCODING = "gzip, deflate"
+MAX_DECODED_SIZE = 16 * 1024 * 1024  #< Bytes a compressed body may expand to when the caller gave no max_bytes.
+
+##
+# @class    FetchError
+#
+# @brief    Raised when a url could not be fetched (bad status, too many redirects, broken response).
+#
+# @author   agent
+# @date 10/17/2026
+class FetchError(Exception):
+    def __init__(self, message, status = None, headers = None):
+        super().__init__(message)
+        self.status = status    #< HTTP status code if the server answered, else None.
+        self.headers = headers if headers is not None else {}   #< Response headers if the server answered.
+
+##
+# @class    PooledConnection
+#
+# @brief    An open connection owned by a ConnectionPool.
+#
+# @author   agent
+# @date 10/17/2026
+class PooledConnection:
+    def __init__(self, key, reader, writer):
+        self.key = key                  #< (scheme, host, port) this connection is bound to.
+        self.reader = reader
+        self.writer = writer
+        self.last_used = time.time()    #< Time this connection was last handed back to the pool.
+        self.reused = False             #< True if this connection already served a request.
+
+    ##
+    # @fn   close(self)
+    #
+    # @brief    Closes the underlying socket.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def close(self):
+        self.writer.close()
+
+##
+# @class    ConnectionPool
+#
+# @brief    Keep-alive connection pool keyed by scheme, host and port.
+#           Idle connections are evicted after idle_timeout seconds, and the total number of
+#           open sockets (in use or idle) never goes above max_connections.
+#
+# @author   agent
+# @date 10/17/2026
+class ConnectionPool:
+
+    ##
+    # @fn   __init__(self, ssl_context, resolver = None, max_connections = 100, max_idle_per_host = 4, idle_timeout = 30)
+    #
+    # @brief    Class initializer.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self                        The class instance that this method operates on.
+    # @param    ssl_context                 SSL context used for https connections.
+    # @param    optional resolver           DnsCache used to resolve hosts, None to let asyncio resolve them.
+    # @param    optional max_connections    Cap on open sockets.
+    # @param    optional max_idle_per_host  Idle connections kept for a single host.
+    # @param    optional idle_timeout       Seconds an idle connection is kept.
+    def __init__(self, ssl_context, resolver = None, max_connections = 100, max_idle_per_host = 4, idle_timeout = 30):
+        self.ssl_context = ssl_context
+        self.resolver = resolver
+        self.max_connections = max_connections
+        self.max_idle_per_host = max_idle_per_host
+        self.idle_timeout = idle_timeout
+        self.idle = {}              #< Dictionary of key -> list of idle connections (most recent last).
+        self.open_count = 0         #< Sockets currently open (in use and idle).
+        self.last_sweep = time.time()
+        self.condition = None
+
+    ##
+    # @fn   acquire(self, scheme, host, port, fresh = False)
+    #
+    # @brief    Gets an idle connection to the given endpoint, or opens a new one.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self            The class instance that this method operates on.
+    # @param    scheme          "http" or "https".
+    # @param    host            The host name.
+    # @param    port            The port.
+    # @param    optional fresh  True to open a new connection, closing the idle ones of the endpoint.
+    #
+    # @return   A PooledConnection.
+    async def acquire(self, scheme, host, port, fresh = False):
+        if self.condition is None:
+            self.condition = asyncio.Condition()
+        key = (scheme, host, port)
+        self.__sweep()
+        async with self.condition:
+            if fresh:
+                # The server dropped one of them, the others were likely dropped too.
+                for connection in self.idle.pop(key, []):
+                    self.__close(connection)
+                self.condition.notify_all()
+            while True:
+                idle = self.idle.get(key)
+                while idle:
+                    connection = idle.pop()
+                    if not connection.reader.at_eof():
+                        connection.reused = True
+                        return connection
+                    self.__close(connection)
+                if self.open_count < self.max_connections:
+                    break
+                if not self.__evict_oldest():
+                    await self.condition.wait()
+            self.open_count += 1
+        try:
+            is_https = scheme == "https"
+            address = await self.resolver.resolve(host) if self.resolver is not None else host
+            reader, writer = await asyncio.open_connection(
+                address,
+                port,
+                ssl = self.ssl_context if is_https else None,
+                server_hostname = host if is_https else None
+            )
+        except BaseException:
+            await self.__closed()
+            raise
+        return PooledConnection(key, reader, writer)
+
+    ##
+    # @fn   release(self, connection, reusable)
+    #
+    # @brief    Hands a connection back to the pool.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self        The class instance that this method operates on.
+    # @param    connection  The connection.
+    # @param    reusable    True if the connection can serve another request.
+    async def release(self, connection, reusable):
+        idle = self.idle.setdefault(connection.key, [])
+        if reusable and len(idle) < self.max_idle_per_host:
+            connection.last_used = time.time()
+            idle.append(connection)
+            # Anything waiting for a free slot can now reuse or evict this connection.
+            async with self.condition:
+                self.condition.notify()
+            return
+        connection.close()
+        await self.__closed()
+
+    ##
+    # @fn   close(self)
+    #
+    # @brief    Closes every idle connection.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def close(self):
+        for idle in self.idle.values():
+            for connection in idle:
+                connection.close()
+                self.open_count -= 1
+        self.idle.clear()
+
+    ##
+    # @fn   __closed(self)
+    #
+    # @brief    Accounts for a closed socket and wakes up anything waiting for a free slot.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    async def __closed(self):
+        async with self.condition:
+            self.open_count -= 1
+            self.condition.notify()
+
+    ##
+    # @fn   __close(self, connection)
+    #
+    # @brief    Closes an idle connection that was already removed from self.idle.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self        The class instance that this method operates on.
+    # @param    connection  The connection.
+    def __close(self, connection):
+        connection.close()
+        self.open_count -= 1
+
+    ##
+    # @fn   __sweep(self)
+    #
+    # @brief    Closes connections that have been idle longer than idle_timeout (at most once a second).
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def __sweep(self):
+        now = time.time()
+        if now - self.last_sweep < 1:
+            return
+        self.last_sweep = now
+        for key in list(self.idle.keys()):
+            idle = self.idle[key]
+            keep = []
+            for connection in idle:
+                if now - connection.last_used > self.idle_timeout:
+                    self.__close(connection)
+                else:
+                    keep.append(connection)
+            if len(keep) > 0:
+                self.idle[key] = keep
+            else:
+                del self.idle[key]
+
+    ##
+    # @fn   __evict_oldest(self)
+    #
+    # @brief    Closes the least recently used idle connection to make room for a new one.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    #
+    # @return   False if there was no idle connection to evict.
+    def __evict_oldest(self):
+        oldest = None
+        for idle in self.idle.values():
+            if len(idle) > 0 and (oldest is None or idle[0].last_used < oldest.last_used):
+                oldest = idle[0]
+        if oldest is None:
+            return False
+        self.idle[oldest.key].remove(oldest)
+        self.__close(oldest)
+        return True
+
+##
+# @class    FetchResponse
+#
+# @brief    A fully read HTTP response.
+#
+# @author   agent
+# @date 10/17/2026
+class FetchResponse:
+    def __init__(self, url, status, reason, headers, body, truncated = False, request = b"", head = b"", address = None):
+        self.url = url              #< Final url (after redirects).
+        self.status = status        #< HTTP status code.
+        self.reason = reason        #< HTTP reason phrase.
+        self.headers = headers      #< Dictionary of headers (lowercased names).
+        self.body = body            #< Raw response body (empty if it was handed to a sink).
+        self.truncated = truncated  #< True if the body was cut off at max_bytes.
+        self.request = request      #< Raw bytes of the request that got this response.
+        self.head = head            #< Raw bytes of the status line and headers, as received.
+        self.address = address      #< IP address of the server, None if unknown.
+
+    ##
+    # @fn   geturl(self)
+    #
+    # @brief    Same as urllib's response.geturl(), the url after redirects.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def geturl(self):
+        return self.url
+
+##
+# @class    ResponseBody
+#
+# @brief    Collects a response body as it is read, decompressing it if it has a Content-Encoding.
+#           The decoded size is capped, and decompression never produces more than what is still
+#           allowed, so a small compressed body cannot expand into gigabytes in memory.
+#
+# @author   agent
+# @date 10/17/2026
+class ResponseBody:
+
+    ##
+    # @fn   __init__(self, encoding, sink, max_bytes)
+    #
+    # @brief    Class initializer.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self        The class instance that this method operates on.
+    # @param    encoding    The Content-Encoding header ("" if none).
+    # @param    sink        Object the decoded bytes are fed to, None to keep them.
+    # @param    max_bytes   Decoded bytes accepted, None for no limit.
+    def __init__(self, encoding, sink, max_bytes):
+        global MAX_DECODED_SIZE
+        encoding = encoding.strip().lower()
+        self.encoding = encoding
+        self.sink = sink
+        self.chunks = []
+        self.size = 0
+        self.truncated = False      #< True once decoded bytes past max_bytes had to be dropped.
+        self.raw_deflate = False    #< True if a "deflate" body turned out to have no zlib header.
+        self.started = False        #< True once some compressed input was accepted.
+        self.decompressor = None
+        if encoding in ("gzip", "x-gzip"):
+            self.decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == "deflate":
+            self.decompressor = zlib.decompressobj(zlib.MAX_WBITS)
+        elif encoding not in ("", "identity"):
+            raise FetchError("Unsupported content encoding: " + encoding)
+        if max_bytes is None and self.decompressor is not None:
+            max_bytes = MAX_DECODED_SIZE
+        self.limit = max_bytes
+
+    ##
+    # @fn   write(self, data)
+    #
+    # @brief    Takes the next bytes read from the connection.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    data    The bytes, as sent.
+    #
+    # @return   False once max_bytes have been taken and no more should be read.
+    def write(self, data):
+        if self.decompressor is not None:
+            data = self.__decompress(data)
+        elif self.limit is not None and self.size + len(data) > self.limit:
+            data = data[:self.limit - self.size]
+            self.truncated = True
+        self.__deliver(data)
+        return not self.truncated and (self.limit is None or self.size < self.limit)
+
+    ##
+    # @fn   finish(self)
+    #
+    # @brief    Flushes the decompressor once the whole body has been read.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    #
+    # @return   The body bytes (empty if they went to the sink).
+    def finish(self):
+        if self.decompressor is not None and not self.truncated:
+            data = self.decompressor.flush()
+            if self.limit is not None and self.size + len(data) > self.limit:
+                data = data[:self.limit - self.size]
+                self.truncated = True
+            self.__deliver(data)
+        return b"".join(self.chunks)
+
+    ##
+    # @fn   __decompress(self, data)
+    #
+    # @brief    Decompresses the next bytes, producing at most what is still allowed.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    data    The compressed bytes.
+    def __decompress(self, data):
+        allowed = self.limit - self.size if self.limit is not None else 0
+        try:
+            decoded = self.decompressor.decompress(data, allowed)
+        except zlib.error as ex:
+            if self.encoding != "deflate" or self.raw_deflate or self.started:
+                raise FetchError("Broken compressed body: " + str(ex))
+            # Some servers send "deflate" bodies without the zlib header.
+            self.raw_deflate = True
+            self.decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+            return self.__decompress(data)
+        self.started = True
+        if len(self.decompressor.unconsumed_tail) > 0:
+            # Input left over means the output hit the limit, it is never decompressed.
+            self.truncated = True
+        return decoded
+
+    ##
+    # @fn   __deliver(self, data)
+    #
+    # @brief    Hands decoded bytes to the sink, or keeps them if there is none.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    data    The bytes.
+    def __deliver(self, data):
+        if len(data) == 0:
+            return
+        self.size += len(data)
+        if self.sink is not None:
+            self.sink.feed(data)
+        else:
+            self.chunks.append(data)
+
+##
+# @class    AsyncFetcher
+#
+# @brief    Minimal asyncio HTTP/1.1 client used by the AsyncWebCrawler.
+#           Many fetches can be in flight at once from a single event loop.
+#
+# @author   agent
+# @date 10/17/2026
+class AsyncFetcher:
+
+    ##
+    # @fn   __init__(self, timeout = 30, max_redirects = 5, user_agent = USER_AGENT, max_connections = 100, idle_timeout = 30)
+    #
+    # @brief    Class initializer.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self                        The class instance that this method operates on.
+    # @param    optional timeout            Seconds allowed for a single request.
+    # @param    optional max_redirects      Redirects followed before giving up.
+    # @param    optional user_agent         User agent sent with every request.
+    # @param    optional max_connections    Cap on open sockets held by the connection pool.
+    # @param    optional idle_timeout       Seconds a keep-alive connection may sit idle in the pool.
+    def __init__(self, timeout = 30, max_redirects = 5, user_agent = USER_AGENT, max_connections = 100, idle_timeout = 30):
+        self.timeout = timeout
+        self.max_redirects = max_redirects
+        self.user_agent = user_agent
+        self.ssl_context = ssl.create_default_context()
+        self.resolver = DnsCache()
+        self.pool = ConnectionPool(self.ssl_context, self.resolver, max_connections = max_connections, idle_timeout = idle_timeout)
+
+    ##
+    # @fn   fetch(self, url, headers = None, sink = None, max_bytes = None, content_types = None)
+    #
+    # @brief    Fetches a url, following redirects.
+    #           With a sink, the body of the final 2xx response is streamed to sink.feed as it arrives
+    #           (after a call to sink.begin(url, headers)) instead of being kept in memory.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self                    The class instance that this method operates on.
+    # @param    url                     The url to fetch.
+    # @param    optional headers        Extra request headers.
+    # @param    optional sink           Object with begin(url, headers) and feed(data) methods.
+    # @param    optional max_bytes      Bytes of a body read before it is cut off, None for no limit.
+    # @param    optional content_types  Media types accepted for a 2xx response, None for any.
+    #
+    # @return   A FetchResponse.
+    async def fetch(self, url, headers = None, sink = None, max_bytes = None, content_types = None):
+        for i in range(self.max_redirects + 1):
+            response = await asyncio.wait_for(self.__request(url, headers, sink, max_bytes, content_types), self.timeout)
+            if response.status in REDIRECT_CODES and "location" in response.headers:
+                url = urljoin(url, response.headers["location"])
+                continue
+            if response.status >= 400:
+                raise FetchError("HTTP Error {}: {}".format(response.status, response.reason), response.status, response.headers)
+            return response
+        raise FetchError("Too many redirects: " + url)
+
+    ##
+    # @fn   __request(self, url, headers, sink, max_bytes, content_types)
+    #
+    # @brief    Sends a single GET request and reads the response.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self            The class instance that this method operates on.
+    # @param    url             The url to request.
+    # @param    headers         Extra request headers (may be None).
+    # @param    sink            Receives the body of a 2xx response (may be None).
+    # @param    max_bytes       Bytes of the body read before it is cut off (may be None).
+    # @param    content_types   Media types accepted for a 2xx response (may be None).
+    #
+    # @return   A FetchResponse.
+    async def __request(self, url, headers, sink, max_bytes, content_types):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise FetchError("Unsupported url: " + url)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        retried = False
+        while True:
+            connection = await self.pool.acquire(parts.scheme, parts.hostname, port, fresh = retried)
+            reusable = False
+            try:
+                request = self.__build_request(parts, headers)
+                connection.writer.write(request)
+                try:
+                    status, reason, response_headers, head = await self.__read_head(connection.reader)
+                except (FetchError, ConnectionError, asyncio.IncompleteReadError):
+                    if connection.reused and not retried:
+                        # The server closed this keep-alive connection while it sat in the pool,
+                        # retried once on a new one.
+                        retried = True
+                        continue
+                    raise
+                success = 200 <= status < 300
+                if success and content_types is not None:
+                    media_type = response_headers.get("content-type", "").split(";")[0].strip().lower()
+                    if len(media_type) > 0 and media_type not in content_types:
+                        # Rejected before reading any of the body, the connection is dropped instead.
+                        raise FetchError("Unsupported content type: " + media_type, status, response_headers)
+                if success and sink is not None:
+                    sink.begin(url, response_headers)
+                body, complete = await self.__read_body(connection.reader, status, response_headers, sink if success else None, max_bytes)
+                reusable = complete and self.__is_reusable(response_headers)
+                peer = connection.writer.get_extra_info("peername")
+            finally:
+                await self.pool.release(connection, reusable)
+            return FetchResponse(url, status, reason, response_headers, body, not complete, request, head, peer[0] if peer else None)
+
+    ##
+    # @fn   close(self)
+    #
+    # @brief    Closes every pooled connection.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def close(self):
+        self.pool.close()
+        self.resolver.close()
+
+    ##
+    # @fn   __is_reusable(self, headers)
+    #
+    # @brief    Checks if the connection can be kept alive after a response with these headers.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    headers The response headers.
+    def __is_reusable(self, headers):
+        if "close" in headers.get("connection", "").lower():
+            return False
+        return "content-length" in headers or "chunked" in headers.get("transfer-encoding", "").lower()
+
+    ##
+    # @fn   __build_request(self, parts, headers)
+    #
+    # @brief    Builds the raw bytes of a GET request.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    parts   The result of urlsplit on the url.
+    # @param    headers Extra request headers (may be None).
+    def __build_request(self, parts, headers):
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        host = parts.hostname if parts.port is None else "{}:{}".format(parts.hostname, parts.port)
+        lines = [
+            "GET {} HTTP/1.1".format(target),
+            "Host: " + host,
+            "User-Agent: " + self.user_agent,
+            "Accept: text/html,application/xhtml+xml,*/*;q=0.8",
+            "Accept-Encoding: " + ACCEPT_ENCODING,
+            "Connection: keep-alive"
+        ]
+        if headers is not None:
+            for name, value in headers.items():
+                lines.append("{}: {}".format(name, value))
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    ##
+    # @fn   __read_head(self, reader)
+    #
+    # @brief    Reads the status line and headers of a response.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    reader  The stream reader.
+    #
+    # @return   (status, reason, headers, raw bytes of the head)
+    async def __read_head(self, reader):
+        raw_line = await reader.readline()
+        lines = [raw_line]
+        status_line = raw_line.decode("latin-1").strip()
+        if len(status_line) == 0:
+            raise FetchError("Connection closed before response")
+        status_split = status_line.split(" ", 2)
+        if len(status_split) < 2 or not status_split[0].startswith("HTTP/"):
+            raise FetchError("Bad status line: " + status_line)
+        status = int(status_split[1])
+        reason = status_split[2] if len(status_split) > 2 else ""
+        headers = {}
+        while True:
+            raw_line = await reader.readline()
+            lines.append(raw_line)
+            line = raw_line.decode("latin-1")
+            if line in ("\r\n", "\n", ""):
+                break
+            name, sep, value = line.partition(":")
+            name = name.strip().lower()
+            value = value.strip()
+            headers[name] = headers[name] + ", " + value if name in headers else value
+        return status, reason, headers, b"".join(lines)
+
+    ##
+    # @fn   __read_body(self, reader, status, headers, sink, max_bytes)
+    #
+    # @brief    Reads a response body (chunked, sized or until the connection closes), decoding
+    #           its Content-Encoding on the way and stopping once max_bytes decoded bytes have
+    #           been produced.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self        The class instance that this method operates on.
+    # @param    reader      The stream reader.
+    # @param    status      The response status code.
+    # @param    headers     The response headers.
+    # @param    sink        Object the body is fed to as it arrives, None to return it.
+    # @param    max_bytes   Decoded bytes read before the body is cut off, None for no limit.
+    #
+    # @return   (body bytes, True if the whole body was read).
+    async def __read_body(self, reader, status, headers, sink, max_bytes):
+        global READ_SIZE
+        if status in (204, 304) or status < 200:
+            # These responses never have a body, whatever their headers say.
+            return b"", True
+        body = ResponseBody(headers.get("content-encoding", ""), sink, max_bytes)
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            while True:
+                size_line = (await reader.readline()).decode("latin-1")
+                size = int(size_line.split(";")[0].strip() or "0", 16)
+                if size == 0:
+                    # Skipping trailers
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    return body.finish(), True
+                while size > 0:
+                    data = await reader.readexactly(min(size, READ_SIZE))
+                    size -= len(data)
+                    if not body.write(data):
+                        return body.finish(), False
+                await reader.readline()
+        if "content-length" in headers:
+            remaining = int(headers["content-length"])
+            while remaining > 0:
+                data = await reader.readexactly(min(remaining, READ_SIZE))
+                remaining -= len(data)
+                if not body.write(data) and remaining > 0:
+                    return body.finish(), False
+            data = body.finish()
+            return data, not body.truncated
+        while True:
+            data = await reader.read(READ_SIZE)
+            if len(data) == 0:
+                return body.finish(), True
+            if not body.write(data):
+                return body.finish(), False
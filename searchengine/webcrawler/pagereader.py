@@ -0,0 +1,162 @@
+import re
+import codecs
+import hashlib
+from searchengine.webcrawler.parser import PageParser
+
+SNIFF_SIZE = 1024           #< Bytes searched for a <meta> charset when the headers do not name one.
+DEFAULT_CHARSET = "utf-8"
+HEADER_CHARSET = re.compile(r"charset\s*=\s*[\"']?([-\w.:]+)", re.I)
+META_CHARSET = re.compile(br"<meta[^>]+charset\s*=\s*[\"']?\s*([-\w.:]+)", re.I)
+BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16")
+)
+
+##
+# @class    PageReader
+#
+# @brief    Fetch sink that decodes a page and feeds it to a PageParser while it downloads.
+#           The charset comes from a byte order mark, the Content-Type header or a <meta> tag in
+#           the first SNIFF_SIZE bytes (in that order), and undecodable bytes are replaced instead
+#           of failing the page. The raw bytes are hashed on the way through, and kept if the
+#           page is going to be archived.
+#
+# @author   agent
+# @date 10/17/2026
+class PageReader:
+
+    ##
+    # @fn   __init__(self, keep_body = False)
+    #
+    # @brief    Class initializer.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self                The class instance that this method operates on.
+    # @param    optional keep_body  True to keep the raw bytes of the body for body().
+    def __init__(self, keep_body = False):
+        self.url = None
+        self.parser = None
+        self.charset = None         #< Charset named by the Content-Type header, if any.
+        self.decoder = None
+        self.pending = b""          #< Bytes kept back until the charset is known.
+        self.size = 0
+        self.hash = hashlib.blake2b(digest_size = 16)
+        self.chunks = [] if keep_body else None
+
+    ##
+    # @fn   begin(self, url, headers)
+    #
+    # @brief    Called by the fetcher before the body of the page arrives.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    url     The url of the page (after redirects).
+    # @param    headers The response headers.
+    def begin(self, url, headers):
+        self.url = url
+        self.parser = PageParser(url)
+        match = HEADER_CHARSET.search(headers.get("content-type", ""))
+        self.charset = match.group(1) if match else None
+
+    ##
+    # @fn   feed(self, data)
+    #
+    # @brief    Called by the fetcher with each piece of the body.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    data    The bytes.
+    def feed(self, data):
+        global SNIFF_SIZE
+        self.hash.update(data)
+        self.size += len(data)
+        if self.chunks is not None:
+            self.chunks.append(data)
+        if self.decoder is None:
+            self.pending += data
+            if self.charset is None and len(self.pending) < SNIFF_SIZE:
+                return
+            self.__start_decoder()
+            data = self.pending
+            self.pending = b""
+        self.parser.feed(self.decoder.decode(data))
+
+    ##
+    # @fn   close(self)
+    #
+    # @brief    Decodes and parses whatever is left once the body is complete (or cut off).
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def close(self):
+        if self.parser is None:
+            # begin() was never called (no body was read), nothing to parse.
+            return
+        if self.decoder is None:
+            self.__start_decoder()
+        self.parser.feed(self.decoder.decode(self.pending, final = True))
+        self.pending = b""
+        self.parser.close()
+
+    ##
+    # @fn   content_hash(self)
+    #
+    # @brief    Gets the hash of the raw bytes read so far.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def content_hash(self):
+        return self.hash.hexdigest()
+
+    ##
+    # @fn   body(self)
+    #
+    # @brief    Gets the raw bytes of the body read so far.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    #
+    # @return   The bytes, None if the reader was not asked to keep them.
+    def body(self):
+        if self.chunks is None:
+            return None
+        return b"".join(self.chunks)
+
+    ##
+    # @fn   __start_decoder(self)
+    #
+    # @brief    Picks the charset from what is known so far and creates the incremental decoder.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def __start_decoder(self):
+        global DEFAULT_CHARSET
+        charset = None
+        for bom, bom_charset in BOMS:
+            if self.pending.startswith(bom):
+                charset = bom_charset
+                break
+        if charset is None:
+            charset = self.charset
+        if charset is None:
+            match = META_CHARSET.search(self.pending[:SNIFF_SIZE])
+            charset = match.group(1).decode("ascii") if match else DEFAULT_CHARSET
+        try:
+            self.decoder = codecs.getincrementaldecoder(charset)(errors = "replace")
+        except LookupError:
+            self.decoder = codecs.getincrementaldecoder(DEFAULT_CHARSET)(errors = "replace")
@@ -1,217 +1,145 @@
-from html.parser import HTMLParser, HTMLParseError
+from searchengine.extraction import ExtractionEngine
 
 ##
 # @class    Parser
 #
 # @brief    A parser.
+#           Tags and text are handled by the shared ExtractionEngine, child classes override its
+#           found_* methods.
 #
 # @author   Edward Callahan
 # @date 6/12/2016
-class Parser(HTMLParser):
-
-    def __init__(self):
-        HTMLParser.__init__(self)
-        self.tagQueue = []
+class Parser(ExtractionEngine):
 
     ##
-    # @fn   handle_starttag(self, tag, attrs)
+    # @fn   __init__(self, backend = None)
     #
-    # @brief    Executed when we encounter an opening tag.
+    # @brief    Class initializer.
     #
     # @author   Edward Callahan
     # @date 6/12/2016
     #
-    # @param    self    The class instance that this method operates on.
-    # @param    tag     The found tag.
-    # @param    attrs   The attributes of that tag.
-    def handle_starttag(self, tag, attrs):
-        self.tagQueue.append(tag)
-        # Checking to see if the tag has potential for a url.
-        if tag == "a":
-            for attr in attrs:
-                if attr[0] == "href":
-                    self.found_url(attr[1])
-        # Checking for images.
-        elif tag == "img":
-            for attr in attrs:
-                if attr[0] == "src":
-                    self.found_image(attr[1])
-        elif tag == "meta":
-            name = None
-            content = None
-            for attr in attrs:
-                if attr[0] == "name":
-                    name = attr[1]
-                elif attr[0] == "content":
-                    content = attr[1]
-            if name is not None and content is not None:
-                self.found_meta_name_content_pair(name, content)
+    # @param    self                The class instance that this method operates on.
+    # @param    optional backend    Tokenizer backend (see searchengine.extraction.engine).
+    def __init__(self, backend = None):
+        ExtractionEngine.__init__(self, backend)
+
+
+##
+# @class    PageParser
+#
+# @brief    Parser that collects what the crawler keeps from a single page.
+#           A new one is used for every page, so pages downloaded at the same time can each be
+#           fed as their chunks arrive.
+#
+# @author   agent
+# @date 10/17/2026
+class PageParser(Parser):
 
     ##
-    # @fn   handle_endtag(self, tag)
+    # @fn   __init__(self, url)
     #
-    # @brief    Executed when we encounter an ending tag.
+    # @brief    Class initializer.
     #
-    # @author   Edward Callahan
-    # @date 6/12/2016
+    # @author   agent
+    # @date 10/17/2026
     #
     # @param    self    The class instance that this method operates on.
-    # @param    tag     The ended tag.
-    def handle_endtag(self, tag):
-        pass
+    # @param    url     The url of the page.
+    def __init__(self, url):
+        Parser.__init__(self)
+        self.url = url
+        self.title = ""             #< The title, once the parser is closed.
+        self.content = ""           #< The text of the page, once the parser is closed.
+        self.title_chunks = []
+        self.content_chunks = []
+        self.meta_title = ""
+        self.meta_description = ""
+        self.meta_keywords = ""
+        self.urls = []      #< Links found on the page, as written in it.
+        self.images = []    #< Image sources found on the page, as written in it.
 
-    # @fn   handle_data(self, data)
+    ##
+    # @fn   close(self)
     #
-    # @brief    Executed when we encounter data from inside of a tag.
+    # @brief    Finishes parsing the page and joins its title and text.
     #
-    # @author   Edward Callahan
-    # @date 6/16/2016
+    # @author   agent
+    # @date 10/17/2026
     #
     # @param    self    The class instance that this method operates on.
-    # @param    data    The data.
-    def handle_data(self, data):
-        if len(self.tagQueue) == 0:
-            return # We don't want an empty tag queue
-
-        # Checking if data is compatable, and how to handle it
-        if self.tagQueue[-1] == "title":
-            self.found_title(data)
-        
-        disallowedTags = [
-            # Title (disabled because it is used for other purposes in ranking)
-            "title",
-
-            # Form tags
-            "input",
-            "textarea",
-            "button",
-            "select",
-            "optgroup",
-            "option",
-            "fieldset",
-            "output",
-            "keygen",
-            "datalist",
-
-            # Frame tags
-            "frame",
-            "frameset",
-            "noframes",
-            "iframe",
-
-            # Image tags
-            "img",
-            "map",
-            "area",
-            "canvas",
-            "figcaption",
-            "figure",
-
-            # Playable media tags
-            "audio",
-            "source",
-            "track",
-            "video",
-
-            # Style and semantic tags
-            "style",
-            "link",
-
-            # Meta info
-            "meta",
-            "base",
-
-            # Programming tags
-            "script",
-            "noscript",
-            "applet",
-            "embed",
-            "object",
-            "param"
-        ]
-        if self.tagQueue[-1] not in disallowedTags:
-            self.found_content(data)
-
-
-    # ======================================================
-    # Abstract Functions
-    # ======================================================
+    def close(self):
+        Parser.close(self)
+        self.title = "".join(self.title_chunks)
+        self.content = "".join(self.content_chunks)
 
     ##
     # @fn   found_url(self, url)
     #
-    # @brief    Executed any time we locate a URL.
+    # @brief    Override from Parser.
     #
-    # @author   Edward Callahan
-    # @date 6/12/2016
+    # @author   agent
+    # @date 10/17/2026
     #
     # @param    self    The class instance that this method operates on.
-    # @param    url     URL that was found.
+    # @param    url     URL that was located.
     def found_url(self, url):
-        pass
-
-    ##
-    # @fn   found_data(self, data)
-    #
-    # @brief    Executed any time we locate data from inside tags.
-    #
-    # @author   Edward Callahan
-    # @date 6/12/2016
-    #
-    # @param    self    The class instance that this method operates on.
-    # @param    data    The data.
-    def found_data(self, data):
-        pass
+        self.urls.append(url)
 
     ##
     # @fn   found_image(self, url)
     #
-    # @brief    Executed when we find an image.
+    # @brief    Override from Parser.
     #
-    # @author   Edward Callahan
-    # @date 6/12/2016
+    # @author   agent
+    # @date 10/17/2026
     #
     # @param    self    The class instance that this method operates on.
-    # @param    url     The data.
+    # @param    url     The image.
     def found_image(self, url):
-        pass
+        self.images.append(url)
 
-        ##
+    ##
     # @fn   found_content(self, content)
     #
-    # @brief    Executed any time we locate content from inside tags.
+    # @brief    Override from Parser.
     #
-    # @author   Edward Callahan
-    # @date 6/12/2016
+    # @author   agent
+    # @date 10/17/2026
     #
     # @param    self    The class instance that this method operates on.
-    # @param    content The data.
+    # @param    content The content.
     def found_content(self, content):
-        pass
+        self.content_chunks.append(content)
 
     ##
     # @fn   found_title(self, title)
     #
-    # @brief    Executed any time we locate a title.
+    # @brief    Override from Parser.
     #
-    # @author   Edward Callahan
-    # @date 6/20/2016
+    # @author   agent
+    # @date 10/17/2026
     #
     # @param    self    The class instance that this method operates on.
     # @param    title   The title.
     def found_title(self, title):
-        pass
+        self.title_chunks.append(title)
 
     ##
     # @fn   found_meta_name_content_pair(self, name, content)
     #
-    # @brief    Found a tag that is structured as followed <meta name="{}" content="{}" />
+    # @brief    Override from Parser.
     #
-    # @author   Edward Callahan
-    # @date 6/21/2016
+    # @author   agent
+    # @date 10/17/2026
     #
     # @param    self    The class instance that this method operates on.
     # @param    name    The name.
     # @param    content The content.
     def found_meta_name_content_pair(self, name, content):
-        pass
+        if name == "title":
+            self.meta_title = content
+        elif name == "description":
+            self.meta_description = content
+        elif name == "keywords":
+            self.meta_keywords = content
@@ -0,0 +1,252 @@
+import os
+import time
+import pickle
+import ipaddress
+import urllib.request
+import urllib.error
+import searchengine.debugtools
+
+TLD_LIST_URL = "https://publicsuffix.org/list/effective_tld_names.dat"
+PUBLIC_SUFFIX_CACHE = os.path.join(searchengine.DATA_DIRECTORY, "public_suffix.cache")  #< Compiled list shared by every crawler on a host.
+PUBLIC_SUFFIX_MAX_AGE = 60 * 60 * 24 * 7   #< Seconds before the cached list is checked against TLD_LIST_URL again.
+
+RULE = 1        #< Trie marker of a normal (or wildcard) rule.
+EXCEPTION = 2   #< Trie marker of an exception ("!") rule.
+
+##
+# @class    PublicSuffixList
+#
+# @brief    The Public Suffix List compiled into a trie of reversed host labels.
+#           Every node is a dictionary of label -> child node, and the None key marks the end of
+#           a rule (RULE or EXCEPTION). Wildcard rules are stored under the "*" label. A lookup
+#           walks the labels of a host from the right once, so its cost depends on the number
+#           of labels and not on the size of the list.
+#
+# @author   agent
+# @date 10/17/2026
+class PublicSuffixList:
+
+    ##
+    # @fn   __init__(self, trie = None)
+    #
+    # @brief    Class initializer.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self            The class instance that this method operates on.
+    # @param    optional trie   A compiled trie (see compile), None for an empty list.
+    def __init__(self, trie = None):
+        self.trie = trie if trie is not None else {}
+
+    ##
+    # @fn   compile(text)
+    #
+    # @brief    Compiles the text of effective_tld_names.dat.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    text    The list.
+    #
+    # @return   The PublicSuffixList.
+    @staticmethod
+    def compile(text):
+        trie = {}
+        for line in text.splitlines():
+            line = line.strip()
+            if len(line) == 0 or line.startswith("//"):
+                continue
+            rule = line.split()[0].lower()
+            kind = RULE
+            if rule.startswith("!"):
+                kind = EXCEPTION
+                rule = rule[1:]
+            labels = rule.split(".")
+            PublicSuffixList.__insert(trie, labels, kind)
+            # Hosts come to us in their ascii form, so unicode rules are stored in both forms.
+            try:
+                ascii_labels = [label if label == "*" else label.encode("idna").decode("ascii") for label in labels]
+            except UnicodeError:
+                continue
+            if ascii_labels != labels:
+                PublicSuffixList.__insert(trie, ascii_labels, kind)
+        return PublicSuffixList(trie)
+
+    ##
+    # @fn   split_host(self, host)
+    #
+    # @brief    Splits a host name into its subdomain, registrable domain label and public suffix.
+    #           e.g. "www.news.bbc.co.uk" -> ("www.news", "bbc", "co.uk").
+    #           Addresses and hosts that are a public suffix themselves are returned as the domain.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    host    The host name.
+    #
+    # @return   (subdomain, domain, tld)
+    def split_host(self, host):
+        host = host.strip(".").lower()
+        labels = host.split(".")
+        if len(labels) < 2 or self.__is_address(host):
+            return "", host, ""
+        suffix_length = self.suffix_length(labels)
+        if suffix_length >= len(labels):
+            return "", host, ""
+        return ".".join(labels[:-suffix_length - 1]), labels[-suffix_length - 1], ".".join(labels[-suffix_length:])
+
+    ##
+    # @fn   suffix_length(self, labels)
+    #
+    # @brief    Gets how many labels at the end of a host form its public suffix.
+    #           The longest matching rule wins, an exception rule drops its leftmost label, and
+    #           hosts matching no rule have a one label suffix (the "*" default rule).
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    labels  The labels of the host (in their normal order).
+    #
+    # @return   The number of labels.
+    def suffix_length(self, labels):
+        length = 1
+        node = self.trie
+        for depth in range(1, len(labels) + 1):
+            label = labels[-depth]
+            child = node.get(label)
+            if child is None:
+                child = node.get("*")
+                if child is None:
+                    break
+            node = child
+            kind = node.get(None)
+            if kind == EXCEPTION:
+                return depth - 1
+            if kind == RULE:
+                length = depth
+        return length
+
+    ##
+    # @fn   __insert(trie, labels, kind)
+    #
+    # @brief    Adds a rule to a trie.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    trie    The trie.
+    # @param    labels  The labels of the rule.
+    # @param    kind    RULE or EXCEPTION.
+    @staticmethod
+    def __insert(trie, labels, kind):
+        node = trie
+        for label in reversed(labels):
+            node = node.setdefault(label, {})
+        node[None] = kind
+
+    ##
+    # @fn   __is_address(self, host)
+    #
+    # @brief    Checks if a host is an IP address.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    host    The host.
+    def __is_address(self, host):
+        try:
+            ipaddress.ip_address(host)
+            return True
+        except ValueError:
+            return False
+
+##
+# @fn   load_public_suffix_list(cache_path = PUBLIC_SUFFIX_CACHE, url = TLD_LIST_URL, max_age = PUBLIC_SUFFIX_MAX_AGE)
+#
+# @brief    Loads the compiled list from its disk cache, downloading the list only when the cache
+#           is missing or older than max_age (with a conditional request, so an unchanged list is
+#           not downloaded again). If the download fails a stale cache is still used.
+#
+# @author   agent
+# @date 10/17/2026
+#
+# @param    optional cache_path The cache file.
+# @param    optional url        Where the list is downloaded from.
+# @param    optional max_age    Seconds the cache is used without checking for a newer list.
+#
+# @return   The PublicSuffixList.
+def load_public_suffix_list(cache_path = PUBLIC_SUFFIX_CACHE, url = TLD_LIST_URL, max_age = PUBLIC_SUFFIX_MAX_AGE):
+    cache = None
+    try:
+        with open(cache_path, "rb") as cache_file:
+            cache = pickle.load(cache_file)
+    except (OSError, EOFError, pickle.UnpicklingError) as ex:
+        searchengine.debugtools.log("Public suffix cache not usable: " + str(ex))
+    if cache is not None and cache["checked"] + max_age > time.time():
+        return PublicSuffixList(cache["trie"])
+
+    request = urllib.request.Request(url)
+    if cache is not None:
+        if cache.get("etag"):
+            request.add_header("If-None-Match", cache["etag"])
+        if cache.get("last_modified"):
+            request.add_header("If-Modified-Since", cache["last_modified"])
+    try:
+        searchengine.debugtools.log("Loading public suffix list...")
+        response = urllib.request.urlopen(request, timeout = 30)
+        trie = PublicSuffixList.compile(response.read().decode("utf-8")).trie
+        cache = {
+            "trie"          : trie,
+            "etag"          : response.headers.get("ETag"),
+            "last_modified" : response.headers.get("Last-Modified"),
+            "checked"       : time.time()
+        }
+    except urllib.error.HTTPError as ex:
+        if ex.code != 304 or cache is None:
+            return fallback_list(cache, ex)
+        cache["checked"] = time.time()
+    except (OSError, ValueError) as ex:
+        return fallback_list(cache, ex)
+
+    os.makedirs(os.path.dirname(cache_path), exist_ok = True)
+    tmp_path = "{}.{}.tmp".format(cache_path, os.getpid())
+    with open(tmp_path, "wb") as cache_file:
+        pickle.dump(cache, cache_file, pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, cache_path)
+    return PublicSuffixList(cache["trie"])
+
+##
+# @fn   fallback_list(cache, ex)
+#
+# @brief    Gets the list to use when the download failed: the stale cache, or an empty list
+#           (which splits every host on its last label).
+#
+# @author   agent
+# @date 10/17/2026
+#
+# @param    cache   The loaded cache, or None.
+# @param    ex      The download error.
+def fallback_list(cache, ex):
+    searchengine.debugtools.log("Could not download public suffix list: " + str(ex))
+    return PublicSuffixList(cache["trie"] if cache is not None else None)
+
+public_suffix_list = None   #< The PublicSuffixList of this process.
+
+##
+# @fn   get_public_suffix_list()
+#
+# @brief    Gets the PublicSuffixList of this process (loading it on first use).
+#
+# @author   agent
+# @date 10/17/2026
+#
+# @return   The PublicSuffixList.
+def get_public_suffix_list():
+    global public_suffix_list
+    if public_suffix_list is None:
+        public_suffix_list = load_public_suffix_list()
+    return public_suffix_list
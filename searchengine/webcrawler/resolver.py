@@ -0,0 +1,216 @@
+import time
+import socket
+import asyncio
+import threading
+import ipaddress
+import dns.resolver
+import dns.exception
+from concurrent.futures import ThreadPoolExecutor
+
+DNS_MIN_TTL = 60                #< Lowest seconds an answer is cached, whatever its record TTL says.
+DNS_MAX_TTL = 60 * 60 * 6       #< Highest seconds an answer is cached.
+DNS_NEGATIVE_TTL = 60 * 60      #< Seconds a name that does not exist (NXDOMAIN / no address) is remembered.
+DNS_ERROR_TTL = 60 * 5          #< Seconds a timed out or failed lookup is remembered.
+DNS_TIMEOUT = 5                 #< Seconds a single lookup may take.
+DNS_WORKERS = 16                #< Lookups running at the same time.
+DNS_CACHE_SIZE = 100000         #< Names cached before expired entries are swept.
+
+##
+# @class    DnsError
+#
+# @brief    Raised when a host name could not be resolved (now or in a cached earlier lookup).
+#
+# @author   agent
+# @date 10/17/2026
+class DnsError(OSError):
+    pass
+
+##
+# @class    DnsCache
+#
+# @brief    Caching resolver for the crawler's connections.
+#           Answers are kept for their record TTL (bounded by DNS_MIN_TTL and DNS_MAX_TTL), and
+#           failed lookups are cached too, so dead domains coming back from solr do not cost a
+#           lookup (and its timeout) every time. Lookups run on a thread pool, which lets
+#           prefetch be called from any thread and lets concurrent requests for the same name
+#           share a single lookup.
+#
+# @author   agent
+# @date 10/17/2026
+class DnsCache:
+
+    ##
+    # @fn   __init__(self, timeout = DNS_TIMEOUT, max_entries = DNS_CACHE_SIZE)
+    #
+    # @brief    Class initializer.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self                    The class instance that this method operates on.
+    # @param    optional timeout        Seconds a single lookup may take.
+    # @param    optional max_entries    Names cached before expired entries are swept.
+    def __init__(self, timeout = DNS_TIMEOUT, max_entries = DNS_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.mutex = threading.Lock()
+        self.entries = {}       #< Dictionary of host -> (expire time, list of addresses or None, error message).
+        self.pending = {}       #< Dictionary of host -> concurrent future of a running lookup.
+        self.executor = ThreadPoolExecutor(DNS_WORKERS)
+        try:
+            self.resolver = dns.resolver.Resolver()
+            self.resolver.lifetime = timeout
+        except dns.exception.DNSException:
+            # No resolver configuration we can read, lookups go through the system resolver instead.
+            self.resolver = None
+
+    ##
+    # @fn   resolve(self, host)
+    #
+    # @brief    Gets the address to connect to for a host name.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    host    The host name (or address).
+    #
+    # @return   The address.
+    async def resolve(self, host):
+        if self.__is_address(host):
+            return host
+        future = None
+        with self.mutex:
+            entry = self.entries.get(host)
+            if entry is None or entry[0] < time.time():
+                future = self.__start_lookup(host)
+        if future is not None:
+            entry = await asyncio.wrap_future(future)
+        if entry[1] is None:
+            raise DnsError(entry[2])
+        return entry[1][0]
+
+    ##
+    # @fn   prefetch(self, hosts)
+    #
+    # @brief    Starts lookups in the background for host names that are not cached yet,
+    #           so they are answered from the cache by the time they are fetched.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    hosts   Iterable of host names.
+    def prefetch(self, hosts):
+        now = time.time()
+        with self.mutex:
+            for host in set(hosts):
+                if not host or self.__is_address(host):
+                    continue
+                entry = self.entries.get(host)
+                if entry is None or entry[0] < now:
+                    self.__start_lookup(host)
+
+    ##
+    # @fn   close(self)
+    #
+    # @brief    Stops the lookup threads.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def close(self):
+        self.executor.shutdown(wait = False)
+
+    ##
+    # @fn   __start_lookup(self, host)
+    #
+    # @brief    Gets the running lookup of a host, starting one if needed. Called with mutex held.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    host    The host name.
+    #
+    # @return   concurrent.futures.Future of the cache entry.
+    def __start_lookup(self, host):
+        future = self.pending.get(host)
+        if future is None:
+            future = self.executor.submit(self.__lookup, host)
+            self.pending[host] = future
+        return future
+
+    ##
+    # @fn   __lookup(self, host)
+    #
+    # @brief    Resolves a host name and caches the answer (runs on the thread pool).
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    host    The host name.
+    #
+    # @return   The new cache entry.
+    def __lookup(self, host):
+        global DNS_MIN_TTL, DNS_MAX_TTL, DNS_NEGATIVE_TTL, DNS_ERROR_TTL
+        try:
+            if self.resolver is None or "." not in host:
+                # Local names (/etc/hosts, search domains) are left to the system resolver.
+                infos = socket.getaddrinfo(host, None, socket.AF_UNSPEC, socket.SOCK_STREAM)
+                # IPv4 addresses first, IPv6 ones are only used by hosts that have nothing else.
+                addresses = sorted(set(info[4][0] for info in infos), key = lambda address: ":" in address)
+                ttl = DNS_MIN_TTL
+            else:
+                try:
+                    answer = self.resolver.query(host, "A")
+                except dns.resolver.NoAnswer:
+                    # IPv6 only host.
+                    answer = self.resolver.query(host, "AAAA")
+                addresses = [record.address for record in answer]
+                ttl = answer.rrset.ttl
+            entry = (time.time() + min(max(ttl, DNS_MIN_TTL), DNS_MAX_TTL), addresses, None)
+        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer, socket.gaierror) as ex:
+            entry = (time.time() + DNS_NEGATIVE_TTL, None, "Could not resolve {}: {}".format(host, ex))
+        except (dns.exception.DNSException, OSError) as ex:
+            entry = (time.time() + DNS_ERROR_TTL, None, "Could not resolve {}: {}".format(host, str(ex) or type(ex).__name__))
+        with self.mutex:
+            self.entries[host] = entry
+            del self.pending[host]
+            if len(self.entries) > self.max_entries:
+                self.__sweep()
+        return entry
+
+    ##
+    # @fn   __sweep(self)
+    #
+    # @brief    Drops expired entries, and the oldest half if that is not enough. Called with mutex held.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def __sweep(self):
+        now = time.time()
+        self.entries = { host : entry for host, entry in self.entries.items() if entry[0] >= now }
+        if len(self.entries) > self.max_entries // 2:
+            keep = sorted(self.entries.items(), key = lambda item: item[1][0])[len(self.entries) // 2:]
+            self.entries = dict(keep)
+
+    ##
+    # @fn   __is_address(self, host)
+    #
+    # @brief    Checks if a host is already an IP address.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    host    The host.
+    def __is_address(self, host):
+        try:
+            ipaddress.ip_address(host)
+            return True
+        except ValueError:
+            return False
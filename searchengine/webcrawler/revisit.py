@@ -0,0 +1,73 @@
+import math
+import time
+
+MIN_REVISIT_INTERVAL = 60 * 60 * 6          #< Shortest time between two crawls of a url.
+MAX_REVISIT_INTERVAL = 60 * 60 * 24 * 90    #< Longest time between two crawls of a url.
+DEFAULT_REVISIT_INTERVAL = 60 * 60 * 24 * 7 #< Time between crawls of a url with no change history yet.
+HISTORY_DECAY = 0.8                         #< Weight kept by older fetches each time a url is fetched again.
+
+##
+# @class    RevisitScheduler
+#
+# @brief    Picks when each url is crawled next from how often its content changed before.
+#           Every url keeps decayed counts of its fetches and of the fetches that found new
+#           content. Assuming changes arrive as a Poisson process, the share of fetches that saw
+#           a change over the last interval gives the url's change rate, and the next crawl is
+#           due after the mean time between changes (within MIN/MAX_REVISIT_INTERVAL). Pages that
+#           change on every visit are crawled more and more often, static pages less and less.
+#
+# @author   agent
+# @date 10/17/2026
+class RevisitScheduler:
+
+    ##
+    # @fn   __init__(self, min_interval = MIN_REVISIT_INTERVAL, max_interval = MAX_REVISIT_INTERVAL, default_interval = DEFAULT_REVISIT_INTERVAL)
+    #
+    # @brief    Class initializer.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self                        The class instance that this method operates on.
+    # @param    optional min_interval       Shortest seconds between two crawls of a url.
+    # @param    optional max_interval       Longest seconds between two crawls of a url.
+    # @param    optional default_interval   Seconds between crawls of a url with no history.
+    def __init__(self, min_interval = MIN_REVISIT_INTERVAL, max_interval = MAX_REVISIT_INTERVAL, default_interval = DEFAULT_REVISIT_INTERVAL):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.default_interval = default_interval
+
+    ##
+    # @fn   update(self, history, changed)
+    #
+    # @brief    Records a fetch of a url and computes when it is due again.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    history The url's fields from the working core (see solr_tools.REVISIT_FIELDS).
+    # @param    changed True if the content changed since the last fetch, False if not, None if
+    #                   there was no earlier version to compare with.
+    #
+    # @return   Dictionary of the fields to store for the url (REVISIT_FIELDS and next_crawl_time).
+    def update(self, history, changed):
+        global HISTORY_DECAY
+        if changed is None:
+            interval = self.default_interval
+            fetches = 0
+            changes = 0
+        else:
+            interval = history.get("revisit_interval", self.default_interval)
+            fetches = history.get("fetch_count", 0) * HISTORY_DECAY + 1
+            changes = history.get("change_count", 0) * HISTORY_DECAY + (1 if changed else 0)
+            # Share of fetches that saw a change, pulled towards 1/2 while there are few of them.
+            change_share = (changes + 0.5) / (fetches + 1)
+            change_rate = -math.log(1 - change_share) / interval
+            interval = min(max(1 / change_rate, self.min_interval), self.max_interval)
+        return {
+            "revisit_interval" : int(interval),
+            "fetch_count"      : fetches,
+            "change_count"     : changes,
+            "next_crawl_time"  : int(time.time() + interval)
+        }
@@ -0,0 +1,300 @@
+import re
+import time
+import asyncio
+import searchengine.debugtools
+from collections import OrderedDict
+from urllib.parse import urlsplit
+from searchengine.webcrawler.fetcher import USER_AGENT, FetchError
+
+ROBOTS_TTL = 60 * 60 * 24       #< Seconds a fetched robots.txt is trusted.
+ROBOTS_ERROR_TTL = 60 * 30      #< Seconds a failed robots.txt fetch is remembered.
+ROBOTS_MAX_SIZE = 500 * 1024    #< Bytes of a robots.txt that are parsed, the rest is ignored.
+LOCAL_CACHE_SIZE = 10000        #< Compiled rule sets kept in each crawler process.
+DISALLOW_ALL = "User-agent: *\nDisallow: /"
+
+##
+# @class    RobotsError
+#
+# @brief    Raised for a url robots.txt keeps us from fetching.
+#
+# @author   agent
+# @date 10/17/2026
+class RobotsError(FetchError):
+    def __init__(self, message, unavailable = False, retry_after = None):
+        super().__init__(message)
+        self.unavailable = unavailable  #< True if robots.txt could not be fetched, the url is only deferred then.
+        self.retry_after = retry_after  #< Seconds before robots.txt is fetched again, if unavailable.
+
+##
+# @class    RobotsRules
+#
+# @brief    The rules of one robots.txt that apply to our crawler, compiled for fast matching.
+#           Plain path prefixes go into a character trie, so a check walks the path once and keeps
+#           the longest matching rule. Rules with "*" or "$" are compiled to regular expressions.
+#           As in RFC 9309 the longest match wins and Allow wins ties.
+#
+# @author   agent
+# @date 10/17/2026
+class RobotsRules:
+
+    ##
+    # @fn   __init__(self, text, user_agent = USER_AGENT)
+    #
+    # @brief    Class initializer. Parses robots.txt text.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self                The class instance that this method operates on.
+    # @param    text                The robots.txt text, None if it could not be fetched (everything
+    #                               is disallowed until it can be).
+    # @param    optional user_agent The user agent the rules are selected for.
+    def __init__(self, text, user_agent = USER_AGENT):
+        self.trie = {}          #< Nested dictionaries of characters, None keys hold (length, allow).
+        self.patterns = []      #< List of (compiled regex, length, allow).
+        self.crawl_delay = None
+        self.unavailable = text is None
+        self.__compile(DISALLOW_ALL if text is None else text, user_agent.lower())
+
+    ##
+    # @fn   is_allowed(self, url)
+    #
+    # @brief    Checks if a url may be crawled.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    url     The url.
+    def is_allowed(self, url):
+        parts = urlsplit(url)
+        path = (parts.path or "/") + ("?" + parts.query if parts.query else "")
+        best = None
+        node = self.trie
+        if None in node:
+            best = node[None]
+        for char in path:
+            node = node.get(char)
+            if node is None:
+                break
+            if None in node:
+                best = node[None]
+        for regex, length, allow in self.patterns:
+            if (best is None or length > best[0] or (length == best[0] and allow)) and regex.match(path):
+                best = (length, allow)
+        return best is None or best[1]
+
+    ##
+    # @fn   __compile(self, text, user_agent)
+    #
+    # @brief    Parses the groups of a robots.txt and compiles the ones matching user_agent
+    #           (or "*" if no group names us).
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self        The class instance that this method operates on.
+    # @param    text        The robots.txt text.
+    # @param    user_agent  Our user agent (lowercase).
+    def __compile(self, text, user_agent):
+        groups = []             #< List of (agents, rules, crawl delay).
+        agents = None
+        in_rules = False
+        for line in text.splitlines():
+            line = line.split("#", 1)[0].strip()
+            field, sep, value = line.partition(":")
+            if len(sep) == 0:
+                continue
+            field = field.strip().lower()
+            value = value.strip()
+            if field == "user-agent":
+                if agents is None or in_rules:
+                    agents = []
+                    groups.append((agents, [], []))
+                    in_rules = False
+                # A blank agent names nobody (and "" would match every user agent).
+                if len(value) > 0:
+                    agents.append(value.lower())
+            elif agents is not None and field in ("allow", "disallow"):
+                in_rules = True
+                if len(value) > 0:
+                    groups[-1][1].append((value, field == "allow"))
+            elif agents is not None and field == "crawl-delay":
+                in_rules = True
+                try:
+                    groups[-1][2].append(float(value))
+                except ValueError:
+                    pass
+
+        selected = [group for group in groups if any(agent != "*" and agent in user_agent for agent in group[0])]
+        if len(selected) == 0:
+            selected = [group for group in groups if "*" in group[0]]
+        for agents, rules, delays in selected:
+            for pattern, allow in rules:
+                self.__add_rule(pattern, allow)
+            if len(delays) > 0:
+                self.crawl_delay = max(delays[-1], self.crawl_delay or 0)
+
+    ##
+    # @fn   __add_rule(self, pattern, allow)
+    #
+    # @brief    Adds an allow/disallow rule to the matcher.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    pattern The path pattern.
+    # @param    allow   True for Allow, False for Disallow.
+    def __add_rule(self, pattern, allow):
+        if "*" in pattern or pattern.endswith("$"):
+            anchored = pattern.endswith("$")
+            body = pattern[:-1] if anchored else pattern
+            regex = ".*".join(re.escape(piece) for piece in body.split("*")) + ("$" if anchored else "")
+            self.patterns.append((re.compile(regex), len(pattern), allow))
+            return
+        node = self.trie
+        for char in pattern:
+            node = node.setdefault(char, {})
+        if None not in node or allow:
+            node[None] = (len(pattern), allow)
+
+##
+# @class    RobotsCache
+#
+# @brief    Fetches robots.txt files and caches the compiled rules with a TTL.
+#           Compiled rules are kept per process, while the raw files go to a store shared by all
+#           crawler processes (the manager's RobotsStore) so each site is fetched once per TTL.
+#
+# @author   agent
+# @date 10/17/2026
+class RobotsCache:
+
+    ##
+    # @fn   __init__(self, fetcher, store = None, ttl = ROBOTS_TTL)
+    #
+    # @brief    Class initializer.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self            The class instance that this method operates on.
+    # @param    fetcher         AsyncFetcher used to download robots.txt files.
+    # @param    optional store  Shared RobotsStore (or proxy to it), None to only cache locally.
+    # @param    optional ttl    Seconds a robots.txt is trusted.
+    def __init__(self, fetcher, store = None, ttl = ROBOTS_TTL):
+        self.fetcher = fetcher
+        self.store = store
+        self.ttl = ttl
+        self.rules = OrderedDict()  #< Dictionary of site key -> (expire time, RobotsRules).
+        self.pending = {}           #< Dictionary of site key -> future of a robots.txt being fetched.
+
+    ##
+    # @fn   is_allowed(self, url)
+    #
+    # @brief    Checks a url against the rules already cached in this process.
+    #           Urls of sites whose robots.txt is not cached yet, or could not be fetched, are allowed
+    #           (they are checked again when they are fetched).
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    url     The url.
+    def is_allowed(self, url):
+        entry = self.rules.get(self.site_key(url))
+        if entry is None or entry[0] < time.time() or entry[1].unavailable:
+            return True
+        return entry[1].is_allowed(url)
+
+    ##
+    # @fn   get_rules(self, url)
+    #
+    # @brief    Gets the rules of a url's site, from this process, the shared store or the site.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    url     The url.
+    #
+    # @return   The RobotsRules.
+    async def get_rules(self, url):
+        key = self.site_key(url)
+        entry = self.rules.get(key)
+        if entry is not None and entry[0] >= time.time():
+            self.rules.move_to_end(key)
+            return entry[1]
+        if key in self.pending:
+            return await asyncio.shield(self.pending[key])
+        future = asyncio.get_event_loop().create_future()
+        self.pending[key] = future
+        try:
+            expires, text = await self.__load(key)
+            rules = RobotsRules(text)
+            self.rules[key] = (expires, rules)
+            while len(self.rules) > LOCAL_CACHE_SIZE:
+                self.rules.popitem(last = False)
+            future.set_result(rules)
+            return rules
+        except BaseException as ex:
+            future.set_exception(ex)
+            future.exception() # Marking the exception as retrieved
+            raise
+        finally:
+            del self.pending[key]
+
+    ##
+    # @fn   site_key(self, url)
+    #
+    # @brief    Gets the "scheme://host:port" key robots.txt files are cached under.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    url     The url.
+    def site_key(self, url):
+        parts = urlsplit(url)
+        return "{}://{}:{}".format(parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+
+    ##
+    # @fn   __load(self, key)
+    #
+    # @brief    Gets a site's robots.txt from the shared store, or downloads it and shares it.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    key     The site key.
+    #
+    # @return   (expire time, text), the text is None if robots.txt could not be fetched.
+    async def __load(self, key):
+        # The store lives in the manager process, so calls to it are kept off the event loop.
+        loop = asyncio.get_event_loop()
+        if self.store is not None:
+            entry = await loop.run_in_executor(None, self.store.get, key)
+            if entry is not None:
+                return entry
+        scheme, host_port = key.split("://", 1)
+        host, port = host_port.rsplit(":", 1)
+        default_port = "443" if scheme == "https" else "80"
+        url = "{}://{}{}/robots.txt".format(scheme, host, "" if port == default_port else ":" + port)
+        expires = time.time() + self.ttl
+        try:
+            response = await self.fetcher.fetch(url, max_bytes = ROBOTS_MAX_SIZE)
+            text = response.body.decode("utf-8", errors = "replace")
+        except FetchError as ex:
+            if ex.status is not None and ex.status < 500:
+                text = "" # No robots.txt (or not readable by us), everything is allowed.
+            else:
+                text = None
+                expires = time.time() + ROBOTS_ERROR_TTL
+        except (OSError, ValueError, asyncio.IncompleteReadError, asyncio.TimeoutError) as ex:
+            searchengine.debugtools.log("Could not fetch " + url + ": " + str(ex))
+            text = None
+            expires = time.time() + ROBOTS_ERROR_TTL
+        if self.store is not None:
+            await loop.run_in_executor(None, self.store.put, key, expires, text)
+        return expires, text
@@ -0,0 +1,234 @@
+import time
+import heapq
+from collections import deque
+from urllib.parse import urlsplit
+
+POLITENESS_DELAY = 1.0      #< Default seconds between two requests to the same host.
+MAX_PER_HOST = 1            #< Default number of requests in flight to the same host.
+MAX_BACKOFF_DELAY = 60 * 10 #< Highest delay a host is backed off to after 429/503 responses.
+BACKOFF_CODES = (429, 503)
+
+##
+# @class    HostQueue
+#
+# @brief    Urls and pacing state of a single host.
+#
+# @author   agent
+# @date 10/17/2026
+class HostQueue:
+    def __init__(self, host, delay):
+        self.host = host
+        self.urls = deque()
+        self.delay = delay          #< Current seconds between requests (raised on backoff).
+        self.min_delay = delay      #< Delay the host relaxes back to.
+        self.next_time = 0          #< Earliest time the next request may start.
+        self.active = 0             #< Requests in flight.
+        self.scheduled = False      #< True while the host has an entry in the ready heap.
+
+##
+# @class    HostScheduler
+#
+# @brief    Politeness scheduler for the crawler.
+#           Urls are queued per host, and hosts that have urls waiting sit in a heap ordered by
+#           the next time they may be fetched. next_url always returns a url from a host that can
+#           be fetched right now, so workers keep busy on other hosts instead of hammering one.
+#           Hosts that answer 429/503 get their delay doubled until they recover.
+#
+# @author   agent
+# @date 10/17/2026
+class HostScheduler:
+
+    ##
+    # @fn   __init__(self, min_delay = POLITENESS_DELAY, max_per_host = MAX_PER_HOST)
+    #
+    # @brief    Class initializer.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self                    The class instance that this method operates on.
+    # @param    optional min_delay      Seconds between two requests to the same host.
+    # @param    optional max_per_host   Requests in flight to the same host.
+    def __init__(self, min_delay = POLITENESS_DELAY, max_per_host = MAX_PER_HOST):
+        self.min_delay = min_delay
+        self.max_per_host = max_per_host
+        self.hosts = {}         #< Dictionary of host -> HostQueue.
+        self.ready = []         #< Heap of (next time, sequence, host).
+        self.queued = 0
+        self.sequence = 0
+        self.last_sweep = time.time()
+
+    ##
+    # @fn   __len__(self)
+    #
+    # @brief    Gets the number of queued urls.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    def __len__(self):
+        return self.queued
+
+    ##
+    # @fn   add(self, url)
+    #
+    # @brief    Queues a url behind the other urls of its host.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    url     The url.
+    def add(self, url):
+        host_queue = self.__get_host(self.host_of(url))
+        host_queue.urls.append(url)
+        self.queued += 1
+        self.__schedule(host_queue)
+
+    ##
+    # @fn   next_url(self)
+    #
+    # @brief    Takes the next url from a host that may be fetched now.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    #
+    # @return   The url, or None if every host with queued urls has to wait.
+    def next_url(self):
+        now = time.time()
+        self.__sweep(now)
+        while len(self.ready) > 0 and self.ready[0][0] <= now:
+            host_queue = self.hosts[heapq.heappop(self.ready)[2]]
+            host_queue.scheduled = False
+            if len(host_queue.urls) == 0 or host_queue.active >= self.max_per_host:
+                continue
+            url = host_queue.urls.popleft()
+            self.queued -= 1
+            host_queue.active += 1
+            host_queue.next_time = now + host_queue.delay
+            self.__schedule(host_queue)
+            return url
+        return None
+
+    ##
+    # @fn   wait_time(self)
+    #
+    # @brief    Gets how long until next_url can return a url.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    #
+    # @return   Seconds to wait (0 if a url is ready), or None if no host can be scheduled.
+    def wait_time(self):
+        if len(self.ready) == 0:
+            return None
+        return max(0, self.ready[0][0] - time.time())
+
+    ##
+    # @fn   done(self, url, status = None, retry_after = None)
+    #
+    # @brief    Reports that a request returned by next_url has finished.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self                    The class instance that this method operates on.
+    # @param    url                     The url.
+    # @param    optional status         HTTP status code of the response, if any.
+    # @param    optional retry_after    Seconds from a Retry-After header, if any.
+    def done(self, url, status = None, retry_after = None):
+        host_queue = self.hosts.get(self.host_of(url))
+        if host_queue is None:
+            return
+        host_queue.active = max(0, host_queue.active - 1)
+        if status in BACKOFF_CODES:
+            host_queue.delay = min(max(host_queue.delay * 2, 1), MAX_BACKOFF_DELAY)
+            host_queue.next_time = max(host_queue.next_time, time.time() + max(host_queue.delay, retry_after or 0))
+        elif host_queue.delay > host_queue.min_delay:
+            host_queue.delay = max(host_queue.min_delay, host_queue.delay / 2)
+        self.__schedule(host_queue)
+
+    ##
+    # @fn   set_delay(self, host, delay)
+    #
+    # @brief    Sets the minimum delay between requests to a host (e.g. a robots.txt Crawl-delay).
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    host    The host.
+    # @param    delay   Seconds between requests.
+    def set_delay(self, host, delay):
+        host_queue = self.__get_host(host)
+        host_queue.min_delay = max(self.min_delay, delay)
+        host_queue.delay = max(host_queue.delay, host_queue.min_delay)
+
+    ##
+    # @fn   host_of(self, url)
+    #
+    # @brief    Gets the key a url is queued under.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    url     The url.
+    def host_of(self, url):
+        return urlsplit(url).hostname or ""
+
+    ##
+    # @fn   __get_host(self, host)
+    #
+    # @brief    Gets the HostQueue of a host, creating it if needed.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    host    The host.
+    def __get_host(self, host):
+        host_queue = self.hosts.get(host)
+        if host_queue is None:
+            host_queue = HostQueue(host, self.min_delay)
+            self.hosts[host] = host_queue
+        return host_queue
+
+    ##
+    # @fn   __schedule(self, host_queue)
+    #
+    # @brief    Puts a host in the ready heap if it has urls and room for another request.
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self        The class instance that this method operates on.
+    # @param    host_queue  The HostQueue.
+    def __schedule(self, host_queue):
+        if host_queue.scheduled or len(host_queue.urls) == 0 or host_queue.active >= self.max_per_host:
+            return
+        host_queue.scheduled = True
+        self.sequence += 1
+        heapq.heappush(self.ready, (host_queue.next_time, self.sequence, host_queue.host))
+
+    ##
+    # @fn   __sweep(self, now)
+    #
+    # @brief    Forgets idle hosts whose delay has passed (at most once a minute).
+    #
+    # @author   agent
+    # @date 10/17/2026
+    #
+    # @param    self    The class instance that this method operates on.
+    # @param    now     The current time.
+    def __sweep(self, now):
+        if now - self.last_sweep < 60:
+            return
+        self.last_sweep = now
+        for host in [host for host, host_queue in self.hosts.items() if len(host_queue.urls) == 0 and host_queue.active == 0 and host_queue.next_time <= now]:
+            del self.hosts[host]